@@ -0,0 +1,84 @@
+# benchmarks/ann_benchmark.py
+#
+# Recall-vs-latency benchmark for the IVF index against exact search.
+#
+#   python -m benchmarks.ann_benchmark --n 1000000 --dim 384 --nlist 4096 --nprobe 8 16 32 64
+#
+# Data is a synthetic mixture of Gaussians on the unit sphere, which clusters roughly like
+# sentence embeddings. Recall is recall@k of the IVF results against the exact top-k.
+
+import argparse
+import time
+
+import numpy as np
+
+from rag_system.indexing.ann_index import IVFVectorIndex
+from rag_system.indexing.vector_store import NumpyVectorIndex, normalize_rows
+
+
+def make_dataset(n: int, dim: int, num_queries: int, clusters: int, spread: float, seed: int):
+    rng = np.random.default_rng(seed)
+    centers = normalize_rows(rng.normal(size=(clusters, dim)).astype(np.float32))
+    sigma = spread / np.sqrt(dim)
+
+    def sample(count):
+        noise = sigma * rng.normal(size=(count, dim)).astype(np.float32)
+        points = centers[rng.integers(0, clusters, count)] + noise
+        return normalize_rows(points.astype(np.float32))
+
+    return sample(n), sample(num_queries)
+
+
+def recall_at_k(approximate: np.ndarray, exact: np.ndarray) -> float:
+    hits = sum(len(np.intersect1d(a[a >= 0], e[e >= 0])) for a, e in zip(approximate, exact))
+    return hits / max(1, int((exact >= 0).sum()))
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IVF recall-vs-latency benchmark")
+    parser.add_argument("--n", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=1024)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32, 64])
+    parser.add_argument("--clusters", type=int, default=2000)
+    parser.add_argument("--spread", type=float, default=0.8,
+                        help="Within-cluster noise relative to the cluster centre norm")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    vectors, queries = make_dataset(args.n, args.dim, args.queries, args.clusters, args.spread, args.seed)
+    labels = np.arange(args.n)
+
+    exact = NumpyVectorIndex(args.dim, initial_capacity=args.n)
+    exact.add(labels, vectors)
+
+    ivf = IVFVectorIndex(args.dim, nlist=args.nlist, seed=args.seed)
+    _, build_seconds = timed(lambda: ivf.build(labels, vectors))
+    print(f"n={args.n} dim={args.dim} queries={args.queries} top_k={args.top_k} nlist={args.nlist}")
+    print(f"IVF build: {build_seconds:.2f}s")
+
+    (_, exact_labels), exact_batch = timed(lambda: exact.search_batch(queries, args.top_k))
+    _, exact_single = timed(lambda: [exact.search(query, args.top_k) for query in queries[:100]])
+
+    print(f"{'mode':<14}{'recall@k':>10}{'batch ms/q':>12}{'single ms/q':>13}")
+    print(f"{'exact':<14}{1.0:>10.3f}{1000 * exact_batch / len(queries):>12.3f}{1000 * exact_single / 100:>13.3f}")
+
+    for nprobe in args.nprobe:
+        ivf.nprobe = nprobe
+        (_, ivf_labels), ivf_batch = timed(lambda: ivf.search_batch(queries, args.top_k))
+        _, ivf_single = timed(lambda: [ivf.search(query, args.top_k) for query in queries[:100]])
+        recall = recall_at_k(ivf_labels, exact_labels)
+        print(f"{'ivf/' + str(nprobe):<14}{recall:>10.3f}{1000 * ivf_batch / len(queries):>12.3f}"
+              f"{1000 * ivf_single / 100:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# benchmarks/pipeline_benchmark.py
+#
+# Compose-and-persist benchmark for bulk pipeline imports.
+#
+#   python -m benchmarks.pipeline_benchmark --n 10000 --elements 8 --repo sqlite
+#
+# Validation is timed three ways: jsonschema.validate per call (which re-checks the schema
+# and builds a validator every time), the precompiled validator on unseen definitions,
+# and the cached fast path on definitions seen before. Persisting is timed per pipeline
+# and in bulk against an in-memory, SQLite or file repository in a temporary directory.
+
+import argparse
+import os
+import tempfile
+import time
+
+import jsonschema
+
+from rag_system.composition import pipeline_schema
+from rag_system.composition.pipeline_composer import PipelineComposer
+from rag_system.composition.pipeline_graph import PipelineGraph
+from rag_system.persistence.memory_repo import InMemoryMetadataRepo
+from rag_system.persistence.MetadataRepo import FileBasedMetadataRepo
+from rag_system.persistence.sqlite_repo import SQLiteMetadataRepo
+
+
+def make_definitions(n: int, elements: int, prefix: str = ""):
+    return {
+        f"{prefix}pipeline_{number:06d}": {
+            "name": f"{prefix}Pipeline {number}",
+            "description": "Benchmark pipeline",
+            "elements": [
+                {"name": f"step_{step}", "type": f"benchmarks.elements.Step{step}",
+                 "config": {"batch_size": 32, "index": number}, "writes": [f"key_{step}"],
+                 "reads": [f"key_{step - 1}"] if step else []}
+                for step in range(elements)
+            ]
+        }
+        for number in range(n)
+    }
+
+
+def make_repo(kind: str, directory: str):
+    if kind == "memory":
+        return InMemoryMetadataRepo()
+    if kind == "sqlite":
+        return SQLiteMetadataRepo(os.path.join(directory, "metadata.db"))
+    return FileBasedMetadataRepo(os.path.join(directory, "metadata"))
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def report(label: str, seconds: float, n: int):
+    print(f"{label:<34}{seconds:>9.3f}s{1e6 * seconds / n:>12.1f} us/pipeline")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline compose/persist benchmark")
+    parser.add_argument("--n", type=int, default=10_000)
+    parser.add_argument("--elements", type=int, default=8)
+    parser.add_argument("--repo", choices=["memory", "sqlite", "file"], default="sqlite")
+    args = parser.parse_args()
+
+    definitions = make_definitions(args.n, args.elements)
+    schema = pipeline_schema.PIPELINE_SCHEMAS[pipeline_schema.PIPELINE_SCHEMA_VERSION]
+    print(f"n={args.n} elements={args.elements} repo={args.repo}")
+
+    def baseline():
+        for definition in definitions.values():
+            PipelineGraph.from_definition(definition).validate()
+            jsonschema.validate(instance=definition, schema=schema)
+
+    _, seconds = timed(baseline)
+    report("compose (jsonschema.validate)", seconds, args.n)
+
+    composer = PipelineComposer()
+    _, seconds = timed(lambda: [composer.compose_pipeline(d) for d in definitions.values()])
+    report("compose (precompiled, unseen)", seconds, args.n)
+    _, seconds = timed(lambda: [composer.compose_pipeline(d) for d in definitions.values()])
+    report("compose (cached)", seconds, args.n)
+
+    with tempfile.TemporaryDirectory() as directory:
+        composer.init(make_repo(args.repo, os.path.join(directory, "single")))
+        fresh = make_definitions(args.n, args.elements, prefix="single_")
+        _, seconds = timed(lambda: [composer.persist_pipeline(pipeline_id, definition)
+                                    for pipeline_id, definition in fresh.items()])
+        report("compose+persist (per pipeline)", seconds, args.n)
+
+        composer.init(make_repo(args.repo, os.path.join(directory, "bulk")))
+        fresh = make_definitions(args.n, args.elements, prefix="bulk_")
+        saved, seconds = timed(lambda: composer.persist_pipelines(fresh))
+        report("compose+persist (bulk)", seconds, args.n)
+        assert all(saved.values())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
+from dependency_injector.wiring import inject, Provide
+from rag_system.config import AppContainer
 from rag_system.composition.pipeline_composer import PipelineComposer
+from rag_system.composition.pipeline_transfer import PipelineImporter, export_ndjson
+from rag_system.core.interfaces import IMetadataRepository
 
 router = APIRouter()
 
@@ -12,14 +17,19 @@ class PipelineDefinition(BaseModel):
     elements: List[str]
 
 
-def get_pipeline_composer():
-    # This would typically be handled by dependency injection
-    # For now, we'll just create a new instance each time
-    return PipelineComposer()
+@inject
+def get_pipeline_composer(repository: IMetadataRepository = Depends(Provide[AppContainer.cached_metadata_repository])):
+    # Composers are cheap; the cached repository behind them is shared by every request
+    composer = PipelineComposer()
+    composer.init(repository)
+    return composer
 
 
+# Handlers that call the blocking repository are plain functions, which FastAPI runs in its
+# thread pool instead of on the event loop
+
 @router.post("/pipelines")
-async def create_pipeline(pipeline: PipelineDefinition, composer: PipelineComposer = Depends(get_pipeline_composer)):
+def create_pipeline(pipeline: PipelineDefinition, composer: PipelineComposer = Depends(get_pipeline_composer)):
     try:
         pipeline_id = composer.compose_pipeline(pipeline.dict())
         return {"pipeline_id": pipeline_id, "message": "Pipeline created successfully"}
@@ -27,14 +37,50 @@ async def create_pipeline(pipeline: PipelineDefinition, composer: PipelineCompos
         raise HTTPException(status_code=400, detail=str(e))
 
 
+# Declared before /pipelines/{pipeline_id}, which would otherwise match "import" and "export"
+
+@router.post("/pipelines/import")
+async def import_pipelines(request: Request, composer: PipelineComposer = Depends(get_pipeline_composer)):
+    # NDJSON body, one {"pipeline_id", "definition"} per line, read as it arrives
+    importer = PipelineImporter(composer.pipeline_store)
+    return await importer.import_ndjson(request.stream())
+
+
+@router.get("/pipelines/export")
+def export_pipelines(composer: PipelineComposer = Depends(get_pipeline_composer)):
+    # A sync generator: Starlette iterates it in the thread pool, so repository reads do
+    # not block the event loop
+    return StreamingResponse(export_ndjson(composer.pipeline_store), media_type="application/x-ndjson")
+
+
 @router.get("/pipelines/{pipeline_id}")
-async def get_pipeline(pipeline_id: str, composer: PipelineComposer = Depends(get_pipeline_composer)):
-    pipeline = composer.load_pipeline(pipeline_id)
-    if pipeline is None:
+def get_pipeline(pipeline_id: str, request: Request, response: Response,
+                 composer: PipelineComposer = Depends(get_pipeline_composer)):
+    # The ETag is the definition's content hash, so revalidating costs one head read and
+    # an unchanged pipeline is answered with 304 without fetching the definition
+    version = composer.get_pipeline_version(pipeline_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Pipeline not found")
+    etag = f'"{version}"'
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    pipeline = composer.load_pipeline_version(pipeline_id, version)
+    if not pipeline:
         raise HTTPException(status_code=404, detail="Pipeline not found")
+    response.headers["ETag"] = etag
     return pipeline
 
 
 @router.get("/pipelines")
-async def list_pipelines(composer: PipelineComposer = Depends(get_pipeline_composer)):
-    return composer.list_pipelines()
+def list_pipelines(limit: Optional[int] = Query(None, ge=1, le=1000), start_after: Optional[str] = None,
+                   composer: PipelineComposer = Depends(get_pipeline_composer)):
+    # Pass the last id of a page as start_after to get the next one
+    return composer.list_pipelines(limit, start_after)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
@@ -1,9 +1,16 @@
 # rag_system/api/execution_service.py
 
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from typing import Dict, Any
+from typing import Dict, Any, List
 from pydantic import BaseModel
+from dependency_injector.wiring import inject, Provide
+from rag_system.config import AppContainer
+from rag_system.core.exceptions import PipelineException
+from rag_system.core.interfaces import IMetadataRepository
+from rag_system.indexing.rag_indexer import RAGIndexer
 from rag_system.execution.pipeline_manager import PipelineManager
+from rag_system.execution.job_queue import get_default_queue
+from rag_system.execution.worker import enqueue_pipeline_execution
 # from core.PipelineManager import PipelineManager
 
 router = APIRouter()
@@ -12,27 +19,79 @@ router = APIRouter()
 class ExecutionRequest(BaseModel):
     pipeline_id: str
     context: Dict[str, Any]
+    priority: int = 0
 
 
-def get_pipeline_manager():
-    # This would typically be handled by dependency injection
-    return PipelineManager()
+@inject
+def get_pipeline_manager(repository: IMetadataRepository = Depends(Provide[AppContainer.cached_metadata_repository]),
+                         indexer: RAGIndexer = Depends(Provide[AppContainer.rag_indexer])):
+    return PipelineManager(repository, indexer)
 
 
+# /execute and /execution-status read the SQLite job queue, which blocks, so they are plain
+# functions run in FastAPI's thread pool
+
 @router.post("/execute")
-async def execute_pipeline(request: ExecutionRequest, background_tasks: BackgroundTasks,
-                           manager: PipelineManager = Depends(get_pipeline_manager)):
+def execute_pipeline(request: ExecutionRequest, background_tasks: BackgroundTasks,
+                     manager: PipelineManager = Depends(get_pipeline_manager)):
+    try:
+        # Start execution in the background; the async engine interleaves runs on the event loop
+        # and offloads synchronous elements to its pool
+        queue = get_default_queue()
+        if queue is not None:
+            # Durable: runs on a standalone worker and survives API restarts
+            execution_id = enqueue_pipeline_execution(queue, request.pipeline_id, request.context,
+                                                      priority=request.priority)
+        else:
+            execution_id = manager.start_execution(request.pipeline_id)
+            background_tasks.add_task(manager.execute_pipeline_async, request.pipeline_id, request.context, execution_id)
+        return {"message": "Pipeline execution started", "pipeline_id": request.pipeline_id,
+                "execution_id": execution_id}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/execute-document")
+async def execute_document(request: ExecutionRequest, manager: PipelineManager = Depends(get_pipeline_manager)):
+    # Runs one document and waits for it. Its elements are micro-batched with the documents
+    # of concurrent requests to the same pipeline (see BatchExecutor.submit)
+    try:
+        context = await manager.submit_document(request.pipeline_id, request.context)
+    except PipelineException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"message": "Pipeline execution finished", "pipeline_id": request.pipeline_id,
+            "processed": bool(context.get('processed_document'))}
+
+
+class BatchExecutionRequest(BaseModel):
+    pipeline_id: str
+    contexts: List[Dict[str, Any]]
+    max_batch_size: int = 32
+
+
+@router.post("/execute-batch")
+async def execute_pipeline_batch(request: BatchExecutionRequest, background_tasks: BackgroundTasks,
+                                 manager: PipelineManager = Depends(get_pipeline_manager)):
     try:
-        # Start execution in the background
-        background_tasks.add_task(manager.execute_pipeline, request.pipeline_id, request.context)
-        return {"message": "Pipeline execution started", "pipeline_id": request.pipeline_id}
+        # Documents move through each element in micro-batches of max_batch_size
+        background_tasks.add_task(manager.execute_pipeline_batch, request.pipeline_id, request.contexts,
+                                  request.max_batch_size)
+        return {"message": "Batch pipeline execution started", "pipeline_id": request.pipeline_id,
+                "documents": len(request.contexts)}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/execution-status/{execution_id}")
-async def get_execution_status(execution_id: str, manager: PipelineManager = Depends(get_pipeline_manager)):
+def get_execution_status(execution_id: str, manager: PipelineManager = Depends(get_pipeline_manager)):
     status = manager.get_execution_status(execution_id)
+    queue = get_default_queue()
+    if status is None and queue is not None:
+        task = queue.get(execution_id)
+        if task is not None:
+            status = {"execution_id": execution_id, "pipeline_id": task["payload"]["pipeline_id"],
+                      "queue_status": task["status"], "attempts": task["attempts"],
+                      "last_error": task["last_error"], **(task["result"] or {})}
     if status is None:
         raise HTTPException(status_code=404, detail="Execution not found")
     return status
@@ -1,32 +1,62 @@
 # rag_system/api/indexer_service.py
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
+from typing import List, Optional
 from pydantic import BaseModel
+from dependency_injector.wiring import inject, Provide
+from rag_system.config import AppContainer
 from rag_system.indexing.indexing_state_manager import IndexingStateManager, IndexingStatus
+from rag_system.indexing.indexing_worker import IndexingWorker, FileIndexer, worker_settings
+from rag_system.indexing.rag_indexer import RAGIndexer
+from rag_system.execution.job_queue import get_default_queue
+from rag_system.execution.worker import enqueue_indexing_job
 
 router = APIRouter()
 
 
 class IndexingRequest(BaseModel):
     file_paths: List[str]
+    incremental: bool = False
 
 
-def get_indexing_state_manager():
-    # This would typically be handled by dependency injection
-    return IndexingStateManager()
+@inject
+def get_indexing_state_manager(manager: IndexingStateManager = Depends(Provide[AppContainer.indexing_state_manager])):
+    return manager
 
 
+@inject
+def get_rag_indexer(indexer: RAGIndexer = Depends(Provide[AppContainer.rag_indexer])):
+    return indexer
+
+
+# The handlers below call the blocking repository, so they are plain functions, which
+# FastAPI runs in its thread pool instead of on the event loop
+
 @router.post("/index")
-async def index_files(request: IndexingRequest, background_tasks: BackgroundTasks,
-                      manager: IndexingStateManager = Depends(get_indexing_state_manager)):
-    job_id = manager.create_indexing_job(request.file_paths)
-    background_tasks.add_task(process_indexing_job, job_id, manager)
+def index_files(request: IndexingRequest, background_tasks: BackgroundTasks,
+                manager: IndexingStateManager = Depends(get_indexing_state_manager),
+                indexer: RAGIndexer = Depends(get_rag_indexer)):
+    job_id = manager.create_indexing_job(request.file_paths, incremental=request.incremental,
+                                         index_epoch=indexer.index_epoch)
+    schedule_indexing_job(job_id, manager, indexer, background_tasks)
     return {"job_id": job_id, "message": "Indexing job created and started"}
 
 
+@router.post("/indexing-jobs/{job_id}/resume")
+def resume_indexing_job(job_id: str, background_tasks: BackgroundTasks,
+                        manager: IndexingStateManager = Depends(get_indexing_state_manager),
+                        indexer: RAGIndexer = Depends(get_rag_indexer)):
+    # Picks up the files still pending after an interrupted run
+    try:
+        pending = len(manager.get_pending_files(job_id))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    schedule_indexing_job(job_id, manager, indexer, background_tasks)
+    return {"job_id": job_id, "pending_files": pending, "message": "Indexing job resumed"}
+
+
 @router.get("/indexing-status/{job_id}")
-async def get_indexing_status(job_id: str, manager: IndexingStateManager = Depends(get_indexing_state_manager)):
+def get_indexing_status(job_id: str, manager: IndexingStateManager = Depends(get_indexing_state_manager)):
     try:
         return manager.get_indexing_status(job_id)
     except ValueError as e:
@@ -34,11 +64,29 @@ async def get_indexing_status(job_id: str, manager: IndexingStateManager = Depen
 
 
 @router.get("/indexing-jobs")
-async def get_all_indexing_jobs(manager: IndexingStateManager = Depends(get_indexing_state_manager)):
-    return manager.get_all_jobs()
+def get_all_indexing_jobs(limit: int = Query(50, ge=1, le=500), cursor: Optional[str] = None,
+                          manager: IndexingStateManager = Depends(get_indexing_state_manager)):
+    # Job summaries, newest first; pass next_cursor back as cursor to get the following page
+    try:
+        return manager.list_jobs(limit, cursor)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {str(e)}")
+
+
+def schedule_indexing_job(job_id: str, manager: IndexingStateManager, indexer: RAGIndexer,
+                          background_tasks: BackgroundTasks):
+    # With a job queue configured (JOB_QUEUE_PATH) the job survives restarts and is spread
+    # over the standalone workers (python -m rag_system.execution.worker), one task per shard
+    queue = get_default_queue()
+    if queue is not None:
+        enqueue_indexing_job(queue, manager, job_id)
+    else:
+        background_tasks.add_task(process_indexing_job, job_id, manager, indexer)
 
 
-async def process_indexing_job(job_id: str, manager: IndexingStateManager):
-    # This function would contain the logic to process each file in the indexing job
-    # It would update the job status as it progresses
-    pass
+async def process_indexing_job(job_id: str, manager: IndexingStateManager, indexer: RAGIndexer):
+    # Indexes the job's pending files with bounded concurrency (INDEXER_MAX_CONCURRENCY),
+    # writing file statuses in batches; see IndexingWorker
+    file_indexer = FileIndexer(indexer)
+    worker = IndexingWorker(manager, file_indexer, persist=file_indexer.persist, **worker_settings())
+    return await worker.run(job_id)
@@ -1,116 +1,113 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import yaml
-import jsonschema
 from rag_system.core.interfaces import IMetadataRepository
+from rag_system.composition.pipeline_schema import PIPELINE_SCHEMAS, PIPELINE_SCHEMA_VERSION, validation_error
+from rag_system.composition.pipeline_store import PipelineStore, pipeline_version
 
 
 class PipelineComposer:
     def __init__(self):
-        self.pipelines_list_key = None
         self.pipeline_schema = None
         self.metadata_repository = None
+        self.pipeline_store = None
 
     def init(self, metadata_repository: IMetadataRepository):
         self.metadata_repository = metadata_repository
         self.pipeline_schema = self._load_pipeline_schema()
-        self.pipelines_list_key = "pipelines_list"
+        self.pipeline_store = PipelineStore(metadata_repository)
 
     def compose_pipeline(self, pipeline_definition: Dict[str, Any]) -> Dict[str, Any]:
-        # Ensure the pipeline has all required components
-        required_components = ['name', 'description', 'elements']
-        for component in required_components:
-            if component not in pipeline_definition:
-                raise ValueError(f"Missing required component: {component}")
-
-        # Validate each pipeline element
-        for element in pipeline_definition['elements']:
-            if 'type' not in element or 'config' not in element:
-                raise ValueError(f"Invalid element structure: {element}")
-
-        # Additional composition logic (e.g., resolving element dependencies)
-
-        # Validate the entire pipeline
-        if not self.validate_pipeline(pipeline_definition):
-            raise ValueError("Invalid pipeline composition")
-
+        # Schema (required components, element structure) and dependency graph in one pass,
+        # skipped for definitions validated before
+        error = validation_error(pipeline_definition)
+        if error is not None:
+            raise ValueError(f"Invalid pipeline composition: {error}")
         return pipeline_definition
 
-    def validate_pipeline(self, pipeline_definition: Dict[str, Any]) -> bool:
-        try:
-            jsonschema.validate(instance=pipeline_definition, schema=self.pipeline_schema)
-            return True
-        except jsonschema.exceptions.ValidationError:
-            return False
+    def validate_pipeline(self, pipeline_definition: Dict[str, Any], version: Optional[str] = None) -> bool:
+        return validation_error(pipeline_definition, version) is None
 
     def persist_pipeline(self, pipeline_id: str, pipeline_definition: Dict[str, Any]) -> bool:
         try:
             if isinstance(pipeline_definition, str):
                 pipeline_definition = self._yaml_to_json(pipeline_definition)
 
-            if not self.validate_pipeline(pipeline_definition):
+            # Hashed once: the hash keys both the validation cache and the stored definition
+            version = pipeline_version(pipeline_definition)
+            if not self.validate_pipeline(pipeline_definition, version):
                 raise ValueError("Invalid pipeline definition")
 
-            success = self.metadata_repository.insert_document(f"pipeline::{pipeline_id}", pipeline_definition)
-            if success:
-                self._update_pipelines_list(pipeline_id, add=True)
-            return success
+            # Stored under its content hash; the pipeline's head pointer moves to the new version
+            return self.pipeline_store.save(pipeline_id, pipeline_definition, version) is not None
         except Exception as e:
             print(f"Error persisting pipeline: {str(e)}")
             return False
 
+    def persist_pipelines(self, pipeline_definitions: Dict[str, Dict[str, Any]]) -> Dict[str, bool]:
+        # Bulk variant of persist_pipeline: invalid definitions are skipped, the rest are
+        # written with two bulk repository calls
+        versions = {}
+        for pipeline_id, pipeline_definition in pipeline_definitions.items():
+            version = pipeline_version(pipeline_definition)
+            if self.validate_pipeline(pipeline_definition, version):
+                versions[pipeline_id] = version
+            else:
+                print(f"Error persisting pipeline {pipeline_id}: Invalid pipeline definition")
+        try:
+            saved = self.pipeline_store.save_many({pipeline_id: pipeline_definitions[pipeline_id]
+                                                   for pipeline_id in versions}, versions)
+        except Exception as e:
+            print(f"Error persisting pipelines: {str(e)}")
+            saved = {}
+        return {pipeline_id: saved.get(pipeline_id) is not None for pipeline_id in pipeline_definitions}
+
+    def get_pipeline_version(self, pipeline_id: str) -> Optional[str]:
+        # One small head read; the version doubles as the pipeline's ETag
+        try:
+            return self.pipeline_store.version(pipeline_id)
+        except Exception as e:
+            print(f"Error reading pipeline version: {str(e)}")
+            return None
+
     def load_pipeline(self, pipeline_id: str) -> str:
         try:
-            pipeline_json = self.metadata_repository.get_document(f"pipeline::{pipeline_id}")
-            return self._json_to_yaml(pipeline_json)
+            pipeline_json = self.pipeline_store.load(pipeline_id)
+            return self._json_to_yaml(pipeline_json) if pipeline_json else ""
         except Exception as e:
             print(f"Error loading pipeline: {str(e)}")
             return ""
 
-    def list_pipelines(self) -> List[str]:
+    def load_pipeline_version(self, pipeline_id: str, version: str) -> str:
         try:
-            pipelines_list = self.metadata_repository.get_document(self.pipelines_list_key)
-            return pipelines_list.get("pipelines", [])
+            pipeline_json = self.pipeline_store.load_version(version)
+            if not pipeline_json:
+                # Heads written before versioning hold the definition inline
+                head = self.pipeline_store.head(pipeline_id)
+                if head and head["version"] == version:
+                    pipeline_json = self.pipeline_store.definition(head)
+            return self._json_to_yaml(pipeline_json) if pipeline_json else ""
+        except Exception as e:
+            print(f"Error loading pipeline: {str(e)}")
+            return ""
+
+    def list_pipelines(self, limit: Optional[int] = None, start_after: Optional[str] = None) -> List[str]:
+        try:
+            return self.pipeline_store.list_ids(limit, start_after)
         except Exception as e:
             print(f"Error listing pipelines: {str(e)}")
             return []
 
-    def _update_pipelines_list(self, pipeline_id: str, add: bool = True):
-        pipelines_list = self.metadata_repository.get_document(self.pipelines_list_key) or {"pipelines": []}
-        if add:
-            if pipeline_id not in pipelines_list["pipelines"]:
-                pipelines_list["pipelines"].append(pipeline_id)
-        else:
-            pipelines_list["pipelines"] = [pid for pid in pipelines_list["pipelines"] if pid != pipeline_id]
-        self.metadata_repository.insert_document(self.pipelines_list_key, pipelines_list)
-
     def _load_pipeline_schema(self) -> dict:
-        # Load the schema from a file or define it inline
-        return {
-            "type": "object",
-            "properties": {
-                "name": {"type": "string"},
-                "description": {"type": "string"},
-                "elements": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "type": {"type": "string"},
-                            "config": {"type": "object"}
-                        },
-                        "required": ["type", "config"]
-                    }
-                }
-            },
-            "required": ["name", "description", "elements"]
-        }
+        return PIPELINE_SCHEMAS[PIPELINE_SCHEMA_VERSION]
 
     @staticmethod
-    def _yaml_to_json(self, yaml_string: str) -> dict:
+    def _yaml_to_json(yaml_string: str) -> dict:
         return yaml.safe_load(yaml_string)
 
     @staticmethod
-    def _json_to_yaml(self, json_dict: dict) -> str:
+    def _json_to_yaml(json_dict: dict) -> str:
+        if isinstance(json_dict, str):
+            return json_dict
         return yaml.dump(json_dict, default_flow_style=False)
     #
     # # Initialize the PipelineComposer
@@ -0,0 +1,136 @@
+# rag_system/composition/pipeline_graph.py
+
+from typing import Dict, Any, List, Optional, Set
+
+
+class PipelineNode:
+    def __init__(self, name: str, element_type: str, config: Optional[Dict[str, Any]] = None,
+                 depends_on: Optional[List[str]] = None, reads: Optional[List[str]] = None,
+                 writes: Optional[List[str]] = None):
+        self.name = name
+        self.type = element_type
+        self.config = config or {}
+        self.depends_on = list(depends_on or [])
+        self.reads = list(reads or [])
+        self.writes = list(writes or [])
+
+
+class PipelineGraph:
+    """Dependency graph of pipeline elements.
+
+    Elements are module paths or dicts with 'type' and optional 'name', 'config',
+    'depends_on', 'reads' and 'writes'. A pipeline where no element declares depends_on
+    keeps the original meaning of a flat list: each element depends on the previous one.
+    In a flat list an element is named after its type by default, and a type used more
+    than once is numbered from its second use on ("type#2", "type#3", ...).
+    """
+
+    def __init__(self, nodes: List[PipelineNode], inputs: Optional[List[str]] = None):
+        self.nodes: Dict[str, PipelineNode] = {}
+        for node in nodes:
+            if node.name in self.nodes:
+                raise ValueError(f"Duplicate pipeline element name: {node.name}")
+            self.nodes[node.name] = node
+        self.inputs = inputs
+
+    @classmethod
+    def from_definition(cls, pipeline_definition: Dict[str, Any]) -> "PipelineGraph":
+        nodes = []
+        unnamed = []
+        for element in pipeline_definition.get('elements', []):
+            if isinstance(element, str):
+                element = {'type': element}
+            nodes.append(PipelineNode(element.get('name', element['type']), element['type'], element.get('config'),
+                                      element.get('depends_on'), element.get('reads'), element.get('writes')))
+            if 'name' not in element:
+                unnamed.append(nodes[-1])
+
+        if not any(node.depends_on for node in nodes):
+            # Graph pipelines refer to elements by name, so only flat ones get generated names
+            cls._number_repeated_types(nodes, unnamed)
+            for previous, node in zip(nodes, nodes[1:]):
+                node.depends_on = [previous.name]
+        return cls(nodes, pipeline_definition.get('inputs'))
+
+    @staticmethod
+    def _number_repeated_types(nodes: List[PipelineNode], unnamed: List[PipelineNode]):
+        unnamed_ids = {id(node) for node in unnamed}
+        used = {node.name for node in nodes if id(node) not in unnamed_ids}
+        for node in unnamed:
+            name, number = node.type, 1
+            while name in used:
+                number += 1
+                name = f"{node.type}#{number}"
+            node.name = name
+            used.add(name)
+
+    @property
+    def dependencies(self) -> Dict[str, List[str]]:
+        return {name: node.depends_on for name, node in self.nodes.items()}
+
+    def topological_order(self) -> List[str]:
+        # Kahn's algorithm; raises on unknown dependencies and cycles
+        for node in self.nodes.values():
+            for dependency in node.depends_on:
+                if dependency not in self.nodes:
+                    raise ValueError(f"Element {node.name} depends on unknown element {dependency}")
+
+        remaining = {name: len(set(node.depends_on)) for name, node in self.nodes.items()}
+        dependents: Dict[str, List[str]] = {name: [] for name in self.nodes}
+        for node in self.nodes.values():
+            for dependency in set(node.depends_on):
+                dependents[dependency].append(node.name)
+
+        order = []
+        ready = [name for name, count in remaining.items() if count == 0]
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            for dependent in dependents[name]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+
+        if len(order) != len(self.nodes):
+            cycle = sorted(name for name, count in remaining.items() if count > 0)
+            raise ValueError(f"Pipeline contains a dependency cycle involving: {', '.join(cycle)}")
+        return order
+
+    def ancestors(self, name: str) -> Set[str]:
+        seen: Set[str] = set()
+        stack = list(self.nodes[name].depends_on)
+        while stack:
+            current = stack.pop()
+            if current not in seen:
+                seen.add(current)
+                stack.extend(self.nodes[current].depends_on)
+        return seen
+
+    def validate(self) -> List[str]:
+        order = self.topological_order()
+        ancestors = {name: self.ancestors(name) for name in order}
+
+        writers: Dict[str, List[str]] = {}
+        for node in self.nodes.values():
+            for key in node.writes:
+                writers.setdefault(key, []).append(node.name)
+
+        # Two writers of the same key must be ordered, otherwise the result depends on timing
+        for key, names in writers.items():
+            for position, first in enumerate(names):
+                for second in names[position + 1:]:
+                    if first not in ancestors[second] and second not in ancestors[first]:
+                        raise ValueError(f"Elements {first} and {second} both write '{key}' on parallel branches")
+
+        for name in order:
+            node = self.nodes[name]
+            for key in node.reads:
+                if any(writer in ancestors[name] for writer in writers.get(key, [])):
+                    continue
+                if key in writers:
+                    raise ValueError(f"Element {name} reads '{key}' but it is written by {', '.join(writers[key])}, "
+                                     f"which is not an upstream dependency")
+                if self.inputs is not None and key not in self.inputs:
+                    raise ValueError(f"Element {name} reads '{key}', which no upstream element writes "
+                                     f"and is not a pipeline input")
+        return order
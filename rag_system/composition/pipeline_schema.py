@@ -0,0 +1,91 @@
+# rag_system/composition/pipeline_schema.py
+
+import functools
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+import jsonschema
+
+from rag_system.composition.pipeline_graph import PipelineGraph
+from rag_system.composition.pipeline_store import pipeline_version
+
+PIPELINE_SCHEMA_VERSION = 1
+
+PIPELINE_SCHEMAS: Dict[int, Dict[str, Any]] = {
+    1: {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string"},
+            "description": {"type": "string"},
+            "inputs": {"type": "array", "items": {"type": "string"}},
+            "elements": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string"},
+                        "type": {"type": "string"},
+                        "config": {"type": "object"},
+                        "depends_on": {"type": "array", "items": {"type": "string"}},
+                        "reads": {"type": "array", "items": {"type": "string"}},
+                        "writes": {"type": "array", "items": {"type": "string"}}
+                    },
+                    "required": ["type", "config"]
+                }
+            }
+        },
+        "required": ["name", "description", "elements"]
+    }
+}
+
+# Results of full validation by (schema version, definition hash); definitions are
+# immutable once hashed, so a cached result never goes stale
+MAX_CACHED_RESULTS = 100_000
+_results: "OrderedDict[Tuple[int, str], Optional[str]]" = OrderedDict()
+_results_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def get_validator(schema_version: int = PIPELINE_SCHEMA_VERSION):
+    # The schema itself is checked once here, not on every validation as jsonschema.validate does
+    schema = PIPELINE_SCHEMAS[schema_version]
+    validator_class = jsonschema.validators.validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema)
+
+
+def schema_error(pipeline_definition: Dict[str, Any], schema_version: int = PIPELINE_SCHEMA_VERSION) -> Optional[str]:
+    error = jsonschema.exceptions.best_match(get_validator(schema_version).iter_errors(pipeline_definition))
+    if error is None:
+        return None
+    location = "/".join(str(part) for part in error.absolute_path)
+    return f"{location}: {error.message}" if location else error.message
+
+
+def validation_error(pipeline_definition: Dict[str, Any], version: Optional[str] = None,
+                     schema_version: int = PIPELINE_SCHEMA_VERSION) -> Optional[str]:
+    """Full validation (schema, then dependency graph); returns None when the definition is valid.
+
+    version is the definition's content hash, when the caller already has it. Definitions
+    seen before return their cached result without being validated again.
+    """
+    key = (schema_version, version or pipeline_version(pipeline_definition))
+    with _results_lock:
+        if key in _results:
+            _results.move_to_end(key)
+            return _results[key]
+
+    error = schema_error(pipeline_definition, schema_version)
+    if error is None:
+        try:
+            # Rejects cycles, unknown dependencies and missing inputs
+            PipelineGraph.from_definition(pipeline_definition).validate()
+        except ValueError as e:
+            error = str(e)
+
+    with _results_lock:
+        _results[key] = error
+        while len(_results) > MAX_CACHED_RESULTS:
+            _results.popitem(last=False)
+    return error
@@ -0,0 +1,130 @@
+# rag_system/composition/pipeline_store.py
+
+import hashlib
+import json
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
+
+from rag_system.core.interfaces import IMetadataRepository
+
+HEAD_PREFIX = "pipeline::"
+DEFINITION_PREFIX = "pipeline_def::"
+
+
+def pipeline_version(definition: Union[str, Dict[str, Any]]) -> str:
+    # Content hash of a definition: equal definitions share a version, any edit yields a new one
+    if isinstance(definition, str):
+        data = definition.encode("utf-8")
+    else:
+        data = json.dumps(definition, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def head_key(pipeline_id: str) -> str:
+    return f"{HEAD_PREFIX}{pipeline_id}"
+
+
+def definition_key(version: str) -> str:
+    return f"{DEFINITION_PREFIX}{version}"
+
+
+class PipelineStore:
+    """Content-addressed pipeline definitions behind small per-pipeline head pointers.
+
+    pipeline_def::{version} holds a definition under its content hash and never changes.
+    pipeline::{id} is the head: {"pipeline_id", "version", "updated_at"}. Checking whether
+    a cached pipeline is current takes one small head read, definitions are safe to cache
+    indefinitely, and pipelines are listed by a prefix scan over the heads.
+
+    Listing relies on the repository's scan_keys. On Couchbase that is a N1QL query on
+    META().id, which needs a primary index or an index on META().id in the bucket.
+
+    Heads written before versioning hold the definition itself. They are read as
+    pipelines whose version is the hash of that inline definition.
+    """
+
+    def __init__(self, metadata_repository: IMetadataRepository):
+        self.metadata_repository = metadata_repository
+
+    def save(self, pipeline_id: str, definition: Dict[str, Any], version: Optional[str] = None) -> Optional[str]:
+        # The definition is written before the head, so a head never points at a missing definition
+        version = version or pipeline_version(definition)
+        if not self.metadata_repository.insert_document(definition_key(version), definition):
+            return None
+        head = {"pipeline_id": pipeline_id, "version": version, "updated_at": datetime.now().isoformat()}
+        if not self.metadata_repository.insert_document(head_key(pipeline_id), head):
+            return None
+        return version
+
+    def save_many(self, definitions: Dict[str, Dict[str, Any]],
+                  versions: Optional[Dict[str, str]] = None) -> Dict[str, Optional[str]]:
+        versions = versions or {pipeline_id: pipeline_version(definition)
+                                for pipeline_id, definition in definitions.items()}
+        written = self.metadata_repository.upsert_many(
+            {definition_key(versions[pipeline_id]): definition for pipeline_id, definition in definitions.items()}
+        )
+        now = datetime.now().isoformat()
+        heads = {head_key(pipeline_id): {"pipeline_id": pipeline_id, "version": version, "updated_at": now}
+                 for pipeline_id, version in versions.items() if written.get(definition_key(version))}
+        saved = self.metadata_repository.upsert_many(heads)
+        return {pipeline_id: version if saved.get(head_key(pipeline_id)) else None
+                for pipeline_id, version in versions.items()}
+
+    def head(self, pipeline_id: str) -> Optional[Dict[str, Any]]:
+        document = self.metadata_repository.get_document(head_key(pipeline_id))
+        if not document:
+            return None
+        if self._is_legacy(document):
+            return {"pipeline_id": pipeline_id, "version": pipeline_version(document), "definition": document}
+        return document
+
+    def version(self, pipeline_id: str) -> Optional[str]:
+        head = self.head(pipeline_id)
+        return head["version"] if head else None
+
+    def definition(self, head: Dict[str, Any]) -> Optional[Union[str, Dict[str, Any]]]:
+        if "definition" in head:
+            return head["definition"]
+        return self.load_version(head["version"])
+
+    def load_version(self, version: str) -> Optional[Union[str, Dict[str, Any]]]:
+        return self.metadata_repository.get_document(definition_key(version)) or None
+
+    def load(self, pipeline_id: str) -> Optional[Union[str, Dict[str, Any]]]:
+        head = self.head(pipeline_id)
+        return self.definition(head) if head else None
+
+    def delete(self, pipeline_id: str) -> bool:
+        # Definitions stay: other pipelines may share them, and running plans may still use them
+        return self.metadata_repository.delete_document(head_key(pipeline_id))
+
+    def list_ids(self, limit: Optional[int] = None, start_after: Optional[str] = None) -> List[str]:
+        keys = self.metadata_repository.scan_keys(HEAD_PREFIX, head_key(start_after) if start_after else None, limit)
+        return [key[len(HEAD_PREFIX):] for key in keys]
+
+    def iter_pipelines(self, batch_size: int = 500) -> Iterator[Tuple[str, str, Union[str, Dict[str, Any]]]]:
+        # Yields (pipeline id, version, definition) in id order, holding one batch at a time:
+        # one key scan, one bulk head read and one bulk definition read per batch
+        start_after = None
+        while True:
+            keys = self.metadata_repository.scan_keys(HEAD_PREFIX, start_after, batch_size)
+            if not keys:
+                return
+            start_after = keys[-1]
+            heads = self.metadata_repository.get_many(keys)
+            for key, document in heads.items():
+                if self._is_legacy(document):
+                    heads[key] = {"version": pipeline_version(document), "definition": document}
+            definition_keys = [definition_key(head["version"]) for head in heads.values() if "definition" not in head]
+            definitions = self.metadata_repository.get_many(list(dict.fromkeys(definition_keys)))
+            for key in keys:
+                head = heads.get(key)
+                if head is None:
+                    continue
+                definition = head.get("definition") or definitions.get(definition_key(head["version"]))
+                if definition:
+                    yield key[len(HEAD_PREFIX):], head["version"], definition
+
+    @staticmethod
+    def _is_legacy(document: Union[str, Dict[str, Any]]) -> bool:
+        return not isinstance(document, dict) or "elements" in document or "version" not in document
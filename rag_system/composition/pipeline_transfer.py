@@ -0,0 +1,133 @@
+# rag_system/composition/pipeline_transfer.py
+
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, AsyncIterator, Iterator, List, Optional, Tuple
+
+from rag_system.composition.pipeline_schema import validation_error
+from rag_system.composition.pipeline_store import PipelineStore, pipeline_version
+
+# Reported import errors are capped so a bad file cannot produce an unbounded response
+MAX_REPORTED_ERRORS = 100
+
+
+def validate_definitions(items: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[str, str, Optional[str]]]:
+    # Module-level so it can run in a worker process: (pipeline id, version, error or None)
+    results = []
+    for pipeline_id, definition in items:
+        version = pipeline_version(definition)
+        results.append((pipeline_id, version, validation_error(definition, version)))
+    return results
+
+
+def export_ndjson(store: PipelineStore, batch_size: int = 500) -> Iterator[bytes]:
+    """Every pipeline as one NDJSON line {"pipeline_id", "version", "definition"}, in id order.
+
+    Reads the store one batch at a time, so memory does not grow with the number of pipelines.
+    """
+    for pipeline_id, version, definition in store.iter_pipelines(batch_size):
+        line = {"pipeline_id": pipeline_id, "version": version, "definition": definition}
+        yield json.dumps(line, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class PipelineImporter:
+    """Streams NDJSON pipeline definitions into a PipelineStore.
+
+    Lines are {"pipeline_id", "definition"} (the export format; "version" is recomputed).
+    They are read batch_size at a time. Each batch is validated across max_workers
+    processes when it has at least parallel_threshold definitions (in a thread
+    otherwise), and the valid ones are written with two bulk repository calls. A later
+    line for the same pipeline id wins.
+    """
+
+    def __init__(self, store: PipelineStore, batch_size: int = 500, parallel_threshold: int = 64,
+                 max_workers: Optional[int] = None):
+        self.store = store
+        self.batch_size = batch_size
+        self.parallel_threshold = parallel_threshold
+        self.max_workers = max_workers or _import_workers()
+
+    async def import_ndjson(self, chunks: AsyncIterator[bytes]) -> Dict[str, Any]:
+        summary = {"imported": 0, "failed": 0, "errors": []}
+        batch: List[Tuple[int, str, Dict[str, Any]]] = []
+        line_number = 0
+        async for line in _iter_lines(chunks):
+            line_number += 1
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+                batch.append((line_number, str(item["pipeline_id"]), item["definition"]))
+            except (ValueError, KeyError, TypeError) as e:
+                self._record_error(summary, line_number, None, f"Malformed line: {str(e)}")
+                continue
+            if len(batch) >= self.batch_size:
+                await self._import_batch(batch, summary)
+                batch = []
+        if batch:
+            await self._import_batch(batch, summary)
+        return summary
+
+    async def _import_batch(self, batch: List[Tuple[int, str, Dict[str, Any]]], summary: Dict[str, Any]):
+        loop = asyncio.get_running_loop()
+        items = [(pipeline_id, definition) for _, pipeline_id, definition in batch]
+        if self.max_workers > 1 and len(items) >= self.parallel_threshold:
+            size = -(-len(items) // self.max_workers)
+            parts = [items[start:start + size] for start in range(0, len(items), size)]
+            results = [result for part in await asyncio.gather(
+                *(loop.run_in_executor(_get_executor(), validate_definitions, part) for part in parts)
+            ) for result in part]
+        else:
+            results = await loop.run_in_executor(None, validate_definitions, items)
+
+        definitions, versions, lines = {}, {}, {}
+        for (line_number, _, definition), (pipeline_id, version, error) in zip(batch, results):
+            if error is not None:
+                self._record_error(summary, line_number, pipeline_id, error)
+                continue
+            definitions[pipeline_id] = definition
+            versions[pipeline_id] = version
+            lines[pipeline_id] = line_number
+
+        saved = await loop.run_in_executor(None, self.store.save_many, definitions, versions)
+        for pipeline_id, version in saved.items():
+            if version is None:
+                self._record_error(summary, lines[pipeline_id], pipeline_id, "Write failed")
+            else:
+                summary["imported"] += 1
+
+    @staticmethod
+    def _record_error(summary: Dict[str, Any], line_number: int, pipeline_id: Optional[str], error: str):
+        summary["failed"] += 1
+        if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+            summary["errors"].append({"line": line_number, "pipeline_id": pipeline_id, "error": error})
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        lines = buffer.split(b"\n")
+        buffer = lines.pop()
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _import_workers() -> int:
+    workers = os.environ.get("PIPELINE_IMPORT_WORKERS")
+    return int(workers) if workers else os.cpu_count() or 1
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    # Shared by every import in the process; jsonschema validation is CPU-bound
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=_import_workers())
+    return _executor
@@ -4,7 +4,10 @@ from dotenv import load_dotenv
 import os
 from dependency_injector import containers, providers
 from rag_system.indexing.indexing_state_manager import IndexingStateManager, IndexingStatus
+from rag_system.indexing.rag_indexer import RAGIndexer
 from rag_system.persistence.couchbase_repo import CouchbaseRepo  # Or your chosen repository implementation
+from rag_system.persistence.sqlite_repo import SQLiteMetadataRepo
+from rag_system.persistence.caching_repo import CachingMetadataRepo
 
 # Load the .env file
 load_dotenv()
@@ -18,14 +21,45 @@ class AppContainer(containers.DeclarativeContainer):
     config.db_username.from_env("DB_USERNAME")
     config.db_password.from_env("DB_PASSWORD")
     config.db_bucket_name.from_env("DB_BUCKET_NAME")
+    # "couchbase" or "sqlite"; the SQLite store needs no external service (single node, CI)
+    config.metadata_backend.from_env("METADATA_BACKEND", default="couchbase")
+    config.sqlite_path.from_env("METADATA_SQLITE_PATH", default="data/metadata.db")
+    config.cache_max_entries.from_env("METADATA_CACHE_MAX_ENTRIES", as_=int, default=10000)
+    config.cache_ttl.from_env("METADATA_CACHE_TTL", as_=float, default=60.0)
+    # Directory of vector segment files shared by the API and the queue workers
+    config.vector_segment_dir.from_env("VECTOR_SEGMENT_DIR", default="")
+    # Strategies every document is indexed into besides the vector store (comma-separated;
+    # empty for the vector store only)
+    config.index_companion_strategies.from_env(
+        "INDEX_COMPANION_STRATEGIES", default="lexical,knowledge_graph",
+        as_=lambda value: [name.strip() for name in value.split(",") if name.strip()]
+    )
 
     # Define other dependencies here
-    metadata_repository = providers.Singleton(
-        CouchbaseRepo,
-        connection_string=config.db_connection_string,
-        username=config.db_username,
-        password=config.db_password,
-        bucket_name=config.db_bucket_name
+    metadata_repository = providers.Selector(
+        config.metadata_backend,
+        couchbase=providers.Singleton(
+            CouchbaseRepo,
+            connection_string=config.db_connection_string,
+            username=config.db_username,
+            password=config.db_password,
+            bucket_name=config.db_bucket_name
+        ),
+        sqlite=providers.Singleton(
+            SQLiteMetadataRepo,
+            path=config.sqlite_path
+        )
+    )
+
+    # Pipeline definitions are content-addressed and never change, so they are cached.
+    # Pipeline heads and job state are written by other processes and always go to the
+    # repository
+    cached_metadata_repository = providers.Singleton(
+        CachingMetadataRepo,
+        repository=metadata_repository,
+        max_entries=config.cache_max_entries,
+        ttl=config.cache_ttl,
+        prefixes=["pipeline_def::"]
     )
 
     indexing_state_manager = providers.Factory(
@@ -33,6 +67,14 @@ class AppContainer(containers.DeclarativeContainer):
         metadata_repository=metadata_repository
     )
 
+    # The indexes live in memory, so every request shares one indexer
+    rag_indexer = providers.Singleton(
+        RAGIndexer,
+        metadata_repository=metadata_repository,
+        segment_directory=config.vector_segment_dir,
+        companion_strategies=config.index_companion_strategies
+    )
+
     # Add other dependencies as needed
 
 
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional
 
 
 class IMetadataRepository(ABC):
@@ -13,4 +13,48 @@ class IMetadataRepository(ABC):
 
     @abstractmethod
     def query_keys(self, prefix: str) -> List[str]:
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def delete_document(self, document_id: str) -> bool:
+        pass
+
+    def scan_keys(self, prefix: str, start_after: Optional[str] = None, limit: Optional[int] = None) -> List[str]:
+        # Keys with the prefix in ascending order, after start_after, at most limit of them.
+        # This default sorts the full query_keys result; ordered stores override it with a
+        # range scan.
+        keys = sorted(key for key in self.query_keys(prefix) if start_after is None or key > start_after)
+        return keys if limit is None else keys[:limit]
+
+    # Bulk operations. These defaults issue one call per document; repositories backed by
+    # a remote store override them to batch round trips.
+
+    def get_many(self, document_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        # Missing documents are left out of the result
+        documents = {}
+        for document_id in document_ids:
+            document = self.get_document(document_id)
+            if document:
+                documents[document_id] = document
+        return documents
+
+    def upsert_many(self, documents: Dict[str, Dict[str, Any]]) -> Dict[str, bool]:
+        return {document_id: self.insert_document(document_id, content) for document_id, content in documents.items()}
+
+    def remove_many(self, document_ids: Iterable[str]) -> Dict[str, bool]:
+        return {document_id: self.delete_document(document_id) for document_id in document_ids}
+
+    def get_counters(self, counter_ids: Iterable[str]) -> Dict[str, int]:
+        return {counter_id: self.get_counter(counter_id) for counter_id in counter_ids}
+
+    def increment_counter(self, counter_id: str, delta: int = 1) -> int:
+        # Adds delta to a numeric counter (created at 0) and returns the new value. This
+        # default is a plain read-modify-write; repositories with native counters override
+        # it to make the update atomic.
+        value = int((self.get_document(counter_id) or {}).get("value", 0)) + delta
+        self.insert_document(counter_id, {"value": value})
+        return value
+
+    def get_counter(self, counter_id: str) -> int:
+        return int((self.get_document(counter_id) or {}).get("value", 0))
+
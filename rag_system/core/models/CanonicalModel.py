@@ -1,9 +1,21 @@
 from rag_system.core.pipeline_element import PipelineElement
-from typing import Dict, Any, List
+from rag_system.core.models.chunking import ChunkStream, StreamingChunker
+from typing import Dict, Any, List, Iterable
 
 
 class CanonicalModel(PipelineElement):
+    def __init__(self):
+        self.chunker = StreamingChunker()
+
     def execute(self, context: Dict[str, Any]) -> bool:
+        # A parser may provide 'parsed_stream' (an iterable of text pieces, e.g. pages) instead
+        # of the full text; its chunks are then produced lazily while the indexer consumes them
+        parsed_stream = context.get('parsed_stream')
+        if parsed_stream is not None:
+            parsed_content = context.get('parsed_content') or {}
+            context['canonical_document'] = self._transform_stream_to_canonical(parsed_stream, parsed_content)
+            return True
+
         parsed_content = context.get('parsed_content')
         if not parsed_content:
             print("No parsed content found in context")
@@ -25,8 +37,17 @@ class CanonicalModel(PipelineElement):
             'chunks': self._chunk_content(parsed_content.get('text', ''))
         }
 
+    def _transform_stream_to_canonical(self, parsed_stream: Iterable[str], parsed_content: Dict[str, Any]) -> Dict[str, Any]:
+        # The full text is never assembled: 'chunks' is chunked lazily on every pass over it
+        return {
+            'id': parsed_content.get('metadata', {}).get('id', 'unknown'),
+            'metadata': parsed_content.get('metadata', {}),
+            'chunks': self._chunk_stream(parsed_stream)
+        }
+
     def _chunk_content(self, content: str) -> List[str]:
-        # Logic to chunk the content
-        # This is a simple implementation that splits by paragraphs
-        return content.split('\n\n')
+        # Sentence- and paragraph-aware chunks bounded by the chunker's token budget
+        return self.chunker.chunk_text(content)
 
+    def _chunk_stream(self, parsed_stream: Iterable[str]) -> Iterable[str]:
+        return ChunkStream(parsed_stream, self.chunker)
@@ -0,0 +1,180 @@
+# rag_system/core/models/chunking.py
+
+import re
+from typing import Iterable, Iterator, List, Tuple, Callable, Optional
+
+# Paragraph breaks, or whitespace after sentence-ending punctuation
+BOUNDARY_PATTERN = re.compile(r"\n[ \t]*\n\s*|(?<=[.!?])\s+")
+WORD_PATTERN = re.compile(r"\S+")
+
+
+def _load_token_counter() -> Callable[[str], int]:
+    # Exact counts with tiktoken when installed, otherwise ~4 characters per token
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return lambda text: len(encoding.encode(text, disallowed_special=()))
+    except Exception:
+        return lambda text: len(text) // 4 + 1
+
+
+class StreamingChunker:
+    """Incremental, token-bounded chunker.
+
+    Consumes text in arbitrary pieces (pages, file blocks) and yields chunks as soon as
+    they are complete, so memory is bounded by one chunk plus one unfinished sentence
+    rather than by the document. Chunks are built from whole sentences, end early at a
+    paragraph break once min_fill of the budget is used, and repeat up to
+    overlap_tokens of trailing sentences from the previous chunk. Text with no
+    boundaries at all (e.g. minified logs) is cut at whitespace.
+    """
+
+    def __init__(self, max_tokens: int = 256, overlap_tokens: int = 32, min_fill: float = 0.5,
+                 token_counter: Optional[Callable[[str], int]] = None):
+        if overlap_tokens >= max_tokens:
+            raise ValueError("overlap_tokens must be smaller than max_tokens")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.min_fill = min_fill
+        self.count_tokens = token_counter or _load_token_counter()
+        self._default_counter = token_counter is None
+        # An unfinished sentence longer than this is cut without waiting for a boundary
+        self.max_buffer_chars = max_tokens * 16
+
+    def __getstate__(self):
+        # The default token counter is a closure; it is loaded again after unpickling
+        state = dict(self.__dict__)
+        if self._default_counter:
+            del state["count_tokens"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self._default_counter:
+            self.count_tokens = _load_token_counter()
+
+    def chunk_text(self, text: str) -> List[str]:
+        return list(self.chunk_stream([text]))
+
+    def chunk_stream(self, pieces: Iterable[str]) -> Iterator[str]:
+        packer = _ChunkPacker(self)
+        buffer = ""
+
+        for piece in pieces:
+            buffer += piece
+            complete, buffer = self._split_units(buffer, final=False)
+            if len(buffer) > self.max_buffer_chars:
+                cut = buffer.rfind(" ", 0, self.max_buffer_chars)
+                cut = cut if cut > 0 else self.max_buffer_chars
+                complete.append((buffer[:cut], " "))
+                buffer = buffer[cut:].lstrip()
+            for unit, separator in complete:
+                yield from packer.add(unit, separator)
+
+        complete, _ = self._split_units(buffer, final=True)
+        for unit, separator in complete:
+            yield from packer.add(unit, separator)
+        yield from packer.flush()
+
+    def _split_units(self, buffer: str, final: bool) -> Tuple[List[Tuple[str, str]], str]:
+        # Splits off every complete sentence; the unfinished tail stays in the buffer
+        units = []
+        start = 0
+        for match in BOUNDARY_PATTERN.finditer(buffer):
+            if match.end() == len(buffer) and not final:
+                # The boundary might continue in the next piece (e.g. "\n" then "\n")
+                break
+            text = buffer[start:match.start()].strip()
+            if text:
+                units.append((text, "\n\n" if "\n" in match.group(0) else " "))
+            start = match.end()
+        if final:
+            text = buffer[start:].strip()
+            if text:
+                units.append((text, "\n\n"))
+            return units, ""
+        return units, buffer[start:]
+
+    def _split_long(self, text: str) -> Iterator[str]:
+        words = WORD_PATTERN.findall(text)
+        window: List[str] = []
+        total = 0
+        for word in words:
+            tokens = self.count_tokens(word)
+            if window and total + tokens > self.max_tokens:
+                yield " ".join(window)
+                window, total = [], 0
+            window.append(word)
+            total += tokens
+        if window:
+            yield " ".join(window)
+
+
+class ChunkStream:
+    """Lazily chunked text that can be iterated more than once.
+
+    Every iteration chunks pieces again from the start, so several consumers (e.g. parallel
+    pipeline branches) each get every chunk, and the stream can be pickled for a process
+    pool when pieces can. pieces should itself be re-iterable (see parsers.TextStream); a
+    one-shot iterator can only be read once and a second pass raises.
+    """
+
+    def __init__(self, pieces: Iterable[str], chunker: StreamingChunker):
+        self.pieces = pieces
+        self.chunker = chunker
+        self._single_pass = iter(pieces) is pieces
+        self._consumed = False
+
+    def __iter__(self) -> Iterator[str]:
+        if self._single_pass:
+            if self._consumed:
+                raise RuntimeError("The chunks of a single-pass text stream can only be read once")
+            self._consumed = True
+        return self.chunker.chunk_stream(self.pieces)
+
+
+class _ChunkPacker:
+    # Packs sentences into chunks for one StreamingChunker.chunk_stream call
+    def __init__(self, chunker: StreamingChunker):
+        self.chunker = chunker
+        self.units: List[Tuple[str, int, str]] = []
+        self.total = 0
+        self.fresh = False  # whether units hold anything beyond the carried-over overlap
+
+    def add(self, text: str, separator: str) -> Iterator[str]:
+        chunker = self.chunker
+        tokens = chunker.count_tokens(text)
+        if tokens > chunker.max_tokens:
+            yield from self.flush()
+            self.units, self.total = [], 0
+            yield from chunker._split_long(text)
+            return
+
+        if self.total + tokens > chunker.max_tokens:
+            yield from self._emit()
+            if self.total + tokens > chunker.max_tokens:
+                self.units, self.total = [], 0
+
+        self.units.append((text, tokens, separator))
+        self.total += tokens
+        self.fresh = True
+        if separator == "\n\n" and self.total >= chunker.max_tokens * chunker.min_fill:
+            yield from self._emit()
+
+    def flush(self) -> Iterator[str]:
+        if self.fresh:
+            yield self._join()
+        self.fresh = False
+
+    def _emit(self) -> Iterator[str]:
+        yield from self.flush()
+        kept, total = [], 0
+        for unit in reversed(self.units):
+            if total + unit[1] > self.chunker.overlap_tokens:
+                break
+            kept.insert(0, unit)
+            total += unit[1]
+        self.units, self.total = kept, total
+
+    def _join(self) -> str:
+        return "".join(text + separator for text, _, separator in self.units).strip()
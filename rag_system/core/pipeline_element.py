@@ -1,8 +1,21 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 
 class PipelineElement(ABC):
+    # Stateless elements are instantiated once per compiled pipeline plan and shared by
+    # concurrent runs; elements that keep per-run state set this to False
+    stateless = True
+
     @abstractmethod
     def execute(self, context: Dict[str, Any]) -> bool:
-        pass
\ No newline at end of file
+        pass
+
+    def execute_batch(self, contexts: List[Dict[str, Any]]) -> List[bool]:
+        # Elements that get cheaper per item in bulk (embedding, parsing, DB writes) override this
+        return [self.execute(context) for context in contexts]
+
+
+def supports_batch(element: Any) -> bool:
+    execute_batch = getattr(type(element), 'execute_batch', None)
+    return execute_batch is not None and execute_batch is not PipelineElement.execute_batch
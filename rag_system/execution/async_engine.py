@@ -0,0 +1,221 @@
+# rag_system/execution/async_engine.py
+
+import asyncio
+import logging
+import os
+import uuid
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from rag_system.core.exceptions import PipelineException
+
+
+def _execute_in_process(element, context: Dict[str, Any]) -> Tuple[Any, Dict[str, Any]]:
+    # A process works on a pickled copy of the context, so the copy is shipped back and merged
+    result = element.execute(context)
+    return result, context
+
+
+def _execute_batch_in_process(element, contexts: List[Dict[str, Any]]) -> Tuple[List[Any], List[Dict[str, Any]]]:
+    results = element.execute_batch(contexts)
+    return results, contexts
+
+
+class AsyncPipelineEngine:
+    """Runs pipeline elements on the event loop.
+
+    Elements with `async def execute` are awaited directly; synchronous elements are
+    offloaded to a thread or process pool so a slow parser never blocks the loop. Many
+    runs interleave on one worker, bounded by max_concurrent_runs. Within a run, elements
+    form a dependency graph and independent branches execute concurrently, at most
+    max_concurrency_per_run at a time.
+    """
+
+    def __init__(self, executor: str = "thread", max_workers: Optional[int] = None,
+                 max_concurrent_runs: int = 64, max_concurrency_per_run: int = 4, max_tracked_runs: int = 10000):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor type: {executor}")
+        self.logger = logging.getLogger(__name__)
+        self.executor_type = executor
+        self.max_workers = max_workers
+        self.max_concurrent_runs = max_concurrent_runs
+        self.max_concurrency_per_run = max_concurrency_per_run
+        self.max_tracked_runs = max_tracked_runs
+        self.runs: Dict[str, Dict[str, Any]] = {}
+        self._executor: Optional[Executor] = None
+        self._run_semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline")
+        return self._executor
+
+    def new_run(self, pipeline_id: str, run_id: Optional[str] = None) -> str:
+        run_id = run_id or str(uuid.uuid4())
+        if len(self.runs) >= self.max_tracked_runs:
+            # Forget the oldest finished runs (dicts keep insertion order)
+            finished = [key for key, value in self.runs.items() if "finished_at" in value]
+            for key in finished[:max(1, len(finished) // 2)]:
+                del self.runs[key]
+        self.runs[run_id] = {
+            "execution_id": run_id,
+            "pipeline_id": pipeline_id,
+            "status": "pending",
+            "created_at": datetime.utcnow().isoformat()
+        }
+        return run_id
+
+    def fail_run(self, pipeline_id: str, error: str, run_id: Optional[str] = None) -> str:
+        # For runs that fail before run() starts them, e.g. when the pipeline cannot be loaded
+        if run_id is None or run_id not in self.runs:
+            run_id = self.new_run(pipeline_id, run_id)
+        run = self.runs[run_id]
+        run["status"] = "failed"
+        run["error"] = error
+        run["finished_at"] = datetime.utcnow().isoformat()
+        return run_id
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        return self.runs.get(run_id)
+
+    async def run(self, pipeline_id: str, elements: List[Tuple[str, Any]], context: Dict[str, Any],
+                  run_id: Optional[str] = None, dependencies: Optional[Dict[str, List[str]]] = None,
+                  writes: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
+        # Without dependencies the elements form a chain and run strictly in order
+        if dependencies is None:
+            dependencies = {name: [previous] for (previous, _), (name, _) in zip(elements, elements[1:])}
+        if run_id is None or run_id not in self.runs:
+            run_id = self.new_run(pipeline_id, run_id)
+        run = self.runs[run_id]
+
+        if self._run_semaphore is None:
+            self._run_semaphore = asyncio.Semaphore(self.max_concurrent_runs)
+        async with self._run_semaphore:
+            run["status"] = "running"
+            run["started_at"] = datetime.utcnow().isoformat()
+            try:
+                await self._run_graph(elements, dependencies, writes or {}, context, run)
+                if run["status"] == "running":
+                    run["status"] = "completed"
+            except Exception as e:
+                run["status"] = "failed"
+                run["error"] = str(e)
+                raise
+            finally:
+                run["finished_at"] = datetime.utcnow().isoformat()
+        return context
+
+    async def _run_graph(self, elements: List[Tuple[str, Any]], dependencies: Dict[str, List[str]],
+                         writes: Dict[str, List[str]], context: Dict[str, Any], run: Dict[str, Any]):
+        # Starts every element whose dependencies have completed, so independent branches run
+        # concurrently (up to max_concurrency_per_run). An element that returns False or raises
+        # PipelineException stops its branch: everything downstream of it is skipped.
+        semaphore = asyncio.Semaphore(self.max_concurrency_per_run)
+        instances = dict(elements)
+        waiting = {name: set(dependencies.get(name, [])) for name, _ in elements}
+        states: Dict[str, str] = {}
+        running: Dict[asyncio.Task, str] = {}
+        run["elements"] = states
+
+        async def execute(name: str):
+            async with semaphore:
+                self.logger.info(f"Executing {name}")
+                states[name] = "running"
+                return await self.execute_element(instances[name], context, writes.get(name))
+
+        try:
+            while waiting or running:
+                finished = {name for name, state in states.items() if state != "running"}
+                for name in [name for name, deps in waiting.items() if deps <= finished]:
+                    deps = waiting.pop(name)
+                    if all(states[dep] == "completed" for dep in deps):
+                        running[asyncio.ensure_future(execute(name))] = name
+                    else:
+                        states[name] = "skipped"
+                if not running:
+                    if waiting:
+                        raise PipelineException("Pipeline dependencies cannot be satisfied",
+                                                details={"waiting": sorted(waiting)})
+                    break
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    try:
+                        should_continue = task.result()
+                    except PipelineException as pex:
+                        self.logger.exception(pex)
+                        states[name] = "stopped"
+                        run["status"] = "stopped"
+                        run["error"] = str(pex)
+                        continue
+                    except Exception as e:
+                        self.logger.error(f"Error executing {name}: {str(e)}")
+                        states[name] = "failed"
+                        raise
+                    if should_continue is False:
+                        self.logger.info(f"Pipeline branch stopped by module {name}")
+                        states[name] = "stopped"
+                        run["status"] = "stopped"
+                    else:
+                        states[name] = "completed"
+        finally:
+            for task in running:
+                task.cancel()
+
+    async def execute_element(self, element, context: Dict[str, Any], writes: Optional[List[str]] = None) -> Any:
+        if not hasattr(element, "execute"):
+            self.logger.warning(f"Module {type(element).__name__} does not have an 'execute' method")
+            return None
+        if asyncio.iscoroutinefunction(element.execute):
+            return await element.execute(context)
+        loop = asyncio.get_running_loop()
+        if self.executor_type == "process":
+            result, updated_context = await loop.run_in_executor(self.executor, _execute_in_process, element, context)
+            # Merge back only what this element wrote so parallel branches don't clobber each other
+            if writes is not None:
+                context.update({key: updated_context[key] for key in writes if key in updated_context})
+            else:
+                context.update({key: value for key, value in updated_context.items()
+                                if key not in context or context[key] != value})
+            return result
+        return await loop.run_in_executor(self.executor, element.execute, context)
+
+    async def execute_element_batch(self, element, contexts: List[Dict[str, Any]]) -> List[Any]:
+        if asyncio.iscoroutinefunction(element.execute_batch):
+            return await element.execute_batch(contexts)
+        loop = asyncio.get_running_loop()
+        if self.executor_type == "process":
+            results, updated_contexts = await loop.run_in_executor(self.executor, _execute_batch_in_process,
+                                                                   element, contexts)
+            for context, updated_context in zip(contexts, updated_contexts):
+                context.update(updated_context)
+            return results
+        return await loop.run_in_executor(self.executor, element.execute_batch, contexts)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+_default_engine: Optional[AsyncPipelineEngine] = None
+
+
+def get_default_engine() -> AsyncPipelineEngine:
+    # One engine per worker process so runs from every request share the pool and run registry
+    global _default_engine
+    if _default_engine is None:
+        max_workers = os.environ.get("PIPELINE_MAX_WORKERS")
+        _default_engine = AsyncPipelineEngine(
+            executor=os.environ.get("PIPELINE_EXECUTOR", "thread"),
+            max_workers=int(max_workers) if max_workers else None,
+            max_concurrent_runs=int(os.environ.get("PIPELINE_MAX_CONCURRENT_RUNS", "64")),
+            max_concurrency_per_run=int(os.environ.get("PIPELINE_MAX_CONCURRENCY_PER_RUN", "4"))
+        )
+    return _default_engine
@@ -0,0 +1,95 @@
+# rag_system/execution/batch_executor.py
+
+import asyncio
+import logging
+from typing import Dict, Any, List, Tuple
+
+from rag_system.core.exceptions import PipelineException
+from rag_system.core.pipeline_element import supports_batch
+from rag_system.execution.async_engine import AsyncPipelineEngine
+
+
+class BatchExecutor:
+    """Runs pipeline elements over many documents in micro-batches.
+
+    Elements that implement execute_batch receive up to max_batch_size contexts per
+    call; other elements fall back to per-item execute, run concurrently on the engine.
+    run() pushes a known set of contexts through a pipeline stage by stage. submit()
+    coalesces single documents from concurrent callers: a batch is flushed when it
+    reaches max_batch_size or when max_wait seconds have passed since its first item.
+    Submissions are only batched with others for the same element of the same pipeline
+    version, so every context in a batch runs through the element it was submitted to.
+    """
+
+    def __init__(self, engine: AsyncPipelineEngine, max_batch_size: int = 32, max_wait: float = 0.05):
+        self.logger = logging.getLogger(__name__)
+        self.engine = engine
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending: Dict[Tuple[str, str], List[Tuple[Any, Dict[str, Any], asyncio.Future]]] = {}
+        self._timers: Dict[Tuple[str, str], asyncio.TimerHandle] = {}
+
+    async def run(self, elements: List[Tuple[str, Any]], contexts: List[Dict[str, Any]]) -> List[bool]:
+        # Returns, per context, whether it made it through every element
+        active = list(range(len(contexts)))
+        for name, element in elements:
+            if not active:
+                break
+            self.logger.info(f"Executing {name} on {len(active)} documents")
+            results = await self.run_stage(name, element, [contexts[i] for i in active])
+            active = [i for i, result in zip(active, results) if result is not False]
+        completed = set(active)
+        return [i in completed for i in range(len(contexts))]
+
+    async def run_stage(self, name: str, element, contexts: List[Dict[str, Any]]) -> List[Any]:
+        results: List[Any] = []
+        for start in range(0, len(contexts), self.max_batch_size):
+            results.extend(await self._execute_batch(name, element, contexts[start:start + self.max_batch_size]))
+        return results
+
+    async def submit(self, pipeline_key: str, name: str, element, context: Dict[str, Any]) -> Any:
+        # pipeline_key identifies the pipeline version (e.g. "<pipeline id>@<version>")
+        key = (pipeline_key, name)
+        future = asyncio.get_running_loop().create_future()
+        pending = self._pending.setdefault(key, [])
+        pending.append((element, context, future))
+        if len(pending) >= self.max_batch_size:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = asyncio.get_running_loop().call_later(self.max_wait, self._flush, key)
+        return await future
+
+    def _flush(self, key: Tuple[str, str]):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, [])
+        if batch:
+            asyncio.ensure_future(self._run_submitted(key[1], batch))
+
+    async def _run_submitted(self, name: str, batch: List[Tuple[Any, Dict[str, Any], asyncio.Future]]):
+        # Every element in the batch is an instance of the same plan element, so any one runs it
+        element = batch[0][0]
+        try:
+            results = await self._execute_batch(name, element, [context for _, context, _ in batch])
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _execute_batch(self, name: str, element, contexts: List[Dict[str, Any]]) -> List[Any]:
+        if supports_batch(element):
+            return await self.engine.execute_element_batch(element, contexts)
+
+        async def execute_one(context):
+            try:
+                return await self.engine.execute_element(element, context)
+            except PipelineException as pex:
+                self.logger.exception(pex)
+                return False
+
+        return list(await asyncio.gather(*(execute_one(context) for context in contexts)))
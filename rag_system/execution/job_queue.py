@@ -0,0 +1,180 @@
+# rag_system/execution/job_queue.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Any, List, Optional
+
+QUEUED = "queued"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobQueue:
+    """Durable task queue in a local SQLite database (WAL), shared by worker processes.
+
+    Workers lease the highest-priority available task for lease_seconds and must
+    heartbeat to keep it. A task whose lease expires (its worker died) becomes available
+    again. Failed tasks are retried with exponential backoff until max_attempts
+    attempts have been used, then marked failed. Leasing runs in an IMMEDIATE
+    transaction, so two processes never lease the same task.
+    """
+
+    def __init__(self, path: str, retry_delay: float = 5.0, max_retry_delay: float = 300.0):
+        self.path = path
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                available_at REAL NOT NULL,
+                lease_owner TEXT,
+                lease_expires REAL,
+                last_error TEXT,
+                result TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS tasks_available ON tasks (status, priority DESC, available_at, created_at)"
+        )
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], priority: int = 0, max_attempts: int = 3,
+                task_id: Optional[str] = None) -> str:
+        # Higher priority tasks are leased first; ties go to the oldest task
+        task_id = task_id or str(uuid.uuid4())
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO tasks (id, kind, payload, priority, status, max_attempts, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (task_id, kind, json.dumps(payload), priority, QUEUED, max_attempts, now, now, now)
+            )
+        return task_id
+
+    def lease(self, worker_id: str, lease_seconds: float = 60.0, kinds: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        kind_filter = f" AND kind IN ({','.join('?' * len(kinds))})" if kinds else ""
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                # Expired leases count as failed attempts
+                self._connection.execute(
+                    "UPDATE tasks SET status = ?, last_error = 'Lease expired', lease_owner = NULL, updated_at = ? "
+                    "WHERE status = ? AND lease_expires < ? AND attempts >= max_attempts",
+                    (FAILED, now, LEASED, now)
+                )
+                self._connection.execute(
+                    "UPDATE tasks SET status = ?, last_error = 'Lease expired', lease_owner = NULL, updated_at = ? "
+                    "WHERE status = ? AND lease_expires < ?",
+                    (QUEUED, now, LEASED, now)
+                )
+                row = self._connection.execute(
+                    "SELECT id FROM tasks WHERE status = ? AND available_at <= ?" + kind_filter +
+                    " ORDER BY priority DESC, available_at, created_at LIMIT 1",
+                    (QUEUED, now, *(kinds or []))
+                ).fetchone()
+                if row is None:
+                    self._connection.execute("COMMIT")
+                    return None
+                self._connection.execute(
+                    "UPDATE tasks SET status = ?, attempts = attempts + 1, lease_owner = ?, lease_expires = ?, updated_at = ? "
+                    "WHERE id = ?",
+                    (LEASED, worker_id, now + lease_seconds, now, row[0])
+                )
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+        return self.get(row[0])
+
+    def heartbeat(self, task_id: str, worker_id: str, lease_seconds: float = 60.0) -> bool:
+        # Returns False if the lease was lost (expired and taken over), so the worker can stop
+        now = time.time()
+        with self._lock:
+            cursor = self._connection.execute(
+                "UPDATE tasks SET lease_expires = ?, updated_at = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+                (now + lease_seconds, now, task_id, LEASED, worker_id)
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, task_id: str, worker_id: str, result: Optional[Dict[str, Any]] = None) -> bool:
+        with self._lock:
+            cursor = self._connection.execute(
+                "UPDATE tasks SET status = ?, result = ?, lease_owner = NULL, updated_at = ? "
+                "WHERE id = ? AND status = ? AND lease_owner = ?",
+                (DONE, json.dumps(result) if result is not None else None, time.time(), task_id, LEASED, worker_id)
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, task_id: str, worker_id: str, error: str) -> bool:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT attempts, max_attempts FROM tasks WHERE id = ? AND status = ? AND lease_owner = ?",
+                (task_id, LEASED, worker_id)
+            ).fetchone()
+            if row is None:
+                return False
+            attempts, max_attempts = row
+            if attempts >= max_attempts:
+                status, available_at = FAILED, now
+            else:
+                status = QUEUED
+                available_at = now + min(self.max_retry_delay, self.retry_delay * 2 ** (attempts - 1))
+            self._connection.execute(
+                "UPDATE tasks SET status = ?, available_at = ?, last_error = ?, lease_owner = NULL, updated_at = ? "
+                "WHERE id = ?",
+                (status, available_at, error, now, task_id)
+            )
+        return True
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            cursor = self._connection.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
+            row = cursor.fetchone()
+            columns = [column[0] for column in cursor.description]
+        if row is None:
+            return None
+        task = dict(zip(columns, row))
+        task["payload"] = json.loads(task["payload"])
+        task["result"] = json.loads(task["result"]) if task["result"] else None
+        return task
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._connection.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+_default_queue: Optional[JobQueue] = None
+
+
+def get_default_queue() -> Optional[JobQueue]:
+    # Work is queued for standalone workers when JOB_QUEUE_PATH is set; otherwise the API
+    # keeps running it in-process
+    global _default_queue
+    if _default_queue is None and os.environ.get("JOB_QUEUE_PATH"):
+        _default_queue = JobQueue(os.environ["JOB_QUEUE_PATH"])
+    return _default_queue
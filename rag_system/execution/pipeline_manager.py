@@ -1,39 +1,71 @@
-import yaml
-import importlib
+import asyncio
 from threading import local
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional, List, Tuple
 
 from dependency_injector.wiring import inject, Provide
 
 from rag_system.core.interfaces import IMetadataRepository
 from rag_system.indexing.rag_indexer import RAGIndexer
 from rag_system.core.exceptions import PipelineException
+from rag_system.composition.pipeline_store import PipelineStore
+from rag_system.execution.async_engine import AsyncPipelineEngine, get_default_engine
+from rag_system.execution.batch_executor import BatchExecutor
+from rag_system.execution.pipeline_plan import PipelinePlan, PlanCache, get_default_plan_cache
+
+_default_batch_executor: Optional[BatchExecutor] = None
+
+
+def get_default_batch_executor(engine: AsyncPipelineEngine) -> BatchExecutor:
+    # Shared by every manager in the process so concurrent submissions land in the same batches
+    global _default_batch_executor
+    if _default_batch_executor is None:
+        _default_batch_executor = BatchExecutor(engine)
+    return _default_batch_executor
+
 
 class PipelineManager:
     @inject
-    def __init__(self, metadata_repository: IMetadataRepository, rag_indexer: RAGIndexer):
+    def __init__(self, metadata_repository: IMetadataRepository, rag_indexer: RAGIndexer,
+                 engine: Optional[AsyncPipelineEngine] = None, plan_cache: Optional[PlanCache] = None):
         self.logger = logging.getLogger(__name__)
         self.metadata_repository = metadata_repository
         self.rag_indexer = rag_indexer
+        self.engine = engine or get_default_engine()
+        self.plan_cache = plan_cache or get_default_plan_cache()
+        self.pipeline_store = PipelineStore(metadata_repository)
         self.thread_context = local()
-        self.module_cache = {}
 
     def load_pipeline(self, pipeline_id: str) -> Dict[str, Any]:
-        pipeline_yaml = self.metadata_repository.get_document(f"pipeline::{pipeline_id}")
-        if not pipeline_yaml:
+        return self.load_plan(pipeline_id).definition
+
+    def load_plan(self, pipeline_id: str) -> PipelinePlan:
+        # Plans are shared by every manager in the process. A known version costs one head
+        # read and skips fetching the definition, YAML parsing, imports and validation
+        head = self.pipeline_store.head(pipeline_id)
+        if not head:
             raise PipelineException(f"Pipeline with id {pipeline_id} not found")
-        return yaml.safe_load(pipeline_yaml)
+
+        def load():
+            definition = self.pipeline_store.definition(head)
+            if not definition:
+                raise PipelineException(f"Definition {head['version']} of pipeline {pipeline_id} not found")
+            return definition
+
+        try:
+            return self.plan_cache.get_or_compile(pipeline_id, head["version"], load)
+        except (ValueError, ImportError, AttributeError) as e:
+            raise PipelineException(f"Pipeline {pipeline_id} cannot be compiled: {str(e)}")
 
     def execute_pipeline(self, pipeline_id: str, context: Dict[str, Any]):
         self.thread_context.data = context.copy()
-        pipeline_config = self.load_pipeline(pipeline_id)
+        plan = self.load_plan(pipeline_id)
 
-        for module_path in pipeline_config.get('elements', []):
+        for name, module in plan.instantiate():
+            module_path = plan.types[name]
             self.logger.info(f"Executing {module_path}")
 
             try:
-                module = self._import_module(module_path)
                 if hasattr(module, 'execute'):
                     should_continue = module.execute(self.thread_context.data)
                     if should_continue is False:
@@ -52,17 +84,66 @@ class PipelineManager:
         # After pipeline execution, index the processed document
         self._index_processed_document()
 
-    def _import_module(self, module_path):
-        if module_path not in self.module_cache:
-            module_parts = module_path.split('.')
-            class_name = module_parts[-1]
-            module_name = '.'.join(module_parts[:-1])
+    async def execute_pipeline_async(self, pipeline_id: str, context: Dict[str, Any],
+                                     execution_id: Optional[str] = None) -> Dict[str, Any]:
+        # Each run gets its own context, so many runs can interleave on the same event loop.
+        # Loading the plan reads the repository and may compile it, so it runs off the loop; if
+        # it fails the run is recorded as failed rather than left pending
+        run_context = context.copy()
+        try:
+            plan, elements = await asyncio.get_running_loop().run_in_executor(None, self._prepare_run, pipeline_id)
+        except Exception as e:
+            self.engine.fail_run(pipeline_id, str(e), execution_id)
+            raise
+
+        await self.engine.run(pipeline_id, elements, run_context, execution_id, plan.dependencies, plan.writes)
+
+        if run_context.get('processed_document'):
+            await self._index_processed_documents([run_context])
+        else:
+            self.logger.warning("No processed document found in context for indexing")
+        return run_context
+
+    async def execute_pipeline_batch(self, pipeline_id: str, contexts: List[Dict[str, Any]],
+                                     max_batch_size: int = 32) -> List[Dict[str, Any]]:
+        # Pushes many documents through the pipeline stage by stage (in dependency order),
+        # giving execute_batch elements up to max_batch_size documents per call
+        run_contexts = [context.copy() for context in contexts]
+        _, elements = await asyncio.get_running_loop().run_in_executor(None, self._prepare_run, pipeline_id)
+        completed = await BatchExecutor(self.engine, max_batch_size).run(elements, run_contexts)
+        await self._index_processed_documents([c for c, ok in zip(run_contexts, completed) if ok])
+        return run_contexts
+
+    async def submit_document(self, pipeline_id: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        # Single-document entry point whose stages are coalesced with concurrent submissions
+        # into micro-batches (see BatchExecutor.submit)
+        run_context = context.copy()
+        plan, elements = await asyncio.get_running_loop().run_in_executor(None, self._prepare_run, pipeline_id)
+        pipeline_key = f"{plan.pipeline_id}@{plan.version}"
+        for name, element in elements:
+            if await get_default_batch_executor(self.engine).submit(pipeline_key, name, element, run_context) is False:
+                self.logger.info("Pipeline execution stopped by module")
+                return run_context
+        await self._index_processed_documents([run_context])
+        return run_context
+
+    def _prepare_run(self, pipeline_id: str) -> Tuple[PipelinePlan, List[Tuple[str, Any]]]:
+        plan = self.load_plan(pipeline_id)
+        return plan, plan.instantiate()
+
+    async def _index_processed_documents(self, contexts: List[Dict[str, Any]]):
+        documents = [context['processed_document'] for context in contexts if context.get('processed_document')]
+        loop = asyncio.get_running_loop()
+        for document in documents:
+            success = await loop.run_in_executor(None, self.rag_indexer.index_document, document)
+            if not success:
+                self.logger.error(f"Failed to index the processed document {document.get('id')}")
 
-            module = importlib.import_module(module_name)
-            class_ = getattr(module, class_name)
-            self.module_cache[module_path] = class_()
+    def start_execution(self, pipeline_id: str) -> str:
+        return self.engine.new_run(pipeline_id)
 
-        return self.module_cache[module_path]
+    def get_execution_status(self, execution_id: str) -> Optional[Dict[str, Any]]:
+        return self.engine.get_run(execution_id)
 
     def _index_processed_document(self):
         document = self.thread_context.data.get('processed_document')
@@ -0,0 +1,113 @@
+# rag_system/execution/pipeline_plan.py
+
+import importlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Callable, List, Optional, Tuple, Union
+
+import yaml
+
+from rag_system.composition.pipeline_graph import PipelineGraph
+from rag_system.composition.pipeline_store import pipeline_version
+
+
+def resolve_element_class(module_path: str) -> type:
+    module_name, _, class_name = module_path.rpartition('.')
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def is_stateless(element_class: type) -> bool:
+    return getattr(element_class, "stateless", True)
+
+
+class PipelinePlan:
+    """A pipeline definition compiled for execution.
+
+    Holds the parsed definition, the validated dependency order, the element classes
+    and one shared instance of every stateless element. Elements whose class sets
+    stateless = False get a fresh instance per run from instantiate().
+    """
+
+    def __init__(self, pipeline_id: str, version: str, definition: Dict[str, Any]):
+        self.pipeline_id = pipeline_id
+        self.version = version
+        self.definition = definition
+        graph = PipelineGraph.from_definition(definition)
+        self.order: List[str] = graph.validate()
+        self.types: Dict[str, str] = {name: graph.nodes[name].type for name in self.order}
+        self.dependencies: Dict[str, List[str]] = graph.dependencies
+        self.writes: Dict[str, List[str]] = {name: node.writes for name, node in graph.nodes.items() if node.writes}
+        self.element_classes: Dict[str, type] = {name: resolve_element_class(self.types[name]) for name in self.order}
+        self._shared: Dict[str, Any] = {}
+        for name, element_class in self.element_classes.items():
+            if is_stateless(element_class):
+                self._shared[name] = element_class()
+
+    @classmethod
+    def compile(cls, pipeline_id: str, document: Union[str, Dict[str, Any]],
+                version: Optional[str] = None) -> "PipelinePlan":
+        definition = yaml.safe_load(document) if isinstance(document, str) else document
+        return cls(pipeline_id, version or pipeline_version(document), definition)
+
+    def instantiate(self) -> List[Tuple[str, Any]]:
+        # Elements for one run, in dependency order
+        return [(name, self._shared[name] if name in self._shared else self.element_classes[name]())
+                for name in self.order]
+
+
+class PlanCache:
+    """Process-wide LRU of compiled plans keyed by (pipeline id, version).
+
+    Versions are content hashes, so a cached plan never goes stale: runs of an older
+    version still in flight keep hitting its plan, and versions nobody runs any more age
+    out of the LRU. invalidate() drops every version of a pipeline, e.g. once it is deleted.
+    """
+
+    def __init__(self, max_plans: int = 256):
+        self.max_plans = max_plans
+        self._plans: "OrderedDict[Tuple[str, str], PipelinePlan]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, pipeline_id: str, version: str) -> Optional[PipelinePlan]:
+        with self._lock:
+            plan = self._plans.get((pipeline_id, version))
+            if plan is not None:
+                self._plans.move_to_end((pipeline_id, version))
+            return plan
+
+    def get_or_compile(self, pipeline_id: str, version: str,
+                       load: Callable[[], Union[str, Dict[str, Any]]]) -> PipelinePlan:
+        # load() fetches the definition and is only called when the version is not cached
+        plan = self.get(pipeline_id, version)
+        if plan is None:
+            # Compiled outside the lock: imports and element construction may be slow
+            plan = PipelinePlan.compile(pipeline_id, load(), version)
+            self.put(plan)
+        return plan
+
+    def put(self, plan: PipelinePlan):
+        with self._lock:
+            self._plans[(plan.pipeline_id, plan.version)] = plan
+            self._plans.move_to_end((plan.pipeline_id, plan.version))
+            while len(self._plans) > self.max_plans:
+                self._plans.popitem(last=False)
+
+    def invalidate(self, pipeline_id: str):
+        with self._lock:
+            for key in [key for key in self._plans if key[0] == pipeline_id]:
+                del self._plans[key]
+
+    def clear(self):
+        with self._lock:
+            self._plans.clear()
+
+
+_default_plan_cache: Optional[PlanCache] = None
+
+
+def get_default_plan_cache() -> PlanCache:
+    global _default_plan_cache
+    if _default_plan_cache is None:
+        _default_plan_cache = PlanCache(int(os.environ.get("PIPELINE_PLAN_CACHE_SIZE", "256")))
+    return _default_plan_cache
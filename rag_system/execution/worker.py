@@ -0,0 +1,164 @@
+# rag_system/execution/worker.py
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import uuid
+from typing import Dict, Any, Callable, List, Optional
+
+from rag_system.execution.job_queue import JobQueue
+from rag_system.indexing.indexing_state_manager import IndexingStateManager
+
+TASK_INDEX_FILES = "index_files"
+TASK_EXECUTE_PIPELINE = "execute_pipeline"
+
+
+def enqueue_indexing_job(queue: JobQueue, manager: IndexingStateManager, job_id: str, priority: int = 0) -> List[str]:
+    # One task per job shard: shards are processed independently, and each shard's state
+    # document is only ever written by the worker holding its lease
+    return [queue.enqueue(TASK_INDEX_FILES, {"job_id": job_id, "shards": [shard]}, priority=priority)
+            for shard in range(manager.get_num_shards(job_id))]
+
+
+def enqueue_pipeline_execution(queue: JobQueue, pipeline_id: str, context: Dict[str, Any],
+                               execution_id: Optional[str] = None, priority: int = 0) -> str:
+    execution_id = execution_id or str(uuid.uuid4())
+    return queue.enqueue(TASK_EXECUTE_PIPELINE, {"pipeline_id": pipeline_id, "context": context,
+                                                 "execution_id": execution_id},
+                         priority=priority, task_id=execution_id)
+
+
+class QueueWorker:
+    """Leases tasks from a JobQueue and runs them with the handler registered for their kind.
+
+    The handler runs on the calling thread, on one event loop kept for the worker's
+    lifetime, while a background thread renews the lease every lease_seconds / 3.
+    Handler exceptions fail the attempt, and the queue decides whether to retry.
+    """
+
+    def __init__(self, queue: JobQueue, handlers: Dict[str, Callable[[Dict[str, Any]], Any]],
+                 worker_id: Optional[str] = None, lease_seconds: float = 60.0, poll_interval: float = 1.0):
+        self.logger = logging.getLogger(__name__)
+        self.queue = queue
+        self.handlers = handlers
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.loop = asyncio.new_event_loop()
+        self.stop_event = threading.Event()
+
+    def run_forever(self):
+        while not self.stop_event.is_set():
+            if not self.run_once():
+                self.stop_event.wait(self.poll_interval)
+        self.loop.close()
+
+    def run_once(self) -> bool:
+        # Returns False when no task was available
+        task = self.queue.lease(self.worker_id, self.lease_seconds, list(self.handlers))
+        if task is None:
+            return False
+
+        lease_lost = threading.Event()
+        done = threading.Event()
+
+        def heartbeat():
+            while not done.wait(self.lease_seconds / 3):
+                if not self.queue.heartbeat(task["id"], self.worker_id, self.lease_seconds):
+                    lease_lost.set()
+                    return
+
+        heartbeat_thread = threading.Thread(target=heartbeat, daemon=True)
+        heartbeat_thread.start()
+        self.logger.info(f"Running {task['kind']} task {task['id']} (attempt {task['attempts']})")
+        try:
+            result = self.handlers[task["kind"]](task["payload"])
+            if asyncio.iscoroutine(result):
+                result = self.loop.run_until_complete(result)
+        except Exception as e:
+            self.logger.exception(f"Task {task['id']} failed")
+            self.queue.fail(task["id"], self.worker_id, str(e))
+            return True
+        finally:
+            done.set()
+            heartbeat_thread.join()
+
+        if lease_lost.is_set():
+            self.logger.warning(f"Lease on task {task['id']} was lost; its result is discarded")
+        else:
+            self.queue.complete(task["id"], self.worker_id, result if isinstance(result, dict) else None)
+        return True
+
+
+def build_handlers() -> Dict[str, Callable[[Dict[str, Any]], Any]]:
+    # Imported here so each worker process builds its own repository connection and indexes
+    from rag_system.config import container
+    from rag_system.execution.pipeline_manager import PipelineManager
+    from rag_system.indexing.indexing_worker import IndexingWorker, FileIndexer, worker_settings
+
+    state_manager = container.indexing_state_manager()
+    rag_indexer = container.rag_indexer()
+    pipeline_manager = PipelineManager(container.cached_metadata_repository(), rag_indexer)
+    file_indexer = FileIndexer(rag_indexer)
+
+    async def index_files(payload: Dict[str, Any]) -> Dict[str, Any]:
+        # Vectors reach the API and the other workers only through segment files, so the
+        # worker flushes a segment before each batch of statuses is written
+        if not rag_indexer.segment_directory:
+            raise ValueError("Queue workers need VECTOR_SEGMENT_DIR to share the vectors they index")
+        rag_indexer.refresh()
+        worker = IndexingWorker(state_manager, file_indexer, persist=file_indexer.persist, **worker_settings())
+        return await worker.run(payload["job_id"], payload.get("shards"))
+
+    async def execute_pipeline(payload: Dict[str, Any]) -> Dict[str, Any]:
+        await pipeline_manager.execute_pipeline_async(payload["pipeline_id"], payload["context"],
+                                                      payload.get("execution_id"))
+        # Documents the pipeline indexed would otherwise only exist in this process
+        rag_indexer.persist()
+        return pipeline_manager.get_execution_status(payload["execution_id"]) or {}
+
+    return {TASK_INDEX_FILES: index_files, TASK_EXECUTE_PIPELINE: execute_pipeline}
+
+
+def _run_process(queue_path: str, lease_seconds: float, poll_interval: float):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(levelname)s %(message)s")
+    worker = QueueWorker(JobQueue(queue_path), build_handlers(), lease_seconds=lease_seconds,
+                         poll_interval=poll_interval)
+    # Finish the current task, then exit
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop_event.set())
+    signal.signal(signal.SIGINT, lambda *_: worker.stop_event.set())
+    worker.run_forever()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run queue workers for indexing and pipeline execution tasks.")
+    parser.add_argument("--queue", default=os.environ.get("JOB_QUEUE_PATH"), help="Path of the SQLite job queue")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--lease-seconds", type=float, default=60.0)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    args = parser.parse_args(argv)
+    if not args.queue:
+        parser.error("--queue or JOB_QUEUE_PATH is required")
+
+    processes = [multiprocessing.Process(target=_run_process, name=f"worker-{number}",
+                                         args=(args.queue, args.lease_seconds, args.poll_interval))
+                 for number in range(args.processes)]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
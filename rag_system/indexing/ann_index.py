@@ -0,0 +1,176 @@
+# rag_system/indexing/ann_index.py
+
+import copy
+from typing import Tuple, Iterable, List, Optional
+import numpy as np
+
+from rag_system.indexing.vector_store import NumpyVectorIndex, normalize_rows, merge_top_k, SCORE_BUFFER_ELEMENTS
+
+
+class IVFVectorIndex:
+    """Approximate inner-product index with an inverted-file (IVF) layout.
+
+    Vectors are assigned to the nearest of `nlist` k-means centroids, each inverted list is
+    an exact NumpyVectorIndex, and a query only scans its `nprobe` closest lists. Raising
+    nprobe trades latency for recall; nprobe == nlist is equivalent to exact search.
+
+    Until the index is trained, inserts go to an exact buffer. With auto_train the index
+    trains itself once the buffer holds `min_training_size` vectors.
+    """
+
+    def __init__(self, dimension: int, nlist: int = 1024, nprobe: int = 16,
+                 training_size: Optional[int] = None, kmeans_iterations: int = 10,
+                 auto_train: bool = True, seed: int = 0):
+        self.dimension = dimension
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.training_size = training_size or nlist * 64
+        self.min_training_size = nlist * 39
+        self.kmeans_iterations = kmeans_iterations
+        self.auto_train = auto_train
+        self._rng = np.random.default_rng(seed)
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[NumpyVectorIndex] = []
+        self._buffer = NumpyVectorIndex(dimension)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def __len__(self) -> int:
+        return len(self._buffer) + sum(len(inverted_list) for inverted_list in self._lists)
+
+    @property
+    def labels(self) -> np.ndarray:
+        return np.concatenate([self._buffer.labels] + [inverted_list.labels for inverted_list in self._lists])
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return np.concatenate([self._buffer.vectors] + [inverted_list.vectors for inverted_list in self._lists])
+
+    def snapshot(self) -> "IVFVectorIndex":
+        # See NumpyVectorIndex.snapshot. Centroids are replaced, not changed, by training
+        index = copy.copy(self)
+        index._lists = [inverted_list.snapshot() for inverted_list in self._lists]
+        index._buffer = self._buffer.snapshot()
+        return index
+
+    def build(self, labels: Iterable[int], vectors: np.ndarray):
+        # Build from scratch: retrain the coarse quantizer on the full set and re-assign everything
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimension)
+        labels = np.asarray(labels, dtype=np.int64).reshape(-1)
+        self.centroids = None
+        self._lists = []
+        self._buffer = NumpyVectorIndex(self.dimension)
+        self.train(vectors)
+        self.add(labels, vectors)
+
+    def train(self, vectors: np.ndarray):
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimension)
+        if len(vectors) < self.nlist:
+            raise ValueError(f"Need at least {self.nlist} vectors to train {self.nlist} lists, got {len(vectors)}")
+
+        if len(vectors) > self.training_size:
+            sample = vectors[self._rng.choice(len(vectors), self.training_size, replace=False)]
+        else:
+            sample = vectors
+        self.centroids = self._kmeans(sample)
+        self._lists = [NumpyVectorIndex(self.dimension, initial_capacity=16) for _ in range(self.nlist)]
+
+        # Move anything inserted before training into the inverted lists
+        if len(self._buffer):
+            buffered_labels, buffered_vectors = self._buffer.labels, self._buffer.vectors
+            self._buffer = NumpyVectorIndex(self.dimension)
+            self.add(buffered_labels, buffered_vectors)
+
+    def add(self, labels: Iterable[int], vectors: np.ndarray):
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimension)
+        labels = np.asarray(labels, dtype=np.int64).reshape(-1)
+        if not self.is_trained:
+            self._buffer.add(labels, vectors)
+            if self.auto_train and len(self._buffer) >= self.min_training_size:
+                self.train(self._buffer.vectors)
+            return
+
+        assignments = self._assign(vectors)
+        order = np.argsort(assignments, kind="stable")
+        sorted_assignments = assignments[order]
+        boundaries = np.flatnonzero(np.diff(sorted_assignments)) + 1
+        for group in np.split(order, boundaries):
+            if len(group):
+                self._lists[assignments[group[0]]].add(labels[group], vectors[group])
+
+    def remove(self, labels: Iterable[int]) -> int:
+        labels = np.asarray(list(labels), dtype=np.int64)
+        removed = self._buffer.remove(labels)
+        for inverted_list in self._lists:
+            if len(inverted_list):
+                removed += inverted_list.remove(labels)
+        return removed
+
+    def search(self, query: np.ndarray, top_k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        scores, labels = self.search_batch(np.asarray(query).reshape(1, -1), top_k)
+        return scores[0], labels[0]
+
+    def search_batch(self, queries: np.ndarray, top_k: int = 5,
+                     nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.dimension)
+        if not self.is_trained:
+            return self._buffer.search_batch(queries, top_k)
+
+        num_queries = len(queries)
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        probes = self._probe(queries, nprobe)
+
+        # Group (query, probe) pairs by inverted list so each list is scanned once per batch
+        candidate_scores = np.full((num_queries, nprobe, top_k), -np.inf, dtype=np.float32)
+        candidate_labels = np.full((num_queries, nprobe, top_k), -1, dtype=np.int64)
+        flat = probes.ravel()
+        order = np.argsort(flat, kind="stable")
+        boundaries = np.flatnonzero(np.diff(flat[order])) + 1
+        for group in np.split(order, boundaries):
+            inverted_list = self._lists[flat[group[0]]]
+            if not len(inverted_list):
+                continue
+            query_ids, slots = np.divmod(group, nprobe)
+            scores, labels = inverted_list.search_batch(queries[query_ids], top_k)
+            candidate_scores[query_ids, slots] = scores
+            candidate_labels[query_ids, slots] = labels
+
+        candidate_scores = candidate_scores.reshape(num_queries, -1)
+        candidate_labels = candidate_labels.reshape(num_queries, -1)
+        if len(self._buffer):
+            scores, labels = self._buffer.search_batch(queries, top_k)
+            candidate_scores = np.concatenate([candidate_scores, scores], axis=1)
+            candidate_labels = np.concatenate([candidate_labels, labels], axis=1)
+
+        return merge_top_k(candidate_scores, candidate_labels, top_k)
+
+    def _probe(self, queries: np.ndarray, nprobe: int) -> np.ndarray:
+        centroid_scores = queries @ self.centroids.T
+        if nprobe < self.nlist:
+            return np.argpartition(centroid_scores, self.nlist - nprobe, axis=1)[:, self.nlist - nprobe:]
+        return np.broadcast_to(np.arange(self.nlist), (len(queries), self.nlist))
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        assignments = np.empty(len(vectors), dtype=np.int64)
+        block = max(1, SCORE_BUFFER_ELEMENTS // len(self.centroids))
+        for start in range(0, len(vectors), block):
+            scores = vectors[start:start + block] @ self.centroids.T
+            assignments[start:start + block] = np.argmax(scores, axis=1)
+        return assignments
+
+    def _kmeans(self, sample: np.ndarray) -> np.ndarray:
+        # Spherical k-means: centroids stay unit length so assignment matches inner-product search
+        centroids = normalize_rows(sample[self._rng.choice(len(sample), self.nlist, replace=False)].copy())
+        for _ in range(self.kmeans_iterations):
+            self.centroids = centroids
+            assignments = self._assign(sample)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            counts = np.bincount(assignments, minlength=self.nlist)
+            empty = counts == 0
+            if empty.any():
+                sums[empty] = sample[self._rng.choice(len(sample), int(empty.sum()), replace=False)]
+            centroids = normalize_rows(sums)
+        return centroids
@@ -0,0 +1,35 @@
+# rag_system/indexing/document_chunks.py
+
+from itertools import islice
+from typing import Dict, Any, Iterator, Iterable, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def chunk_id(document_id: str, chunk_index: int) -> str:
+    # Chunk ids are shared by every index strategy so results can be merged by id
+    return f"{document_id}::{chunk_index}"
+
+
+def iter_document_chunks(document: Dict[str, Any]) -> Iterator[Tuple[str, int, str]]:
+    # Yields (chunk_id, chunk_index, text) for a canonical document; documents without
+    # chunks are treated as a single chunk holding the full content. 'chunks' may be a
+    # lazy iterable (see CanonicalModel streaming).
+    document_id = document["id"]
+    chunks = document.get("chunks")
+    if chunks is None:
+        content = document.get("content", "")
+        chunks = [content] if content else []
+
+    for index, text in enumerate(chunks):
+        if text and text.strip():
+            yield chunk_id(document_id, index), index, text
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
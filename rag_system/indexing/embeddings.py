@@ -0,0 +1,222 @@
+# rag_system/indexing/embeddings.py
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Callable, Iterator
+
+import backoff
+import numpy as np
+
+from rag_system.indexing.lexical_index import tokenize
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def estimate_tokens(text: str) -> int:
+    # Roughly four characters per token for English text; only used to size batches
+    return len(text) // 4 + 1
+
+
+class HashingEmbedder:
+    """Deterministic local embedder based on signed feature hashing of tokens.
+
+    Needs no network or model weights, so it stands in for the remote API in tests and
+    offline deployments.
+    """
+
+    def __init__(self, dimension: int = 256):
+        self.dimension = dimension
+        self.model_name = f"hashing-{dimension}"
+
+    async def embed_batch(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in tokenize(text):
+                digest = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+                vectors[row, digest % self.dimension] += 1.0 if (digest >> 63) else -1.0
+        return vectors
+
+
+class OpenAIEmbedder:
+    def __init__(self, model: str = "text-embedding-3-small", dimension: Optional[int] = None):
+        # The client is created on the first embedding call, so indexers and pipeline elements
+        # can be built (e.g. by the DI container) where no key is configured and nothing is embedded
+        self.model_name = model
+        self.dimension = dimension
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            if not os.environ.get("OPENAI_API_KEY"):
+                # Never fall back to the local embedder: vectors of different models cannot be mixed
+                raise ValueError(f"EMBEDDING_MODEL={self.model_name} needs OPENAI_API_KEY; set "
+                                 "EMBEDDING_MODEL=hashing for the local embedder")
+            # Imported lazily so the local embedder works without the OpenAI client installed
+            from langchain_openai import OpenAIEmbeddings
+
+            self._client = (OpenAIEmbeddings(model=self.model_name, dimensions=self.dimension) if self.dimension
+                            else OpenAIEmbeddings(model=self.model_name))
+        return self._client
+
+    async def embed_batch(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(await self._get_client().aembed_documents(texts), dtype=np.float32)
+
+
+class EmbeddingCache:
+    """Persistent embedding cache keyed by model name and content hash (SQLite)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, dimension INTEGER, vector BLOB)"
+        )
+        self._connection.commit()
+
+    @staticmethod
+    def key(model_name: str, text_hash: str) -> str:
+        return f"{model_name}:{text_hash}"
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        with self._lock:
+            # SQLite limits the number of bound parameters per statement
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                rows = self._connection.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+                for key, vector in rows:
+                    found[key] = np.frombuffer(vector, dtype=np.float32)
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]):
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, dimension, vector) VALUES (?, ?, ?)",
+                [(key, len(vector), np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items.items()]
+            )
+            self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class BatchedEmbedder:
+    """Embedding stage with content-hash dedup, a persistent cache and bounded concurrency.
+
+    Texts are deduplicated by hash, looked up in the cache, and only misses are sent to
+    the embedder, grouped into batches bounded by both count and estimated tokens. At
+    most max_concurrency batches are in flight, and failed batches are retried with
+    exponential backoff. Instances are callable, so they can be passed as a
+    VectorStoreStrategy embedding_function.
+    """
+
+    def __init__(self, embedder, cache: Optional[EmbeddingCache] = None, max_batch_size: int = 96,
+                 max_batch_tokens: int = 8000, max_concurrency: int = 4, max_retries: int = 5,
+                 token_counter: Callable[[str], int] = estimate_tokens):
+        self.embedder = embedder
+        self.cache = cache
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.token_counter = token_counter
+        self.stats = {"requested": 0, "cache_hits": 0, "embedded": 0, "batches": 0}
+
+    @property
+    def model_name(self) -> str:
+        return self.embedder.model_name
+
+    def __call__(self, texts: List[str]) -> np.ndarray:
+        return self.embed(texts)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        coroutine = self.aembed(texts)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coroutine)
+        # Called from async code: run on a private loop instead of blocking the caller's loop
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coroutine).result()
+
+    async def aembed(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.empty((0, self.embedder.dimension or 0), dtype=np.float32)
+        self.stats["requested"] += len(texts)
+        hashes = [content_hash(text) for text in texts]
+        unique: Dict[str, str] = dict(zip(hashes, texts))
+        keys = {text_hash: EmbeddingCache.key(self.model_name, text_hash) for text_hash in unique}
+
+        vectors: Dict[str, np.ndarray] = {}
+        if self.cache is not None:
+            cached = self.cache.get_many(list(keys.values()))
+            vectors = {text_hash: cached[key] for text_hash, key in keys.items() if key in cached}
+            self.stats["cache_hits"] += len(vectors)
+
+        missing = [text_hash for text_hash in unique if text_hash not in vectors]
+        if missing:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+
+            async def run(batch: List[str]):
+                async with semaphore:
+                    embedded = await self._embed_with_backoff([unique[text_hash] for text_hash in batch])
+                result = dict(zip(batch, np.asarray(embedded, dtype=np.float32)))
+                if self.cache is not None:
+                    self.cache.put_many({keys[text_hash]: vector for text_hash, vector in result.items()})
+                return result
+
+            for result in await asyncio.gather(*(run(batch) for batch in self._batches(missing, unique))):
+                vectors.update(result)
+            self.stats["embedded"] += len(missing)
+
+        return np.stack([vectors[text_hash] for text_hash in hashes])
+
+    async def _embed_with_backoff(self, texts: List[str]) -> np.ndarray:
+        # Configuration errors (missing key or client) are not retried
+        @backoff.on_exception(backoff.expo, Exception, max_tries=self.max_retries,
+                              giveup=lambda e: isinstance(e, (ValueError, ImportError)))
+        async def call():
+            return await self.embedder.embed_batch(texts)
+
+        self.stats["batches"] += 1
+        return await call()
+
+    def _batches(self, text_hashes: List[str], texts: Dict[str, str]) -> Iterator[List[str]]:
+        batch, tokens = [], 0
+        for text_hash in text_hashes:
+            count = self.token_counter(texts[text_hash])
+            if batch and (len(batch) >= self.max_batch_size or tokens + count > self.max_batch_tokens):
+                yield batch
+                batch, tokens = [], 0
+            batch.append(text_hash)
+            tokens += count
+        if batch:
+            yield batch
+
+
+def get_default_embedder() -> BatchedEmbedder:
+    # EMBEDDING_MODEL=hashing selects the local embedder; EMBEDDING_CACHE_PATH enables the
+    # persistent cache. A remote model without OPENAI_API_KEY fails on its first embedding
+    # call, not here (see OpenAIEmbedder)
+    model = os.environ.get("EMBEDDING_MODEL", "text-embedding-3-small")
+    if model == "hashing":
+        embedder = HashingEmbedder(int(os.environ.get("EMBEDDING_DIMENSION", "256")))
+    else:
+        embedder = OpenAIEmbedder(model)
+
+    cache_path = os.environ.get("EMBEDDING_CACHE_PATH")
+    return BatchedEmbedder(embedder, cache=EmbeddingCache(cache_path) if cache_path else None)
@@ -0,0 +1,65 @@
+# rag_system/indexing/fingerprints.py
+
+import hashlib
+import os
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+from rag_system.indexing.embeddings import content_hash
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_hash(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_fingerprint(file_path: str, with_hash: bool = False) -> Optional[Dict[str, Any]]:
+    # size and mtime are a cheap first check; the content hash settles touched-but-unchanged files
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if with_hash:
+        fingerprint["content_hash"] = file_hash(file_path)
+    return fingerprint
+
+
+def file_changed(stored: Optional[Dict[str, Any]], file_path: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    # Returns (changed, current fingerprint). The file is only read when its size is the same
+    # but its mtime moved. The hash is returned with the fingerprint, so once the file is
+    # indexed the next touch can be settled by content.
+    current = file_fingerprint(file_path)
+    if stored is None or current is None:
+        return True, current
+    if current["size"] != stored.get("size"):
+        return True, current
+    if current["mtime_ns"] == stored.get("mtime_ns"):
+        return False, {**current, **({"content_hash": stored["content_hash"]} if "content_hash" in stored else {})}
+    current["content_hash"] = file_hash(file_path)
+    return current["content_hash"] != stored.get("content_hash"), current
+
+
+class ChunkHasher:
+    """Records a content hash per chunk as the chunks are consumed.
+
+    Wraps a document's chunks (a list or a single-pass stream) so fingerprints are taken
+    while the index strategy reads them, without materialising a streamed document.
+    """
+
+    def __init__(self, chunks: Iterable[str]):
+        self._chunks = chunks
+        self.hashes: List[str] = []
+
+    def __iter__(self) -> Iterator[str]:
+        for chunk in self._chunks:
+            self.hashes.append(content_hash(chunk or ""))
+            yield chunk
+
+    def document_hash(self) -> str:
+        return content_hash("\n".join(self.hashes))
+
@@ -1,10 +1,14 @@
 # rag_system/indexing/indexing_state_manager.py
 
 from enum import Enum
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+from datetime import datetime, timezone
+import base64
 import uuid
+import zlib
 from rag_system.core.interfaces import IMetadataRepository
+from rag_system.indexing.embeddings import content_hash
+from rag_system.indexing.fingerprints import file_changed, file_fingerprint, file_hash
 
 
 class IndexingStatus(Enum):
@@ -12,60 +16,260 @@ class IndexingStatus(Enum):
     IN_PROGRESS = "in_progress"
     COMPLETED = "completed"
     FAILED = "failed"
+    SKIPPED = "skipped"
+
+
+# Statuses that end a file's processing; each has a job-level counter
+FINAL_STATUSES = (IndexingStatus.COMPLETED, IndexingStatus.FAILED, IndexingStatus.SKIPPED)
 
 
 class IndexingStateManager:
-    def __init__(self, metadata_repository: IMetadataRepository):
+    """Stores indexing jobs as a small header plus fixed-size shards of file entries.
+
+    A file's shard is derived from a hash of its path, so finding the entry to update
+    needs no lookup. Job totals are repository counters, one per final status.
+    Updating a file therefore reads and writes one shard of at most about shard_size
+    entries and bumps one or two counters, whatever the size of the job.
+    """
+
+    def __init__(self, metadata_repository: IMetadataRepository, shard_size: int = 256):
         self.metadata_repository = metadata_repository
+        self.shard_size = shard_size
         self.indexing_metadata_key = "indexing_metadata"
+        self.indexing_shard_key = "indexing_shard"
+        self.indexing_counter_key = "indexing_counter"
+        self.indexing_job_index_key = "indexing_job_index"
+        self.file_fingerprint_key = "file_fingerprint"
 
-    def create_indexing_job(self, files: List[str]) -> str:
+    def create_indexing_job(self, files: List[str], incremental: bool = False,
+                            index_epoch: Optional[str] = None) -> str:
+        # Every file is fingerprinted (size, mtime) when the job is created. In incremental
+        # mode files whose fingerprint matches the one recorded when they were last indexed
+        # are marked as skipped and never reach a worker. index_epoch identifies the index
+        # the files go into (RAGIndexer.index_epoch): fingerprints recorded for another
+        # epoch, e.g. an in-memory index lost on restart, do not count.
         job_id = str(uuid.uuid4())
+        start_time = datetime.utcnow()
+        files = list(dict.fromkeys(files))
+        num_shards = max(1, -(-len(files) // self.shard_size))
+        shards: List[Dict[str, Dict[str, Any]]] = [{} for _ in range(num_shards)]
+        skipped_files = 0
+        stored_fingerprints = self.get_file_fingerprints(files)
+        refreshed_fingerprints = {}
+        for file in files:
+            stored = stored_fingerprints.get(file)
+            if stored is not None and stored.get("index_epoch") != index_epoch:
+                stored = None
+            changed, fingerprint = file_changed(stored, file)
+            status = IndexingStatus.PENDING if changed or not incremental else IndexingStatus.SKIPPED
+            if status == IndexingStatus.SKIPPED:
+                skipped_files += 1
+                if fingerprint != stored:
+                    # Touched but identical: remember the new mtime so the file is not hashed again
+                    refreshed_fingerprints[self._fingerprint_key(file)] = self._with_epoch(fingerprint, index_epoch)
+            shards[self._shard_of(file, num_shards)][file] = {"status": status.value, "fingerprint": fingerprint}
+
+        if refreshed_fingerprints:
+            self.metadata_repository.upsert_many(refreshed_fingerprints)
+        self.metadata_repository.upsert_many({self._shard_key(job_id, shard): {"files": entries}
+                                              for shard, entries in enumerate(shards)})
+        if skipped_files:
+            self.metadata_repository.increment_counter(self._counter_key(job_id, IndexingStatus.SKIPPED), skipped_files)
+
         job_metadata = {
             "job_id": job_id,
-            "start_time": datetime.utcnow().isoformat(),
+            "start_time": start_time.isoformat(),
             "status": IndexingStatus.PENDING.value,
-            "files": [{"file_path": file, "status": IndexingStatus.PENDING.value} for file in files],
+            "incremental": incremental,
+            "index_epoch": index_epoch,
             "total_files": len(files),
-            "completed_files": 0,
-            "failed_files": 0
+            "num_shards": num_shards
         }
+        if skipped_files == len(files):
+            job_metadata["status"] = IndexingStatus.COMPLETED.value
+            job_metadata["end_time"] = datetime.utcnow().isoformat()
+        # The header is written last: a job is only visible once all of its shards exist
         self.metadata_repository.insert_document(f"{self.indexing_metadata_key}:{job_id}", job_metadata)
+        self.metadata_repository.insert_document(self._job_index_key(job_id, start_time), {"job_id": job_id})
         return job_id
 
+    def get_file_fingerprint(self, file_path: str) -> Optional[Dict[str, Any]]:
+        return self.metadata_repository.get_document(self._fingerprint_key(file_path)) or None
+
+    def get_file_fingerprints(self, file_paths: List[str]) -> Dict[str, Dict[str, Any]]:
+        keys = {self._fingerprint_key(file_path): file_path for file_path in file_paths}
+        return {keys[key]: fingerprint for key, fingerprint in self.metadata_repository.get_many(list(keys)).items()}
+
+    def record_file_fingerprint(self, file_path: str, fingerprint: Optional[Dict[str, Any]],
+                                index_epoch: Optional[str] = None):
+        self.record_file_fingerprints({file_path: fingerprint}, index_epoch)
+
+    def record_file_fingerprints(self, fingerprints: Dict[str, Optional[Dict[str, Any]]],
+                                 index_epoch: Optional[str] = None):
+        # Called once files are indexed, with the fingerprints taken at job creation. A file
+        # that still matches that fingerprint is the indexed version, and its content hash is
+        # recorded: the one computed at job creation, or else hashed now (the file was just
+        # read for indexing), so a later touch that leaves the content alone is settled by
+        # the hash instead of a re-index. A file changed since is recorded without a hash.
+        records = {}
+        for file_path, fingerprint in fingerprints.items():
+            current = file_fingerprint(file_path)
+            if current is None or fingerprint is None:
+                continue
+            record = {"size": fingerprint["size"], "mtime_ns": fingerprint["mtime_ns"]}
+            if current["size"] == record["size"] and current["mtime_ns"] == record["mtime_ns"]:
+                try:
+                    record["content_hash"] = fingerprint.get("content_hash") or file_hash(file_path)
+                except FileNotFoundError:
+                    continue
+            records[self._fingerprint_key(file_path)] = self._with_epoch(record, index_epoch)
+        if records:
+            self.metadata_repository.upsert_many(records)
+
+    @staticmethod
+    def _with_epoch(fingerprint: Dict[str, Any], index_epoch: Optional[str]) -> Dict[str, Any]:
+        return {**fingerprint, "index_epoch": index_epoch} if index_epoch is not None else fingerprint
+
+    def _fingerprint_key(self, file_path: str) -> str:
+        # Paths are hashed so keys stay valid for every repository (e.g. file names)
+        return f"{self.file_fingerprint_key}:{content_hash(file_path)}"
+
     def update_file_status(self, job_id: str, file_path: str, status: IndexingStatus, error_message: Optional[str] = None):
-        job_metadata = self.metadata_repository.get_document(f"{self.indexing_metadata_key}:{job_id}")
-        if not job_metadata:
-            raise ValueError(f"No indexing job found with id {job_id}")
+        self.update_file_statuses(job_id, [(file_path, status, error_message)])
+
+    def update_file_statuses(self, job_id: str, updates: List[Tuple[str, IndexingStatus, Optional[str]]]):
+        # Applies many (file_path, status, error_message) updates: the touched shards are read
+        # and written in one bulk call each, plus one counter update per status whose count changed
+        header = self._get_header(job_id)
+        num_shards = header["num_shards"]
+
+        updates_by_shard: Dict[int, List[Tuple[str, IndexingStatus, Optional[str]]]] = {}
+        for update in updates:
+            updates_by_shard.setdefault(self._shard_of(update[0], num_shards), []).append(update)
 
-        for file in job_metadata["files"]:
-            if file["file_path"] == file_path:
-                file["status"] = status.value
-                file["last_updated"] = datetime.utcnow().isoformat()
+        deltas = {status: 0 for status in FINAL_STATUSES}
+        now = datetime.utcnow().isoformat()
+        shard_documents = self.metadata_repository.get_many([self._shard_key(job_id, shard) for shard in updates_by_shard])
+        completed_fingerprints = {}
+        for shard, shard_updates in updates_by_shard.items():
+            entries = shard_documents.get(self._shard_key(job_id, shard), {}).get("files", {})
+            for file_path, status, error_message in shard_updates:
+                entry = entries.get(file_path)
+                if entry is None:
+                    raise ValueError(f"File {file_path} is not part of indexing job {job_id}")
+                previous = IndexingStatus(entry["status"])
+                if previous in deltas:
+                    deltas[previous] -= 1
+                if status in deltas:
+                    deltas[status] += 1
+                entry["status"] = status.value
+                entry["last_updated"] = now
                 if error_message:
-                    file["error_message"] = error_message
+                    entry["error_message"] = error_message
+                if status == IndexingStatus.COMPLETED:
+                    completed_fingerprints[file_path] = entry.get("fingerprint")
 
-        job_metadata["completed_files"] = sum(1 for file in job_metadata["files"] if file["status"] == IndexingStatus.COMPLETED.value)
-        job_metadata["failed_files"] = sum(1 for file in job_metadata["files"] if file["status"] == IndexingStatus.FAILED.value)
+        self.metadata_repository.upsert_many(shard_documents)
+        self.record_file_fingerprints(completed_fingerprints, header.get("index_epoch"))
+        for status, delta in deltas.items():
+            if delta:
+                self.metadata_repository.increment_counter(self._counter_key(job_id, status), delta)
 
-        if job_metadata["completed_files"] + job_metadata["failed_files"] == job_metadata["total_files"]:
-            job_metadata["status"] = IndexingStatus.COMPLETED.value
-            job_metadata["end_time"] = datetime.utcnow().isoformat()
+        if header["status"] != IndexingStatus.COMPLETED.value and self._finished_files(job_id) == header["total_files"]:
+            header["status"] = IndexingStatus.COMPLETED.value
+            header["end_time"] = datetime.utcnow().isoformat()
+            self.metadata_repository.insert_document(f"{self.indexing_metadata_key}:{job_id}", header)
 
-        self.metadata_repository.insert_document(f"{self.indexing_metadata_key}:{job_id}", job_metadata)
+    def get_indexing_status(self, job_id: str, include_files: bool = True) -> Dict[str, Any]:
+        # Counters make the summary cheap; include_files reads every shard to list file entries
+        job_metadata = self._get_header(job_id)
+        counters = self.metadata_repository.get_counters(self._counter_key(job_id, status) for status in FINAL_STATUSES)
+        self._apply_counters(job_metadata, counters)
+        if include_files:
+            job_metadata["files"] = [{"file_path": file_path, **entry}
+                                     for entries in self._get_shards(job_id, range(job_metadata["num_shards"]))
+                                     for file_path, entry in entries.items()]
+        return job_metadata
+
+    def get_pending_files(self, job_id: str, shards: Optional[List[int]] = None) -> List[str]:
+        # shards restricts the scan, e.g. to the shards a queue worker has leased
+        header = self._get_header(job_id)
+        return [file_path
+                for entries in self._get_shards(job_id, shards if shards is not None else range(header["num_shards"]))
+                for file_path, entry in entries.items()
+                if entry["status"] == IndexingStatus.PENDING.value]
 
-    def get_indexing_status(self, job_id: str) -> Dict[str, Any]:
+    def get_num_shards(self, job_id: str) -> int:
+        return self._get_header(job_id)["num_shards"]
+
+    def list_jobs(self, limit: int = 50, cursor: Optional[str] = None) -> Dict[str, Any]:
+        # One page of job summaries (no file entries), newest first. The job index keys sort by
+        # descending start time, so a page is a range scan after the cursor plus two bulk reads.
+        start_after = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8") if cursor else None
+        index_keys = self.metadata_repository.scan_keys(f"{self.indexing_job_index_key}:", start_after, limit + 1)
+        page_keys = index_keys[:limit]
+        job_ids = [key.rpartition(":")[2] for key in page_keys]
+
+        headers = self.metadata_repository.get_many(f"{self.indexing_metadata_key}:{job_id}" for job_id in job_ids)
+        counters = self.metadata_repository.get_counters(
+            self._counter_key(job_id, status) for job_id in job_ids for status in FINAL_STATUSES
+        )
+        jobs = [self._apply_counters(headers[f"{self.indexing_metadata_key}:{job_id}"], counters)
+                for job_id in job_ids if f"{self.indexing_metadata_key}:{job_id}" in headers]
+        next_cursor = None
+        if len(index_keys) > limit:
+            next_cursor = base64.urlsafe_b64encode(page_keys[-1].encode("utf-8")).decode("ascii")
+        return {"jobs": jobs, "next_cursor": next_cursor}
+
+    def get_all_jobs(self) -> List[Dict[str, Any]]:
+        # Job summaries without file entries, in three round trips: keys, headers, counters
+        job_keys = self.metadata_repository.query_keys(f"{self.indexing_metadata_key}:")
+        headers = self.metadata_repository.get_many(job_keys)
+        counters = self.metadata_repository.get_counters(
+            self._counter_key(header["job_id"], status) for header in headers.values() for status in FINAL_STATUSES
+        )
+        jobs = []
+        for key in job_keys:
+            if key in headers:
+                jobs.append(self._apply_counters(headers[key], counters))
+        return jobs
+
+    def _get_header(self, job_id: str) -> Dict[str, Any]:
         job_metadata = self.metadata_repository.get_document(f"{self.indexing_metadata_key}:{job_id}")
         if not job_metadata:
             raise ValueError(f"No indexing job found with id {job_id}")
         return job_metadata
 
-    def get_pending_files(self, job_id: str) -> List[str]:
-        job_metadata = self.get_indexing_status(job_id)
-        return [file["file_path"] for file in job_metadata["files"] if file["status"] == IndexingStatus.PENDING.value]
+    def _get_shards(self, job_id: str, shards: Iterable[int]) -> List[Dict[str, Dict[str, Any]]]:
+        keys = [self._shard_key(job_id, shard) for shard in shards]
+        documents = self.metadata_repository.get_many(keys)
+        return [documents.get(key, {}).get("files", {}) for key in keys]
 
-    def get_all_jobs(self) -> List[Dict[str, Any]]:
-        # This method assumes that the metadata_repository has a method to query keys with a prefix
-        # If not, you may need to implement a different approach to list all jobs
-        job_keys = self.metadata_repository.query_keys(f"{self.indexing_metadata_key}:")
-        return [self.metadata_repository.get_document(key) for key in job_keys]
+    def _apply_counters(self, job_metadata: Dict[str, Any], counters: Dict[str, int]) -> Dict[str, Any]:
+        job_id = job_metadata["job_id"]
+        counts = {status: counters.get(self._counter_key(job_id, status), 0) for status in FINAL_STATUSES}
+        job_metadata["completed_files"] = counts[IndexingStatus.COMPLETED]
+        job_metadata["failed_files"] = counts[IndexingStatus.FAILED]
+        job_metadata["skipped_files"] = counts[IndexingStatus.SKIPPED]
+        if job_metadata["status"] == IndexingStatus.PENDING.value and any(counts.values()):
+            job_metadata["status"] = IndexingStatus.IN_PROGRESS.value
+        return job_metadata
+
+    def _finished_files(self, job_id: str) -> int:
+        return sum(self.metadata_repository.get_counters(self._counter_key(job_id, status) for status in FINAL_STATUSES).values())
+
+    def _shard_key(self, job_id: str, shard: int) -> str:
+        return f"{self.indexing_shard_key}:{job_id}:{shard:06d}"
+
+    def _job_index_key(self, job_id: str, start_time: datetime) -> str:
+        # Inverted millisecond timestamp: ascending key order is newest job first
+        inverted = 10 ** 13 - int(start_time.replace(tzinfo=timezone.utc).timestamp() * 1000)
+        return f"{self.indexing_job_index_key}:{inverted:013d}:{job_id}"
+
+    def _counter_key(self, job_id: str, status: IndexingStatus) -> str:
+        return f"{self.indexing_counter_key}:{job_id}:{status.value}"
+
+    @staticmethod
+    def _shard_of(file_path: str, num_shards: int) -> int:
+        # Stable across processes, unlike hash()
+        return zlib.crc32(file_path.encode("utf-8")) % num_shards
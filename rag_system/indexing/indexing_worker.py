@@ -0,0 +1,141 @@
+# rag_system/indexing/indexing_worker.py
+
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from rag_system.core.models.chunking import ChunkStream, StreamingChunker
+from rag_system.indexing.indexing_state_manager import IndexingStateManager, IndexingStatus
+from rag_system.indexing.rag_indexer import RAGIndexer
+from rag_system.retrieval.parsers import ParserRegistry, TextStream, detect_doc_type, get_default_registry
+
+
+class FileIndexer:
+    """Parses, chunks and indexes one file; used as IndexingWorker's index_file.
+
+    Chunks are streamed from the parser into the indexer, so a file is never held in full;
+    each strategy the file goes into (the default one and its companions) reads the stream
+    again, parsing the file once per strategy. Files are parsed, chunked and embedded
+    concurrently when those strategies are thread-safe (the built-in ones lock only around
+    changes to their indexes); otherwise indexing is serialised with a lock.
+    """
+
+    def __init__(self, rag_indexer: RAGIndexer, registry: Optional[ParserRegistry] = None,
+                 chunker: Optional[StreamingChunker] = None):
+        self.rag_indexer = rag_indexer
+        self.registry = registry or get_default_registry()
+        self.chunker = chunker or StreamingChunker()
+        self._index_lock = threading.Lock()
+
+    def __call__(self, file_path: str, incremental: bool = False) -> bool:
+        source = {'file_path': file_path}
+        doc_type = detect_doc_type(source)
+        parser_name = self.registry.parser_name(doc_type)
+        if parser_name is None:
+            raise ValueError(f"No parser available for document type: {doc_type}")
+
+        document = {
+            'id': file_path,
+            'file_path': file_path,
+            'metadata': {'id': file_path, 'file_path': file_path, 'doc_type': doc_type},
+            'chunks': ChunkStream(TextStream(parser_name, source, self.registry), self.chunker)
+        }
+        strategies = [self.rag_indexer.default_strategy, *self.rag_indexer.companion_strategies]
+        if all(self.rag_indexer.index_strategies[name].thread_safe for name in strategies):
+            return self.rag_indexer.index_document(document, incremental=incremental)
+        with self._index_lock:
+            return self.rag_indexer.index_document(document, incremental=incremental)
+
+    def persist(self) -> Optional[str]:
+        # Writes what has been indexed so far to a segment (see RAGIndexer.persist)
+        with self._index_lock:
+            return self.rag_indexer.persist()
+
+
+class IndexingWorker:
+    """Processes the pending files of an indexing job.
+
+    At most max_concurrency files are in flight at once. File outcomes are buffered and
+    written to the job state in batches, when status_batch_size updates have
+    accumulated or every status_flush_interval seconds. Only one flush runs at a time,
+    and workers wait for it when the buffer is full, so a slow metadata store throttles
+    the workers instead of building up a backlog. Statuses are persisted only when a
+    file finishes, so a job interrupted by a crash resumes from get_pending_files.
+
+    persist, when given, is called before each batch of statuses is written, so files are
+    only marked completed once their index data is durable (e.g. FileIndexer.persist).
+    """
+
+    def __init__(self, state_manager: IndexingStateManager, index_file: Callable[[str, bool], bool],
+                 max_concurrency: int = 8, status_batch_size: int = 200, status_flush_interval: float = 2.0,
+                 persist: Optional[Callable[[], Any]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.state_manager = state_manager
+        self.index_file = index_file
+        self.persist = persist
+        self.max_concurrency = max_concurrency
+        self.status_batch_size = status_batch_size
+        self.status_flush_interval = status_flush_interval
+
+    async def run(self, job_id: str, shards: Optional[List[int]] = None) -> Dict[str, int]:
+        # shards limits the run to part of the job, so several workers can share it
+        loop = asyncio.get_running_loop()
+        job = await loop.run_in_executor(None, self.state_manager.get_indexing_status, job_id, False)
+        incremental = job.get("incremental", False)
+        pending = await loop.run_in_executor(None, self.state_manager.get_pending_files, job_id, shards)
+        self.logger.info(f"Indexing job {job_id}: {len(pending)} pending files")
+
+        files = iter(pending)
+        updates: List[Tuple[str, IndexingStatus, Optional[str]]] = []
+        flush_lock = asyncio.Lock()
+        counts = {"completed": 0, "failed": 0}
+
+        async def flush():
+            async with flush_lock:
+                batch = updates[:]
+                del updates[:]
+                if batch:
+                    if self.persist is not None:
+                        await loop.run_in_executor(None, self.persist)
+                    await loop.run_in_executor(None, self.state_manager.update_file_statuses, job_id, batch)
+
+        async def flush_periodically():
+            while True:
+                await asyncio.sleep(self.status_flush_interval)
+                await flush()
+
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="indexing-worker")
+
+        async def work():
+            for file_path in files:
+                try:
+                    success = await loop.run_in_executor(executor, self.index_file, file_path, incremental)
+                    error_message = None if success else "Indexing returned no content"
+                except Exception as e:
+                    success, error_message = False, str(e)
+                    self.logger.error(f"Failed to index {file_path}: {error_message}")
+
+                counts["completed" if success else "failed"] += 1
+                updates.append((file_path, IndexingStatus.COMPLETED if success else IndexingStatus.FAILED, error_message))
+                if len(updates) >= self.status_batch_size:
+                    await flush()
+
+        flusher = asyncio.ensure_future(flush_periodically())
+        try:
+            await asyncio.gather(*(work() for _ in range(self.max_concurrency)))
+        finally:
+            flusher.cancel()
+            await flush()
+            executor.shutdown(wait=False)
+        return counts
+
+
+def worker_settings() -> Dict[str, Any]:
+    return {
+        "max_concurrency": int(os.environ.get("INDEXER_MAX_CONCURRENCY", str(2 * (os.cpu_count() or 1)))),
+        "status_batch_size": int(os.environ.get("INDEXER_STATUS_BATCH_SIZE", "200")),
+        "status_flush_interval": float(os.environ.get("INDEXER_STATUS_FLUSH_INTERVAL", "2.0"))
+    }
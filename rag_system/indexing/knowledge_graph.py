@@ -0,0 +1,239 @@
+# rag_system/indexing/knowledge_graph.py
+
+import re
+from typing import Dict, Any, List, Optional, Tuple, Iterable
+
+import numpy as np
+
+ENTITY_PATTERN = re.compile(r"\b(?:[A-Z][\w\-]*(?:\s+(?:of\s+)?[A-Z][\w\-]*)*|[A-Za-z]*\d[\w\-]*)\b")
+STOPWORDS = {
+    "a", "an", "and", "as", "at", "but", "by", "for", "from", "he", "her", "his", "how", "i", "if", "in",
+    "is", "it", "its", "of", "on", "or", "our", "she", "that", "the", "their", "then", "there", "these",
+    "they", "this", "to", "was", "we", "what", "when", "where", "which", "who", "why", "with", "you"
+}
+COOCCURRENCE_RELATION = "co_occurs"
+
+
+def extract_entities(text: str) -> List[str]:
+    # Lightweight default extractor: capitalised phrases and identifiers containing digits
+    entities = []
+    for match in ENTITY_PATTERN.finditer(text):
+        entity = match.group(0).strip()
+        if entity.lower() not in STOPWORDS and len(entity) > 1:
+            entities.append(entity)
+    return entities
+
+
+class _IntArray:
+    # Append-only, amortised-growth int32 array
+    def __init__(self, capacity: int = 1024):
+        self.data = np.empty(capacity, dtype=np.int32)
+        self.size = 0
+
+    def extend(self, values: Iterable[int]):
+        values = np.asarray(values, dtype=np.int32)
+        required = self.size + len(values)
+        if required > len(self.data):
+            grown = np.empty(max(required, 2 * len(self.data)), dtype=np.int32)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size:required] = values
+        self.size = required
+
+    def view(self) -> np.ndarray:
+        return self.data[:self.size]
+
+    def replace(self, values: np.ndarray):
+        self.data = np.ascontiguousarray(values, dtype=np.int32)
+        self.size = len(values)
+
+
+class GraphStore:
+    """Entity graph with interned int32 node ids and CSR adjacency.
+
+    Edges and entity mentions are appended to flat int32 arrays. Before a search the
+    arrays are compacted into CSR form: parallel edges are merged into one weighted edge
+    and edges from deleted chunks are dropped. Memory is a few int32s per edge rather
+    than a Python object per neighbour.
+    """
+
+    def __init__(self):
+        self._node_ids: Dict[str, int] = {}
+        self._node_names: List[str] = []
+        self._relation_ids: Dict[str, int] = {}
+        self._relation_names: List[str] = []
+        self._chunks: List[Optional[Dict[str, Any]]] = []
+        self._chunk_live = np.empty(0, dtype=bool)
+
+        self._edge_src = _IntArray()
+        self._edge_dst = _IntArray()
+        self._edge_relation = _IntArray()
+        self._edge_chunk = _IntArray()
+        self._mention_node = _IntArray()
+        self._mention_chunk = _IntArray()
+
+        self._dirty = True
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.empty(0, dtype=np.int32)
+        self._weights = np.empty(0, dtype=np.int32)
+        self._relations = np.empty(0, dtype=np.int32)
+        self._mention_indptr = np.zeros(1, dtype=np.int64)
+        self._mention_chunks = np.empty(0, dtype=np.int32)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self._node_names)
+
+    @property
+    def num_edges(self) -> int:
+        self._compact()
+        return len(self._indices) // 2
+
+    def node_id(self, name: str) -> Optional[int]:
+        return self._node_ids.get(name.lower())
+
+    def intern_node(self, name: str) -> int:
+        key = name.lower()
+        node = self._node_ids.get(key)
+        if node is None:
+            node = len(self._node_names)
+            self._node_ids[key] = node
+            self._node_names.append(name)
+        return node
+
+    def intern_relation(self, name: str) -> int:
+        relation = self._relation_ids.get(name)
+        if relation is None:
+            relation = len(self._relation_names)
+            self._relation_ids[name] = relation
+            self._relation_names.append(name)
+        return relation
+
+    def add_chunk(self, chunk: Dict[str, Any]) -> int:
+        label = len(self._chunks)
+        self._chunks.append(chunk)
+        if label >= len(self._chunk_live):
+            grown = np.zeros(max(1024, 2 * len(self._chunk_live)), dtype=bool)
+            grown[:len(self._chunk_live)] = self._chunk_live
+            self._chunk_live = grown
+        self._chunk_live[label] = True
+        return label
+
+    def remove_chunks(self, labels: List[int]):
+        for label in labels:
+            self._chunks[label] = None
+            self._chunk_live[label] = False
+        self._dirty = True
+
+    def chunk(self, label: int) -> Dict[str, Any]:
+        return self._chunks[label]
+
+    def add_mentions(self, chunk_label: int, nodes: List[int]):
+        self._mention_node.extend(nodes)
+        self._mention_chunk.extend([chunk_label] * len(nodes))
+        self._dirty = True
+
+    def add_edges(self, chunk_label: int, edges: List[Tuple[int, int, int]]):
+        if not edges:
+            return
+        src, dst, relation = zip(*edges)
+        self._edge_src.extend(src)
+        self._edge_dst.extend(dst)
+        self._edge_relation.extend(relation)
+        self._edge_chunk.extend([chunk_label] * len(edges))
+        self._dirty = True
+
+    def neighbors(self, name: str) -> List[Tuple[str, str, int]]:
+        node = self.node_id(name)
+        if node is None:
+            return []
+        self._compact()
+        start, end = self._indptr[node], self._indptr[node + 1]
+        return [(self._node_names[n], self._relation_names[r], int(w))
+                for n, r, w in zip(self._indices[start:end], self._relations[start:end], self._weights[start:end])]
+
+    def expand(self, seeds: List[int], max_hops: int, max_nodes: int, decay: float = 0.5) -> Dict[int, float]:
+        # Bounded breadth-first expansion. When a hop would exceed max_nodes, the most strongly
+        # connected neighbours are kept.
+        self._compact()
+        scores = {node: 1.0 for node in seeds}
+        frontier = np.unique(np.asarray(seeds, dtype=np.int32))
+        for hop in range(1, max_hops + 1):
+            budget = max_nodes - len(scores)
+            if budget <= 0 or len(frontier) == 0:
+                break
+            neighbours, weights = self._gather_neighbours(frontier)
+            if len(neighbours) == 0:
+                break
+            candidates, inverse = np.unique(neighbours, return_inverse=True)
+            candidate_weights = np.bincount(inverse, weights=weights)
+            unseen = np.fromiter((node not in scores for node in candidates.tolist()), dtype=bool, count=len(candidates))
+            candidates, candidate_weights = candidates[unseen], candidate_weights[unseen]
+            if len(candidates) > budget:
+                keep = np.argpartition(candidate_weights, len(candidates) - budget)[len(candidates) - budget:]
+                candidates = candidates[keep]
+            hop_score = decay ** hop
+            for node in candidates.tolist():
+                scores[node] = hop_score
+            frontier = candidates
+        return scores
+
+    def rank_chunks(self, node_scores: Dict[int, float], top_k: int) -> List[Tuple[int, float]]:
+        self._compact()
+        if not node_scores:
+            return []
+        nodes = np.fromiter(node_scores.keys(), dtype=np.int64, count=len(node_scores))
+        node_weights = np.fromiter(node_scores.values(), dtype=np.float64, count=len(node_scores))
+        starts, ends = self._mention_indptr[nodes], self._mention_indptr[nodes + 1]
+        lengths = ends - starts
+        if lengths.sum() == 0:
+            return []
+        chunk_labels = np.concatenate([self._mention_chunks[s:e] for s, e in zip(starts, ends)])
+        chunk_weights = np.repeat(node_weights, lengths)
+
+        labels, inverse = np.unique(chunk_labels, return_inverse=True)
+        totals = np.bincount(inverse, weights=chunk_weights)
+        k = min(top_k, len(labels))
+        top = np.argpartition(-totals, k - 1)[:k]
+        top = top[np.argsort(-totals[top], kind="stable")]
+        return [(int(labels[i]), float(totals[i])) for i in top]
+
+    def _gather_neighbours(self, frontier: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        starts, ends = self._indptr[frontier], self._indptr[frontier + 1]
+        if (ends - starts).sum() == 0:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32)
+        neighbours = np.concatenate([self._indices[s:e] for s, e in zip(starts, ends)])
+        weights = np.concatenate([self._weights[s:e] for s, e in zip(starts, ends)])
+        return neighbours, weights
+
+    def _compact(self):
+        if not self._dirty:
+            return
+        num_nodes = self.num_nodes
+
+        # Drop edges and mentions that belong to deleted chunks, for good
+        live_edges = self._chunk_live[self._edge_chunk.view()]
+        for array in (self._edge_src, self._edge_dst, self._edge_relation, self._edge_chunk):
+            array.replace(array.view()[live_edges])
+        live_mentions = self._chunk_live[self._mention_chunk.view()]
+        for array in (self._mention_node, self._mention_chunk):
+            array.replace(array.view()[live_mentions])
+
+        # Undirected CSR with parallel edges merged into a single weighted edge
+        src = np.concatenate([self._edge_src.view(), self._edge_dst.view()]).astype(np.int64)
+        dst = np.concatenate([self._edge_dst.view(), self._edge_src.view()]).astype(np.int64)
+        relation = np.concatenate([self._edge_relation.view(), self._edge_relation.view()])
+        keys, first, counts = np.unique(src * num_nodes + dst, return_index=True, return_counts=True)
+        edge_src = keys // max(num_nodes, 1)
+        self._indices = (keys % max(num_nodes, 1)).astype(np.int32)
+        self._weights = counts.astype(np.int32)
+        self._relations = relation[first]
+        self._indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(edge_src, minlength=num_nodes), out=self._indptr[1:])
+
+        mention_nodes = self._mention_node.view()
+        order = np.argsort(mention_nodes, kind="stable")
+        self._mention_chunks = self._mention_chunk.view()[order]
+        self._mention_indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(mention_nodes, minlength=num_nodes), out=self._mention_indptr[1:])
+        self._dirty = False
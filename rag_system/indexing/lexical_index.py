@@ -0,0 +1,139 @@
+# rag_system/indexing/lexical_index.py
+
+import re
+from typing import Dict, List, Tuple, Iterable
+
+import numpy as np
+
+# Keeps identifiers such as "AB-1234", "v2.1" or "order_id" intact as single terms
+TOKEN_PATTERN = re.compile(r"[A-Za-z0-9](?:[A-Za-z0-9_\-./]*[A-Za-z0-9])?")
+
+
+def tokenize(text: str) -> List[str]:
+    return [token.lower() for token in TOKEN_PATTERN.findall(text)]
+
+
+class BM25Index:
+    """Inverted index scored with Okapi BM25.
+
+    New postings are appended to per-term Python lists and periodically merged into
+    compact per-term numpy arrays (sorted int32 doc labels with int32 term frequencies).
+    Deleted labels are masked at query time and purged on the next merge.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._term_ids: Dict[str, int] = {}
+        self._postings: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._pending: List[List[Tuple[int, int]]] = []
+        self._dirty_terms = set()
+        self._doc_lengths = np.zeros(1024, dtype=np.int32)
+        self._live = np.zeros(1024, dtype=bool)
+        self._num_labels = 0
+        self._num_live = 0
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return self._num_live
+
+    def add(self, label: int, tokens: Iterable[str]):
+        counts: Dict[int, int] = {}
+        length = 0
+        for token in tokens:
+            term = self._term_ids.get(token)
+            if term is None:
+                term = len(self._postings)
+                self._term_ids[token] = term
+                self._postings.append((np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32)))
+                self._pending.append([])
+            counts[term] = counts.get(term, 0) + 1
+            length += 1
+
+        if label >= len(self._doc_lengths):
+            self._grow(label + 1)
+        for term, frequency in counts.items():
+            self._pending[term].append((label, frequency))
+        self._dirty_terms.update(counts)
+        self._doc_lengths[label] = length
+        self._live[label] = True
+        self._num_labels = max(self._num_labels, label + 1)
+        self._num_live += 1
+        self._total_length += length
+
+    def remove(self, labels: Iterable[int]) -> int:
+        removed = 0
+        for label in labels:
+            if label < self._num_labels and self._live[label]:
+                self._live[label] = False
+                self._total_length -= int(self._doc_lengths[label])
+                self._num_live -= 1
+                removed += 1
+        return removed
+
+    def search(self, tokens: List[str], top_k: int = 5) -> List[Tuple[int, float]]:
+        self._merge_pending()
+        if self._num_live == 0:
+            return []
+
+        # Scores are accumulated over matching postings only, never over the whole corpus
+        average_length = self._total_length / self._num_live
+        matched_labels, contributions = [], []
+        for token in set(tokens):
+            term = self._term_ids.get(token)
+            if term is None:
+                continue
+            labels, frequencies = self._postings[term]
+            live = self._live[labels]
+            labels, frequencies = labels[live], frequencies[live]
+            if len(labels) == 0:
+                continue
+            idf = np.log1p((self._num_live - len(labels) + 0.5) / (len(labels) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[labels] / average_length)
+            matched_labels.append(labels)
+            contributions.append(idf * frequencies * (self.k1 + 1) / (frequencies + norm))
+
+        if not matched_labels:
+            return []
+        labels, inverse = np.unique(np.concatenate(matched_labels), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(contributions))
+        k = min(top_k, len(labels))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(labels[i]), float(scores[i])) for i in top]
+
+    def _merge_pending(self):
+        for term in self._dirty_terms:
+            pending = self._pending[term]
+            labels, frequencies = self._postings[term]
+            live = self._live[labels]
+            new_labels = np.fromiter((label for label, _ in pending), dtype=np.int32, count=len(pending))
+            new_frequencies = np.fromiter((frequency for _, frequency in pending), dtype=np.int32, count=len(pending))
+            labels = np.concatenate([labels[live], new_labels])
+            frequencies = np.concatenate([frequencies[live], new_frequencies])
+            order = np.argsort(labels, kind="stable")
+            self._postings[term] = (labels[order], frequencies[order])
+            self._pending[term] = []
+        self._dirty_terms = set()
+
+    def _grow(self, required: int):
+        capacity = max(required, 2 * len(self._doc_lengths))
+        lengths = np.zeros(capacity, dtype=np.int32)
+        live = np.zeros(capacity, dtype=bool)
+        lengths[:len(self._doc_lengths)] = self._doc_lengths
+        live[:len(self._live)] = self._live
+        self._doc_lengths, self._live = lengths, live
+
+
+def reciprocal_rank_fusion(result_lists: List[List[Dict]], top_k: int = 5, k: int = 60) -> List[Dict]:
+    # Merges ranked lists by id with score sum(1 / (k + rank)); the first occurrence of a
+    # result supplies its fields
+    fused: Dict[str, float] = {}
+    documents: Dict[str, Dict] = {}
+    for results in result_lists:
+        for rank, result in enumerate(results, start=1):
+            fused[result["id"]] = fused.get(result["id"], 0.0) + 1.0 / (k + rank)
+            documents.setdefault(result["id"], result)
+
+    ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:top_k]
+    return [{**documents[result_id], "score": score} for result_id, score in ranked]
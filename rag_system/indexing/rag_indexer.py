@@ -1,9 +1,26 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, List, Optional, Callable, Set, Tuple
+import os
+import threading
+import time
+import uuid
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from rag_system.core.interfaces import IMetadataRepository
+from rag_system.indexing.document_chunks import iter_document_chunks, batched
+from rag_system.indexing.vector_store import NumpyVectorIndex, normalize_rows, merge_top_k
+from rag_system.indexing.vector_segments import VectorSegment, write_segment, list_segments, next_segment_path
+from rag_system.indexing.ann_index import IVFVectorIndex
+from rag_system.indexing.knowledge_graph import GraphStore, extract_entities, COOCCURRENCE_RELATION
+from rag_system.indexing.lexical_index import BM25Index, tokenize, reciprocal_rank_fusion
+from rag_system.indexing.embeddings import get_default_embedder
+from rag_system.indexing.fingerprints import ChunkHasher, file_fingerprint
 
 
 class IndexStrategy(ABC):
+    # Whether index_document may be called from several threads at once
+    thread_safe = False
+
     @abstractmethod
     def index_document(self, document: Dict[str, Any]) -> bool:
         pass
@@ -13,58 +30,644 @@ class IndexStrategy(ABC):
         pass
 
 
+# Labels at or above 1 << SEGMENT_LABEL_SHIFT address rows of on-disk segments
+SEGMENT_LABEL_SHIFT = 40
+
+
 class VectorStoreStrategy(IndexStrategy):
+    thread_safe = True
+
+    def __init__(self, embedding_function: Optional[Callable[[List[str]], np.ndarray]] = None,
+                 dimension: Optional[int] = None, normalize: bool = True, batch_size: int = 256):
+        # embedding_function maps a list of texts to an (n, dimension) array. Documents may
+        # also carry precomputed 'embeddings' aligned with their 'chunks'.
+        self.embedding_function = embedding_function
+        self.dimension = dimension
+        self.normalize = normalize
+        self.batch_size = batch_size
+        self.index: Optional[NumpyVectorIndex] = None
+        self.segments: List[VectorSegment] = []
+        self._chunks: List[Optional[Dict[str, Any]]] = []
+        self._labels_by_chunk: Dict[str, int] = {}
+        self._labels_by_document: Dict[str, List[int]] = {}
+        self._lock = threading.RLock()
+
     def index_document(self, document: Dict[str, Any]) -> bool:
-        # Implement vector store indexing
-        pass
+        # Chunks are embedded and added in batches, so streamed documents are never held in full.
+        # Re-indexing a document is incremental: chunks whose text is unchanged keep their
+        # vectors, changed chunks are re-embedded and chunks that no longer exist are removed.
+        # Embedding runs without the lock, so documents can be indexed from several threads;
+        # only reading and changing the index is serialised.
+        document_id = document["id"]
+        precomputed = document.get("embeddings")
+        with self._lock:
+            existing = self._existing_texts(document_id)
+        seen = set()
+
+        for chunks in batched(iter_document_chunks(document), self.batch_size):
+            seen.update(chunk_id for chunk_id, _, _ in chunks)
+            changed = [chunk for chunk in chunks if existing.get(chunk[0]) != chunk[2]]
+            if not changed:
+                continue
+
+            if precomputed is not None:
+                vectors = np.asarray([precomputed[index] for _, index, _ in changed], dtype=np.float32)
+            else:
+                vectors = self._embed([text for _, _, text in changed])
+            vectors = self._prepare(vectors)
+            if len(vectors) != len(changed):
+                raise ValueError(f"Got {len(vectors)} embeddings for {len(changed)} chunks")
+
+            with self._lock:
+                # Labels are read again under the lock: a segment may have been saved meanwhile
+                document_labels = self._remove_chunks(
+                    document_id, {chunk_id for chunk_id, _, _ in changed if chunk_id in existing},
+                    list(self._labels_by_document.get(document_id, []))
+                )
+                labels = []
+                for chunk_id, index, text in changed:
+                    label = len(self._chunks)
+                    self._chunks.append({
+                        "id": chunk_id,
+                        "document_id": document_id,
+                        "chunk_index": index,
+                        "text": text
+                    })
+                    self._labels_by_chunk[chunk_id] = label
+                    labels.append(label)
+
+                if self.index is None:
+                    self.index = self._create_index(self.dimension)
+                self.index.add(labels, vectors)
+                document_labels.extend(labels)
+                self._labels_by_document[document_id] = document_labels
+
+        deleted = set(existing) - seen
+        if deleted:
+            with self._lock:
+                self._remove_chunks(document_id, deleted, list(self._labels_by_document.get(document_id, [])))
+        return bool(seen)
+
+    def remove_document(self, document_id: str) -> int:
+        with self._lock:
+            return self._remove_document(document_id)
+
+    def _remove_document(self, document_id: str) -> int:
+        removed = 0
+        for segment in self.segments:
+            rows = segment.rows_for_document(document_id)
+            if rows:
+                removed += segment.delete_rows(rows)
+
+        labels = self._labels_by_document.pop(document_id, [])
+        if not labels:
+            return removed
+        for label in labels:
+            chunk = self._chunks[label]
+            self._labels_by_chunk.pop(chunk["id"], None)
+            self._chunks[label] = None
+        return removed + self.index.remove(labels)
+
+    def document_chunks(self, document_id: str) -> List[Dict[str, Any]]:
+        # The live chunks of a document, from segments and memory, in chunk order
+        with self._lock:
+            chunks = [segment.chunk(row) for segment in self.segments
+                      for row in segment.rows_for_document(document_id)]
+            chunks.extend(self._chunks[label] for label in self._labels_by_document.get(document_id, []))
+        return sorted(chunks, key=lambda chunk: chunk["chunk_index"])
+
+    def _existing_texts(self, document_id: str) -> Dict[str, str]:
+        texts = {}
+        for segment in self.segments:
+            for row in segment.rows_for_document(document_id):
+                texts[segment.chunk_id(row)] = segment.text(row)
+        for label in self._labels_by_document.get(document_id, []):
+            chunk = self._chunks[label]
+            texts[chunk["id"]] = chunk["text"]
+        return texts
+
+    def _remove_chunks(self, document_id: str, chunk_ids: Set[str], document_labels: List[int]) -> List[int]:
+        # Removes the given chunks of one document from memory and segments; returns the labels left
+        if not chunk_ids:
+            return document_labels
+        for segment in self.segments:
+            rows = [row for row in segment.rows_for_document(document_id) if segment.chunk_id(row) in chunk_ids]
+            if rows:
+                segment.delete_rows(rows)
+
+        removed = [label for label in document_labels if self._chunks[label]["id"] in chunk_ids]
+        if removed:
+            for label in removed:
+                self._labels_by_chunk.pop(self._chunks[label]["id"], None)
+                self._chunks[label] = None
+            self.index.remove(removed)
+        remaining = [label for label in document_labels if self._chunks[label] is not None]
+        if remaining:
+            self._labels_by_document[document_id] = remaining
+        else:
+            self._labels_by_document.pop(document_id, None)
+        return remaining
+
+    def save_segment(self, directory: str) -> Optional[str]:
+        # Flushes the in-memory rows into a new immutable segment and serves them from it
+        with self._lock:
+            return self._save_segment(directory)
+
+    def _save_segment(self, directory: str) -> Optional[str]:
+        if self.index is None or len(self.index) == 0:
+            return None
+
+        labels = self.index.labels
+        chunks = [self._chunks[label] for label in labels]
+        path = write_segment(next_segment_path(directory), [chunk["id"] for chunk in chunks],
+                             self.index.vectors, [chunk["text"] for chunk in chunks], normalized=self.normalize)
+        self._open_segment(path)
+
+        self.index = None
+        self._chunks = []
+        self._labels_by_chunk = {}
+        self._labels_by_document = {}
+        return path
+
+    def load_segments(self, directory: str) -> Set[str]:
+        # Memory-maps every segment in the directory not opened yet (nothing is read until it is
+        # searched) and applies deletions other processes made to the segments already open.
+        # Returns the ids of the documents whose chunks changed.
+        with self._lock:
+            changed = set()
+            for segment in self.segments:
+                changed.update(segment.refresh_deleted())
+            opened = {segment.path for segment in self.segments}
+            for path in list_segments(directory):
+                if path not in opened:
+                    self._open_segment(path)
+                    changed.update(self.segments[-1].document_ids())
+            return changed
+
+    def _open_segment(self, path: str):
+        segment = VectorSegment(path, label_base=(len(self.segments) + 1) << SEGMENT_LABEL_SHIFT)
+        if self.dimension is None:
+            self.dimension = segment.dimension
+        elif segment.dimension != self.dimension:
+            raise ValueError(f"Segment {path} has dimension {segment.dimension}, expected {self.dimension}")
+        self.segments.append(segment)
 
     def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
-        # Implement vector store search
-        pass
+        return self.search_batch([query], top_k)[0]
+
+    def search_batch(self, queries: List[str], top_k: int = 5) -> List[List[Dict[str, Any]]]:
+        if not queries:
+            return []
+        return self.search_by_vectors(self._embed(queries), top_k)
+
+    def search_by_vector(self, vector: np.ndarray, top_k: int = 5) -> List[Dict[str, Any]]:
+        return self.search_by_vectors(np.asarray(vector).reshape(1, -1), top_k)[0]
+
+    def search_by_vectors(self, vectors: np.ndarray, top_k: int = 5) -> List[List[Dict[str, Any]]]:
+        vectors = self._prepare(vectors)
+        # Searches score a snapshot taken under the lock, so they never see an index halfway
+        # through a change, and run alongside indexing and each other
+        with self._lock:
+            sources = [segment.index.snapshot() for segment in self.segments]
+            if self.index is not None:
+                sources.append(self.index.snapshot())
+            segments, chunks = list(self.segments), self._chunks
+        if not sources:
+            return [[] for _ in range(len(vectors))]
+
+        # All queries are scored against each index in a single matrix multiply
+        results = [source.search_batch(vectors, top_k) for source in sources]
+        if len(results) == 1:
+            scores, labels = results[0]
+        else:
+            scores, labels = merge_top_k(np.concatenate([r[0] for r in results], axis=1),
+                                         np.concatenate([r[1] for r in results], axis=1), top_k)
+        return [self._to_results(row_scores, row_labels, segments, chunks)
+                for row_scores, row_labels in zip(scores, labels)]
+
+    @staticmethod
+    def _to_results(scores: np.ndarray, labels: np.ndarray, segments: List[VectorSegment],
+                    chunks: List[Optional[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        results = []
+        for score, label in zip(scores, labels):
+            if label < 0:
+                break
+            segment_number = int(label) >> SEGMENT_LABEL_SHIFT
+            if segment_number == 0:
+                chunk = chunks[label]
+                if chunk is None:
+                    # Removed since the snapshot was taken
+                    continue
+            else:
+                segment = segments[segment_number - 1]
+                chunk = segment.chunk(int(label) - segment.label_base)
+            results.append({**chunk, "score": float(score)})
+        return results
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        if self.embedding_function is None:
+            raise ValueError("VectorStoreStrategy has no embedding function; provide precomputed embeddings")
+        return np.asarray(self.embedding_function(texts), dtype=np.float32)
+
+    def _prepare(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(1, -1)
+        if self.dimension is None:
+            self.dimension = vectors.shape[1]
+        elif vectors.shape[1] != self.dimension:
+            raise ValueError(f"Expected embeddings of dimension {self.dimension}, got {vectors.shape[1]}")
+        return normalize_rows(vectors) if self.normalize else vectors
+
+    def _create_index(self, dimension: int):
+        return NumpyVectorIndex(dimension)
+
+
+class ApproximateVectorStoreStrategy(VectorStoreStrategy):
+    # IVF-backed vector store for large corpora. nprobe is the recall/latency knob and can
+    # be changed at any time; see benchmarks/ann_benchmark.py for choosing nlist and nprobe.
+    def __init__(self, embedding_function: Optional[Callable[[List[str]], np.ndarray]] = None,
+                 dimension: Optional[int] = None, normalize: bool = True,
+                 nlist: int = 1024, nprobe: int = 16, training_size: Optional[int] = None):
+        super().__init__(embedding_function, dimension, normalize)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.training_size = training_size
+
+    def set_nprobe(self, nprobe: int):
+        self.nprobe = nprobe
+        if self.index is not None:
+            self.index.nprobe = nprobe
+
+    def rebuild_index(self):
+        # Build-from-scratch path: retrain centroids on every live vector and re-assign them
+        with self._lock:
+            if self.index is None:
+                return
+            labels, vectors = self.index.labels, self.index.vectors
+            self.index = self._create_index(self.dimension)
+            if len(vectors) >= self.nlist:
+                self.index.build(labels, vectors)
+            else:
+                self.index.add(labels, vectors)
+
+    def _create_index(self, dimension: int):
+        return IVFVectorIndex(dimension, nlist=self.nlist, nprobe=self.nprobe, training_size=self.training_size)
 
 
 class KnowledgeGraphStrategy(IndexStrategy):
+    thread_safe = True
+
+    def __init__(self, entity_extractor: Optional[Callable[[str], List[str]]] = None,
+                 max_hops: int = 2, max_nodes: int = 1000, cooccurrence_window: int = 5):
+        # Entities come from entity_extractor (or a document's precomputed 'entities' per chunk);
+        # entities within cooccurrence_window of each other in a chunk are linked. Documents may
+        # also carry explicit 'relations' as (source, relation, target) triples.
+        self.entity_extractor = entity_extractor or extract_entities
+        self.max_hops = max_hops
+        self.max_nodes = max_nodes
+        self.cooccurrence_window = cooccurrence_window
+        self.graph = GraphStore()
+        self._labels_by_document: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
     def index_document(self, document: Dict[str, Any]) -> bool:
-        # Implement knowledge graph indexing
-        pass
+        # Entities are extracted without the lock; only changes to the graph are serialised.
+        # The previous version of the document is replaced once the new one is complete.
+        precomputed = document.get("entities")
+        labels = []
+        nodes_by_chunk = []
+        for chunk_id, index, text in iter_document_chunks(document):
+            names = precomputed[index] if precomputed is not None else self.entity_extractor(text)
+            with self._lock:
+                co_occurs = self.graph.intern_relation(COOCCURRENCE_RELATION)
+                label = self.graph.add_chunk({
+                    "id": chunk_id,
+                    "document_id": document["id"],
+                    "chunk_index": index,
+                    "text": text
+                })
+                labels.append(label)
+
+                nodes = list(dict.fromkeys(self.graph.intern_node(name) for name in names))
+                nodes_by_chunk.append(nodes)
+                self.graph.add_mentions(label, nodes)
+                self.graph.add_edges(label, [
+                    (node, other, co_occurs)
+                    for position, node in enumerate(nodes)
+                    for other in nodes[position + 1:position + 1 + self.cooccurrence_window]
+                ])
+
+        with self._lock:
+            for source, relation, target in document.get("relations", []) if labels else []:
+                source_node = self.graph.intern_node(source)
+                target_node = self.graph.intern_node(target)
+                # Attach the relation to the first chunk that mentions its source
+                label = next((label for label, nodes in zip(labels, nodes_by_chunk) if source_node in nodes),
+                             labels[0])
+                self.graph.add_edges(label, [(source_node, target_node, self.graph.intern_relation(relation))])
+
+            self._remove_document(document["id"])
+            if labels:
+                self._labels_by_document[document["id"]] = labels
+        return bool(labels)
+
+    def remove_document(self, document_id: str) -> int:
+        with self._lock:
+            return self._remove_document(document_id)
+
+    def _remove_document(self, document_id: str) -> int:
+        labels = self._labels_by_document.pop(document_id, [])
+        if labels:
+            self.graph.remove_chunks(labels)
+        return len(labels)
 
     def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
-        # Implement knowledge graph search
-        pass
+        names = self.entity_extractor(query)
+        with self._lock:
+            seeds = [node for node in (self.graph.node_id(name) for name in names) if node is not None]
+            if not seeds:
+                return []
+
+            node_scores = self.graph.expand(seeds, self.max_hops, self.max_nodes)
+            return [{**self.graph.chunk(label), "score": score}
+                    for label, score in self.graph.rank_chunks(node_scores, top_k)]
+
+
+class LexicalStrategy(IndexStrategy):
+    thread_safe = True
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, batch_size: int = 256):
+        self.index = BM25Index(k1, b)
+        self.batch_size = batch_size
+        self._chunks: List[Optional[Dict[str, Any]]] = []
+        self._labels_by_document: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def index_document(self, document: Dict[str, Any]) -> bool:
+        # Chunks are tokenised in batches without the lock; only changes to the index are
+        # serialised. The previous version of the document is replaced once the new one is complete.
+        labels = []
+        for chunks in batched(iter_document_chunks(document), self.batch_size):
+            tokens = [tokenize(text) for _, _, text in chunks]
+            with self._lock:
+                for (chunk_id, index, text), chunk_tokens in zip(chunks, tokens):
+                    label = len(self._chunks)
+                    self._chunks.append({
+                        "id": chunk_id,
+                        "document_id": document["id"],
+                        "chunk_index": index,
+                        "text": text
+                    })
+                    self.index.add(label, chunk_tokens)
+                    labels.append(label)
+
+        with self._lock:
+            self._remove_document(document["id"])
+            if labels:
+                self._labels_by_document[document["id"]] = labels
+        return bool(labels)
+
+    def remove_document(self, document_id: str) -> int:
+        with self._lock:
+            return self._remove_document(document_id)
+
+    def _remove_document(self, document_id: str) -> int:
+        labels = self._labels_by_document.pop(document_id, [])
+        for label in labels:
+            self._chunks[label] = None
+        return self.index.remove(labels)
+
+    def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+        tokens = tokenize(query)
+        with self._lock:
+            return [{**self._chunks[label], "score": score} for label, score in self.index.search(tokens, top_k)]
+
+
+class HybridStrategy(IndexStrategy):
+    def __init__(self, strategies: Dict[str, IndexStrategy], rrf_k: int = 60, candidate_multiplier: int = 2):
+        # Queries every strategy concurrently and fuses the rankings with reciprocal-rank fusion.
+        # Each strategy contributes top_k * candidate_multiplier candidates.
+        self.strategies = strategies
+        self.rrf_k = rrf_k
+        self.candidate_multiplier = candidate_multiplier
+        self.thread_safe = all(strategy.thread_safe for strategy in strategies.values())
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(strategies)), thread_name_prefix="hybrid-search")
+
+    def index_document(self, document: Dict[str, Any]) -> bool:
+        # Every strategy reads the chunks, so a streamed (single-pass) chunk iterator is
+        # materialised once here
+        chunks = document.get("chunks")
+        if chunks is not None and not isinstance(chunks, (list, tuple)):
+            document = {**document, "chunks": list(chunks)}
+        results = [strategy.index_document(document) for strategy in self.strategies.values()]
+        return all(results)
+
+    def remove_document(self, document_id: str) -> int:
+        return sum(strategy.remove_document(document_id) for strategy in self.strategies.values()
+                   if hasattr(strategy, "remove_document"))
+
+    def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+        candidates = top_k * self.candidate_multiplier
+        futures = {name: self._executor.submit(strategy.search, query, candidates)
+                   for name, strategy in self.strategies.items()}
+
+        result_lists = []
+        for name, future in futures.items():
+            try:
+                result_lists.append(future.result() or [])
+            except Exception as e:
+                print(f"Error searching {name} strategy: {str(e)}")
+        return reciprocal_rank_fusion(result_lists, top_k, self.rrf_k)
+
+
+def _segment_epoch(directory: str) -> str:
+    # Created with the directory and kept as long as it exists; linking fails if another
+    # process got there first, in which case its epoch is used
+    path = os.path.join(directory, "index_epoch")
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(uuid.uuid4().hex)
+        try:
+            os.link(tmp_path, path)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp_path)
+    with open(path) as f:
+        return f.read().strip()
 
 
 class RAGIndexer:
-    def __init__(self, metadata_repository: IMetadataRepository):
+    def __init__(self, metadata_repository: IMetadataRepository,
+                 embedding_function: Optional[Callable[[List[str]], np.ndarray]] = None,
+                 segment_directory: Optional[str] = None, refresh_interval: float = 5.0,
+                 companion_strategies: Optional[List[str]] = None):
+        # With a segment_directory, vectors are shared through segment files: writers call
+        # persist() to flush what they indexed, and searches pick up segments written by other
+        # processes (e.g. queue workers) at most every refresh_interval seconds
+        #
+        # Index metadata (fingerprints) records the epoch of the index it describes, and only
+        # counts for that epoch: a fresh one per process for in-memory indexes, so nothing
+        # indexed before a restart is taken as present, and the segment directory's own for
+        # the persisted vector store. Metadata for vectors not yet persisted is held back
+        # until persist() has written them.
+        #
+        # Documents indexed without an explicit strategy go into the default strategy and its
+        # companion_strategies: by default lexical, so hybrid search has both sides, and the
+        # knowledge graph, whose entities are extracted from each chunk as it is indexed.
+        # Companion indexes live in memory; those of a process sharing a segment directory are
+        # rebuilt from the chunks of segments other processes write (see refresh).
         self.metadata_repository = metadata_repository
+        self.segment_directory = segment_directory
+        self.refresh_interval = refresh_interval
+        self._last_refresh = 0.0
+        self.process_epoch = uuid.uuid4().hex
+        self.segment_epoch = _segment_epoch(segment_directory) if segment_directory else None
+        self._unpersisted_metadata: Dict[str, Tuple[Dict[str, Any], List[str]]] = {}
+        self._metadata_lock = threading.Lock()
+        vector_store = VectorStoreStrategy(embedding_function or get_default_embedder())
+        lexical = LexicalStrategy()
         self.index_strategies: Dict[str, IndexStrategy] = {
-            "vector_store": VectorStoreStrategy(),
-            "knowledge_graph": KnowledgeGraphStrategy()
+            "vector_store": vector_store,
+            "knowledge_graph": KnowledgeGraphStrategy(),
+            "lexical": lexical,
+            "hybrid": HybridStrategy({"lexical": lexical, "vector_store": vector_store})
         }
         self.default_strategy = "vector_store"
+        self.companion_strategies = ["lexical", "knowledge_graph"] if companion_strategies is None else list(companion_strategies)
+        for name in self.companion_strategies:
+            if name not in self.index_strategies:
+                raise ValueError(f"Unknown indexing strategy: {name}")
+        self.refresh()
 
-    def index_document(self, document: Dict[str, Any], strategy: Optional[str] = None) -> bool:
-        if strategy is None:
-            strategy = self.default_strategy
+    def persist(self) -> Optional[str]:
+        # Flushes the in-memory vectors into a new segment; returns its path, or None when there
+        # was nothing to write or no segment directory is configured. Not thread-safe with
+        # concurrent indexing, so callers serialise it with their index_document calls.
+        if not self.segment_directory:
+            return None
+        path = self.index_strategies["vector_store"].save_segment(self.segment_directory)
+        with self._metadata_lock:
+            unpersisted, self._unpersisted_metadata = self._unpersisted_metadata, {}
+        for document_id, (fingerprint, chunk_hashes) in unpersisted.items():
+            self._update_index_metadata(document_id, "vector_store", fingerprint, chunk_hashes)
+        return path
 
-        if strategy not in self.index_strategies:
-            raise ValueError(f"Unknown indexing strategy: {strategy}")
+    @property
+    def index_epoch(self) -> str:
+        # Epoch of the default strategy, the one files are indexed into
+        return self._epoch(self.default_strategy)
+
+    def _epoch(self, strategy: str) -> str:
+        return self.segment_epoch if self._is_persisted(strategy) else self.process_epoch
+
+    def _is_persisted(self, strategy: str) -> bool:
+        return strategy == "vector_store" and self.segment_epoch is not None
+
+    def refresh(self) -> int:
+        # Opens segments written by other processes since the last refresh, and re-indexes
+        # the documents they changed into the companion strategies; returns how many changed
+        self._last_refresh = time.monotonic()
+        if not self.segment_directory:
+            return 0
+        vector_store = self.index_strategies["vector_store"]
+        changed = vector_store.load_segments(self.segment_directory)
+        companions = [self.index_strategies[name] for name in self._strategies_for(None)
+                      if not self._is_persisted(name)]
+        for document_id in changed if companions else []:
+            chunks = vector_store.document_chunks(document_id)
+            for strategy in companions:
+                if chunks:
+                    texts = [""] * (chunks[-1]["chunk_index"] + 1)
+                    for chunk in chunks:
+                        texts[chunk["chunk_index"]] = chunk["text"]
+                    strategy.index_document({"id": document_id, "chunks": texts})
+                elif hasattr(strategy, "remove_document"):
+                    strategy.remove_document(document_id)
+        return len(changed)
+
+    def _maybe_refresh(self):
+        if self.segment_directory and time.monotonic() - self._last_refresh >= self.refresh_interval:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error loading vector segments: {str(e)}")
+
+    def index_document(self, document: Dict[str, Any], strategy: Optional[str] = None,
+                       incremental: bool = False) -> bool:
+        # Without a strategy the document goes into the default strategy and its companions.
+        # With incremental=True a document whose content fingerprint matches the last indexed
+        # version is skipped. Strategies that support it (the vector store) also re-embed only
+        # the chunks that changed on every re-index.
+        names = self._strategies_for(strategy)
 
         try:
             # Preprocess the document if needed
             processed_document = self._preprocess_document(document)
 
-            # Index the document using the selected strategy
-            success = self.index_strategies[strategy].index_document(processed_document)
+            chunks = processed_document.get("chunks")
+            if chunks is None:
+                content = processed_document.get("content", "")
+                chunks = [content] if content else []
+            elif len(names) > 1 and iter(chunks) is chunks:
+                # A single-pass stream is read once for every strategy; re-iterable streams
+                # (ChunkStream) are read again by each
+                chunks = list(chunks)
+                processed_document = {**processed_document, "chunks": chunks}
 
-            if success:
-                # Update metadata to record that this document has been indexed
-                self._update_index_metadata(document["id"], strategy)
-
-            return success
+            results = [self._index_into(name, document, processed_document, chunks, incremental) for name in names]
+            return all(results)
         except Exception as e:
             print(f"Error indexing document: {str(e)}")
             return False
 
+    def _strategies_for(self, strategy: Optional[str]) -> List[str]:
+        names = [strategy] if strategy is not None else [self.default_strategy, *self.companion_strategies]
+        for name in names:
+            if name not in self.index_strategies:
+                raise ValueError(f"Unknown indexing strategy: {name}")
+        return list(dict.fromkeys(names))
+
+    def _index_into(self, strategy: str, document: Dict[str, Any], processed_document: Dict[str, Any],
+                    chunks: Iterable[str], incremental: bool) -> bool:
+        hasher = ChunkHasher(chunks)
+        if isinstance(chunks, (list, tuple)):
+            list(hasher)
+            if incremental and self._is_unchanged(document["id"], strategy, hasher.document_hash()):
+                return True
+        else:
+            # Streamed chunks are fingerprinted while the strategy consumes them
+            processed_document = {**processed_document, "chunks": hasher}
+
+        # Index the document using the selected strategy
+        success = self.index_strategies[strategy].index_document(processed_document)
+
+        if success:
+            # Update metadata to record that this document has been indexed
+            fingerprint = self._fingerprint(document, hasher, self._epoch(strategy))
+            if self._is_persisted(strategy):
+                with self._metadata_lock:
+                    self._unpersisted_metadata[document["id"]] = (fingerprint, hasher.hashes)
+            else:
+                self._update_index_metadata(document["id"], strategy, fingerprint, hasher.hashes)
+
+        return success
+
+    def remove_document(self, document_id: str) -> int:
+        # Drops a deleted document from every strategy and clears its index metadata
+        removed = 0
+        strategies = {id(strategy): strategy for strategy in self.index_strategies.values()}
+        for strategy in strategies.values():
+            if hasattr(strategy, "remove_document") and not isinstance(strategy, HybridStrategy):
+                removed += strategy.remove_document(document_id)
+        with self._metadata_lock:
+            self._unpersisted_metadata.pop(document_id, None)
+        self.metadata_repository.delete_document(f"index_metadata::{document_id}")
+        return removed
+
     def search(self, query: str, strategy: Optional[str] = None, top_k: int = 5) -> List[Dict[str, Any]]:
         if strategy is None:
             strategy = self.default_strategy
@@ -72,23 +675,65 @@ class RAGIndexer:
         if strategy not in self.index_strategies:
             raise ValueError(f"Unknown indexing strategy: {strategy}")
 
+        self._maybe_refresh()
         try:
             return self.index_strategies[strategy].search(query, top_k)
         except Exception as e:
             print(f"Error searching index: {str(e)}")
             return []
 
+    def search_batch(self, queries: List[str], strategy: Optional[str] = None,
+                     top_k: int = 5) -> List[List[Dict[str, Any]]]:
+        if strategy is None:
+            strategy = self.default_strategy
+
+        if strategy not in self.index_strategies:
+            raise ValueError(f"Unknown indexing strategy: {strategy}")
+
+        index_strategy = self.index_strategies[strategy]
+        self._maybe_refresh()
+        try:
+            if hasattr(index_strategy, "search_batch"):
+                return index_strategy.search_batch(queries, top_k)
+            return [index_strategy.search(query, top_k) for query in queries]
+        except Exception as e:
+            print(f"Error searching index: {str(e)}")
+            return [[] for _ in queries]
+
     def _preprocess_document(self, document: Dict[str, Any]) -> Dict[str, Any]:
         # Implement any necessary preprocessing steps
         # This could include text extraction, normalization, etc.
         return document
 
-    def _update_index_metadata(self, document_id: str, strategy: str):
+    def _update_index_metadata(self, document_id: str, strategy: str, fingerprint: Dict[str, Any],
+                               chunk_hashes: List[str]):
+        # The document fingerprint and chunk hashes are recorded per strategy, since strategies
+        # are indexed independently and may hold different versions of the document
         metadata_key = f"index_metadata::{document_id}"
         existing_metadata = self.metadata_repository.get_document(metadata_key) or {}
-        existing_metadata[strategy] = {"indexed": True, "timestamp": self._get_current_timestamp()}
+        existing_metadata[strategy] = {
+            "indexed": True,
+            "timestamp": self._get_current_timestamp(),
+            "fingerprint": fingerprint,
+            "chunk_hashes": chunk_hashes
+        }
         self.metadata_repository.insert_document(metadata_key, existing_metadata)
 
+    def _is_unchanged(self, document_id: str, strategy: str, document_hash: str) -> bool:
+        metadata = self.metadata_repository.get_document(f"index_metadata::{document_id}") or {}
+        fingerprint = metadata.get(strategy, {}).get("fingerprint") or {}
+        return (fingerprint.get("content_hash") == document_hash
+                and fingerprint.get("index_epoch") == self._epoch(strategy))
+
+    @staticmethod
+    def _fingerprint(document: Dict[str, Any], hasher: ChunkHasher, index_epoch: str) -> Dict[str, Any]:
+        fingerprint = {"content_hash": hasher.document_hash(), "chunk_count": len(hasher.hashes),
+                       "index_epoch": index_epoch}
+        file_path = document.get("file_path") or document.get("metadata", {}).get("file_path")
+        if file_path:
+            fingerprint.update(file_fingerprint(file_path) or {})
+        return fingerprint
+
     @staticmethod
     def _get_current_timestamp():
         from datetime import datetime
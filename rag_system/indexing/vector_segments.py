@@ -0,0 +1,216 @@
+# rag_system/indexing/vector_segments.py
+
+import json
+import os
+import struct
+import tempfile
+import uuid
+from typing import Dict, Any, List, Optional, Set
+
+import numpy as np
+
+from rag_system.indexing.vector_store import NumpyVectorIndex
+
+# Segment file layout (little endian, every array aligned to 64 bytes):
+#   magic (8 bytes) | header length (uint32) | JSON header | vectors float32[count, dimension]
+#   | id offsets int64[count + 1] | id bytes (utf-8) | text offsets int64[count + 1] | text bytes
+# Segments are written once and never modified; deletions are kept in a sidecar
+# "<segment>.del" file holding the deleted row numbers as raw int64.
+SEGMENT_MAGIC = b"RAGVSEG1"
+SEGMENT_SUFFIX = ".vseg"
+SEGMENT_VERSION = 1
+ALIGNMENT = 64
+
+
+def _aligned(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _pack_strings(values: List[str]):
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return offsets, b"".join(encoded)
+
+
+def write_segment(path: str, ids: List[str], vectors: np.ndarray, texts: Optional[List[str]] = None,
+                  normalized: bool = True) -> str:
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    count, dimension = vectors.shape
+    if len(ids) != count:
+        raise ValueError(f"Got {len(ids)} ids for {count} vectors")
+    id_offsets, id_bytes = _pack_strings(ids)
+    text_offsets, text_bytes = _pack_strings(texts if texts is not None else [""] * count)
+
+    # Offsets are computed from a fixed-size header estimate so they can live inside the header
+    layout = {}
+    position = _aligned(len(SEGMENT_MAGIC) + 4 + 512)
+    for name, size in (("vectors", vectors.nbytes), ("id_offsets", id_offsets.nbytes),
+                       ("id_bytes", len(id_bytes)), ("text_offsets", text_offsets.nbytes),
+                       ("text_bytes", len(text_bytes))):
+        layout[name] = position
+        position = _aligned(position + size)
+
+    header = json.dumps({
+        "version": SEGMENT_VERSION,
+        "count": count,
+        "dimension": dimension,
+        "normalized": normalized,
+        "offsets": layout
+    }).encode("utf-8")
+    if len(SEGMENT_MAGIC) + 4 + len(header) > layout["vectors"]:
+        raise ValueError("Segment header too large")
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(SEGMENT_MAGIC)
+            f.write(struct.pack("<I", len(header)))
+            f.write(header)
+            for name, payload in (("vectors", vectors.tobytes()), ("id_offsets", id_offsets.tobytes()),
+                                  ("id_bytes", id_bytes), ("text_offsets", text_offsets.tobytes()),
+                                  ("text_bytes", text_bytes)):
+                f.seek(layout[name])
+                f.write(payload)
+            f.truncate(position)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+class VectorSegment:
+    """Read-only, memory-mapped view of a segment file.
+
+    Opening a segment only parses its small header; vectors, ids and texts stay on disk and
+    are paged in on demand, so processes opening the same file share the page cache.
+    """
+
+    def __init__(self, path: str, label_base: int = 0):
+        self.path = path
+        with open(path, "rb") as f:
+            magic = f.read(len(SEGMENT_MAGIC))
+            if magic != SEGMENT_MAGIC:
+                raise ValueError(f"Not a vector segment: {path}")
+            header_length, = struct.unpack("<I", f.read(4))
+            self.header: Dict[str, Any] = json.loads(f.read(header_length))
+        if self.header["version"] != SEGMENT_VERSION:
+            raise ValueError(f"Unsupported segment version {self.header['version']} in {path}")
+
+        self.count = self.header["count"]
+        self.dimension = self.header["dimension"]
+        offsets = self.header["offsets"]
+        self.vectors = self._map(np.float32, offsets["vectors"], (self.count, self.dimension))
+        self._id_offsets = self._map(np.int64, offsets["id_offsets"], (self.count + 1,))
+        self._id_bytes = self._map(np.uint8, offsets["id_bytes"], (int(self._id_offsets[-1]),))
+        self._text_offsets = self._map(np.int64, offsets["text_offsets"], (self.count + 1,))
+        self._text_bytes = self._map(np.uint8, offsets["text_bytes"], (int(self._text_offsets[-1]),))
+
+        self.label_base = label_base
+        self.index = NumpyVectorIndex.from_arrays(self.vectors, label_base + np.arange(self.count, dtype=np.int64))
+        self._rows_by_document: Optional[Dict[str, List[int]]] = None
+
+        self._deleted_rows = self._load_deleted_rows()
+        if len(self._deleted_rows):
+            self.index.remove(label_base + self._deleted_rows)
+
+    def _map(self, dtype, offset: int, shape) -> np.ndarray:
+        if 0 in shape:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(self.path, dtype=dtype, mode="r", offset=offset, shape=shape)
+
+    def chunk_id(self, row: int) -> str:
+        return bytes(self._id_bytes[self._id_offsets[row]:self._id_offsets[row + 1]]).decode("utf-8")
+
+    def text(self, row: int) -> str:
+        return bytes(self._text_bytes[self._text_offsets[row]:self._text_offsets[row + 1]]).decode("utf-8")
+
+    def chunk(self, row: int) -> Dict[str, Any]:
+        chunk_id = self.chunk_id(row)
+        document_id, _, chunk_index = chunk_id.rpartition("::")
+        return {
+            "id": chunk_id,
+            "document_id": document_id,
+            "chunk_index": int(chunk_index),
+            "text": self.text(row)
+        }
+
+    def rows_for_document(self, document_id: str) -> List[int]:
+        return self._document_rows().get(document_id, [])
+
+    def document_ids(self) -> List[str]:
+        # Documents with live rows in this segment
+        return list(self._document_rows())
+
+    def _document_rows(self) -> Dict[str, List[int]]:
+        # Live rows only. Built lazily: decoding every id is only needed once something is
+        # deleted or updated
+        if self._rows_by_document is None:
+            deleted = set(self._deleted_rows.tolist())
+            self._rows_by_document = {}
+            for row in range(self.count):
+                if row not in deleted:
+                    self._rows_by_document.setdefault(self.chunk_id(row).rpartition("::")[0], []).append(row)
+        return self._rows_by_document
+
+    def delete_rows(self, rows: List[int]) -> int:
+        removed = self.index.remove(self.label_base + np.asarray(rows, dtype=np.int64))
+        if removed:
+            deleted = np.union1d(self._load_deleted_rows(), np.asarray(rows, dtype=np.int64))
+            tmp_path = f"{self.path}.del.{os.getpid()}.tmp"
+            deleted.astype(np.int64).tofile(tmp_path)
+            os.replace(tmp_path, f"{self.path}.del")
+            # Only our own rows count as applied; rows other processes deleted are left to refresh_deleted
+            self._deleted_rows = np.union1d(self._deleted_rows, np.asarray(rows, dtype=np.int64))
+            if self._rows_by_document is not None:
+                dropped = set(rows)
+                for document_id in {self.chunk_id(row).rpartition("::")[0] for row in dropped}:
+                    live = [row for row in self._rows_by_document.get(document_id, []) if row not in dropped]
+                    if live:
+                        self._rows_by_document[document_id] = live
+                    else:
+                        self._rows_by_document.pop(document_id, None)
+        return removed
+
+    def refresh_deleted(self) -> Set[str]:
+        # Applies rows deleted by other processes since the segment was opened or last
+        # refreshed; returns the ids of the documents those rows belonged to
+        deleted_rows = self._load_deleted_rows()
+        new_rows = np.setdiff1d(deleted_rows, self._deleted_rows)
+        self._deleted_rows = np.union1d(self._deleted_rows, deleted_rows)
+        if not len(new_rows):
+            return set()
+        self.index.remove(self.label_base + new_rows)
+        self._rows_by_document = None
+        return {self.chunk_id(int(row)).rpartition("::")[0] for row in new_rows}
+
+    def _load_deleted_rows(self) -> np.ndarray:
+        deleted_path = f"{self.path}.del"
+        if not os.path.exists(deleted_path):
+            return np.empty(0, dtype=np.int64)
+        return np.fromfile(deleted_path, dtype=np.int64)
+
+
+def list_segments(directory: str) -> List[str]:
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(SEGMENT_SUFFIX))
+
+
+def _segment_sequence(path: str) -> int:
+    # "segment-000012-3fa1c2d4.vseg", or "segment-000012.vseg" as written by older versions
+    return int(os.path.basename(path)[len("segment-"):-len(SEGMENT_SUFFIX)].split("-")[0])
+
+
+def next_segment_path(directory: str) -> str:
+    # Several processes may flush into one directory, so names carry a random suffix: two
+    # writers picking the same sequence number never replace each other's segment
+    existing = list_segments(directory)
+    sequence = _segment_sequence(existing[-1]) + 1 if existing else 1
+    return os.path.join(directory, f"segment-{sequence:06d}-{uuid.uuid4().hex[:8]}{SEGMENT_SUFFIX}")
@@ -0,0 +1,174 @@
+# rag_system/indexing/vector_store.py
+
+from typing import Tuple, Iterable
+import numpy as np
+
+# Upper bound on the number of float32 scores materialised per matrix multiply (~4 MB).
+# Query batches are scored in cache-sized blocks so memory stays flat as the index grows;
+# much larger score buffers measured slower because of page-fault and cache-miss costs.
+SCORE_BUFFER_ELEMENTS = 1024 * 1024
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def merge_top_k(scores: np.ndarray, labels: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+    # Reduces per-query candidate lists (e.g. from several indexes) to a sorted top_k
+    width = scores.shape[1]
+    k = min(top_k, width)
+    if k < width:
+        candidates = np.argpartition(scores, width - k, axis=1)[:, width - k:]
+    else:
+        candidates = np.broadcast_to(np.arange(width), scores.shape)
+    top_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind="stable")
+    rows = np.take_along_axis(candidates, order, axis=1)
+
+    out_scores = np.full((len(scores), top_k), -np.inf, dtype=np.float32)
+    out_labels = np.full((len(scores), top_k), -1, dtype=np.int64)
+    out_scores[:, :k] = np.take_along_axis(scores, rows, axis=1)
+    out_labels[:, :k] = np.take_along_axis(labels, rows, axis=1)
+    return out_scores, out_labels
+
+
+class NumpyVectorIndex:
+    """Exact inner-product index over a contiguous, growable float32 matrix.
+
+    Rows are addressed by caller-supplied int64 labels. Search results are returned as
+    (scores, labels) arrays, padded with -inf / -1 when fewer than top_k rows match.
+    """
+
+    def __init__(self, dimension: int, initial_capacity: int = 1024):
+        self.dimension = dimension
+        self._vectors = np.empty((initial_capacity, dimension), dtype=np.float32)
+        self._labels = np.empty(initial_capacity, dtype=np.int64)
+        self._live = np.ones(initial_capacity, dtype=bool)
+        self._size = 0
+        self._num_deleted = 0
+        self._read_only = False
+
+    @classmethod
+    def from_arrays(cls, vectors: np.ndarray, labels: np.ndarray) -> "NumpyVectorIndex":
+        # Wraps existing arrays (e.g. np.memmap segments) without copying them
+        index = cls.__new__(cls)
+        index.dimension = vectors.shape[1]
+        index._vectors = vectors
+        index._labels = labels
+        index._live = np.ones(len(labels), dtype=bool)
+        index._size = len(labels)
+        index._num_deleted = 0
+        index._read_only = True
+        return index
+
+    def __len__(self) -> int:
+        return self._size - self._num_deleted
+
+    @property
+    def labels(self) -> np.ndarray:
+        return self._labels[:self._size][self._live[:self._size]]
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._vectors[:self._size][self._live[:self._size]]
+
+    def snapshot(self) -> "NumpyVectorIndex":
+        # A read-only view of the index as it is now, for searching while it keeps changing.
+        # Rows are only ever appended (growing copies them to new arrays), so the snapshot
+        # shares them; only the live mask is copied, unless the index is read-only, whose
+        # removals already replace the mask instead of changing it
+        n = self._size
+        index = NumpyVectorIndex.__new__(NumpyVectorIndex)
+        index.dimension = self.dimension
+        index._vectors = self._vectors[:n]
+        index._labels = self._labels[:n]
+        index._live = self._live[:n] if self._read_only else self._live[:n].copy()
+        index._size = n
+        index._num_deleted = self._num_deleted
+        index._read_only = True
+        return index
+
+    def add(self, labels: Iterable[int], vectors: np.ndarray):
+        if self._read_only:
+            raise ValueError("Cannot add vectors to a read-only index")
+
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimension)
+        labels = np.asarray(labels, dtype=np.int64).reshape(-1)
+        if len(labels) != len(vectors):
+            raise ValueError(f"Got {len(labels)} labels for {len(vectors)} vectors")
+
+        required = self._size + len(vectors)
+        if required > len(self._vectors):
+            self._grow(required)
+
+        self._vectors[self._size:required] = vectors
+        self._labels[self._size:required] = labels
+        self._live[self._size:required] = True
+        self._size = required
+
+    def remove(self, labels: Iterable[int]) -> int:
+        labels = np.asarray(list(labels), dtype=np.int64)
+        if len(labels) == 0 or self._size == 0:
+            return 0
+        mask = np.isin(self._labels[:self._size], labels) & self._live[:self._size]
+        removed = int(mask.sum())
+        if removed:
+            if self._read_only:
+                # Tombstones live outside the shared (read-only) pages
+                self._live = self._live.copy()
+            self._live[:self._size][mask] = False
+            self._num_deleted += removed
+        return removed
+
+    def search(self, query: np.ndarray, top_k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        scores, labels = self.search_batch(np.asarray(query).reshape(1, -1), top_k)
+        return scores[0], labels[0]
+
+    def search_batch(self, queries: np.ndarray, top_k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.dimension)
+        num_queries = len(queries)
+        out_scores = np.full((num_queries, top_k), -np.inf, dtype=np.float32)
+        out_labels = np.full((num_queries, top_k), -1, dtype=np.int64)
+        if self._size == 0 or top_k <= 0 or num_queries == 0:
+            return out_scores, out_labels
+
+        block = max(1, SCORE_BUFFER_ELEMENTS // self._size)
+        for start in range(0, num_queries, block):
+            end = min(start + block, num_queries)
+            scores, labels = self._top_k(queries[start:end], top_k)
+            out_scores[start:end, :scores.shape[1]] = scores
+            out_labels[start:end, :labels.shape[1]] = labels
+
+        return out_scores, out_labels
+
+    def _top_k(self, queries: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        n = self._size
+        scores = queries @ self._vectors[:n].T
+        if self._num_deleted:
+            scores[:, ~self._live[:n]] = -np.inf
+
+        k = min(top_k, n)
+        if k < n:
+            candidates = np.argpartition(scores, n - k, axis=1)[:, n - k:]
+        else:
+            candidates = np.broadcast_to(np.arange(n), (len(queries), n))
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1, kind="stable")
+        rows = np.take_along_axis(candidates, order, axis=1)
+        top_scores = np.take_along_axis(candidate_scores, order, axis=1)
+
+        labels = self._labels[rows]
+        labels[np.isneginf(top_scores)] = -1
+        return top_scores, labels
+
+    def _grow(self, required: int):
+        capacity = max(required, 2 * len(self._vectors), 1)
+        vectors = np.empty((capacity, self.dimension), dtype=np.float32)
+        labels = np.empty(capacity, dtype=np.int64)
+        live = np.ones(capacity, dtype=bool)
+        vectors[:self._size] = self._vectors[:self._size]
+        labels[:self._size] = self._labels[:self._size]
+        live[:self._size] = self._live[:self._size]
+        self._vectors, self._labels, self._live = vectors, labels, live
@@ -4,8 +4,24 @@ import json
 import os
 
 from rag_system.indexing.indexing_state_manager import IndexingStateManager, IndexingStatus
+from rag_system.indexing.rag_indexer import VectorStoreStrategy
+from rag_system.indexing.embeddings import get_default_embedder
 from rag_system.persistence.couchbase_repo import CouchbaseRepo  # Or your chosen repository implementation
 
+# Opened once per container and reused across invocations. Segments are memory-mapped,
+# so a cold start only parses their headers.
+_vector_store = None
+
+
+def get_vector_store() -> VectorStoreStrategy:
+    global _vector_store
+    if _vector_store is None:
+        _vector_store = VectorStoreStrategy(get_default_embedder())
+        segment_dir = os.environ.get('VECTOR_SEGMENT_DIR')
+        if segment_dir:
+            _vector_store.load_segments(segment_dir)
+    return _vector_store
+
 
 def lambda_handler(event, context):
     # Initialize your metadata repository
@@ -52,6 +68,25 @@ def lambda_handler(event, context):
             'body': json.dumps(jobs)
         }
 
+    elif http_method == 'POST' and path == '/search':
+        body = json.loads(event['body'])
+        vector_store = get_vector_store()
+        top_k = body.get('top_k', 5)
+        try:
+            if 'vector' in body:
+                results = vector_store.search_by_vector(body['vector'], top_k)
+            else:
+                results = vector_store.search(body['query'], top_k)
+            return {
+                'statusCode': 200,
+                'body': json.dumps({'results': results})
+            }
+        except (KeyError, ValueError) as e:
+            return {
+                'statusCode': 400,
+                'body': json.dumps({'error': str(e)})
+            }
+
     else:
         return {
             'statusCode': 404,
@@ -1,31 +1,164 @@
+import bisect
+import hashlib
 import json
 import os
-from typing import Dict, Any, List
+import threading
+import uuid
+from typing import Dict, Any, List, Optional
+from urllib.parse import quote, unquote
 from rag_system.core.interfaces import IMetadataRepository
 
+try:
+    import orjson
+
+    def _dumps(content: Any) -> bytes:
+        return orjson.dumps(content)
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(content: Any) -> bytes:
+        return json.dumps(content, separators=(",", ":")).encode("utf-8")
+
+    _loads = json.loads
+
+# Encoded keys longer than this are stored under a hash, with the key kept inside the file
+MAX_FILE_NAME_LENGTH = 200
+HASHED_NAME_MARKER = "~"
+
 
 class FileBasedMetadataRepo(IMetadataRepository):
-    def __init__(self, base_path: str):
+    """Repository storing one JSON file per document, for edge and offline deployments.
+
+    Files are spread over hashed subdirectories (shard_width hex characters, i.e. 256
+    directories by default) so no directory grows unbounded. Each write goes to a temp
+    file that is renamed over the target, so readers never see a partial document.
+    Keys are percent-encoded into file names, and a sorted in-memory key index, built at
+    startup, answers prefix queries with a binary search instead of a directory scan.
+    The index only reflects writes made through this instance: use one writer process
+    per base_path.
+    """
+
+    def __init__(self, base_path: str, shard_width: int = 2, durable: bool = False):
         self.base_path = base_path
+        self.shard_width = shard_width
+        self.durable = durable
+        self._counter_lock = threading.Lock()
+        self._index_lock = threading.Lock()
         os.makedirs(self.base_path, exist_ok=True)
+        self._keys: List[str] = []
+        self._migrate_flat_files()
+        self._load_key_index()
 
     def get_document(self, document_id: str) -> Dict[str, Any]:
-        file_path = os.path.join(self.base_path, f"{document_id}.json")
+        file_path = self._path(document_id)
         try:
-            with open(file_path, 'r') as f:
-                return json.load(f)
+            with open(file_path, 'rb') as f:
+                content = _loads(f.read())
         except FileNotFoundError:
             return {}
+        if self._is_hashed(os.path.basename(file_path)):
+            content = content["content"]
+        return content
 
     def insert_document(self, document_id: str, content: Dict[str, Any]) -> bool:
-        file_path = os.path.join(self.base_path, f"{document_id}.json")
+        file_path = self._path(document_id)
+        if self._is_hashed(os.path.basename(file_path)):
+            content = {"key": document_id, "content": content}
         try:
-            with open(file_path, 'w') as f:
-                json.dump(content, f)
-            return True
+            self._write_atomic(file_path, _dumps(content))
         except Exception as e:
             print(f"Error inserting document: {str(e)}")
             return False
+        self._add_key(document_id)
+        return True
+
+    def delete_document(self, document_id: str) -> bool:
+        try:
+            os.remove(self._path(document_id))
+        except FileNotFoundError:
+            return False
+        with self._index_lock:
+            position = bisect.bisect_left(self._keys, document_id)
+            if position < len(self._keys) and self._keys[position] == document_id:
+                del self._keys[position]
+        return True
 
     def query_keys(self, prefix: str) -> List[str]:
-        return [f.split('.')[0] for f in os.listdir(self.base_path) if f.startswith(prefix) and f.endswith('.json')]
\ No newline at end of file
+        return self.scan_keys(prefix)
+
+    def scan_keys(self, prefix: str, start_after: Optional[str] = None, limit: Optional[int] = None) -> List[str]:
+        with self._index_lock:
+            if start_after is not None and start_after >= prefix:
+                position = bisect.bisect_right(self._keys, start_after)
+            else:
+                position = bisect.bisect_left(self._keys, prefix)
+            keys = []
+            while position < len(self._keys) and self._keys[position].startswith(prefix):
+                if limit is not None and len(keys) >= limit:
+                    break
+                keys.append(self._keys[position])
+                position += 1
+            return keys
+
+    def increment_counter(self, counter_id: str, delta: int = 1) -> int:
+        # Atomic within the process
+        with self._counter_lock:
+            return super().increment_counter(counter_id, delta)
+
+    def _path(self, document_id: str) -> str:
+        digest = hashlib.sha1(document_id.encode("utf-8")).hexdigest()
+        name = quote(document_id, safe="")
+        if len(name) > MAX_FILE_NAME_LENGTH:
+            name = HASHED_NAME_MARKER + hashlib.sha256(document_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.base_path, digest[:self.shard_width], f"{name}.json")
+
+    @staticmethod
+    def _is_hashed(file_name: str) -> bool:
+        return file_name.startswith(HASHED_NAME_MARKER)
+
+    def _write_atomic(self, file_path: str, data: bytes):
+        directory = os.path.dirname(file_path)
+        tmp_path = os.path.join(directory, f".tmp-{uuid.uuid4().hex}")
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+                if self.durable:
+                    f.flush()
+                    os.fsync(f.fileno())
+        except FileNotFoundError:
+            # First document in this shard directory
+            os.makedirs(directory, exist_ok=True)
+            return self._write_atomic(file_path, data)
+        os.replace(tmp_path, file_path)
+
+    def _add_key(self, document_id: str):
+        with self._index_lock:
+            position = bisect.bisect_left(self._keys, document_id)
+            if position == len(self._keys) or self._keys[position] != document_id:
+                self._keys.insert(position, document_id)
+
+    def _load_key_index(self):
+        keys = []
+        for shard in os.scandir(self.base_path):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if not entry.name.endswith(".json"):
+                    continue
+                if self._is_hashed(entry.name):
+                    with open(entry.path, 'rb') as f:
+                        keys.append(_loads(f.read())["key"])
+                else:
+                    keys.append(unquote(entry.name[:-len(".json")]))
+        keys.sort()
+        self._keys = keys
+
+    def _migrate_flat_files(self):
+        # Earlier versions wrote <key>.json directly into base_path
+        for entry in os.scandir(self.base_path):
+            if entry.is_file() and entry.name.endswith(".json"):
+                document_id = entry.name[:-len(".json")]
+                with open(entry.path, 'rb') as f:
+                    content = _loads(f.read())
+                self.insert_document(document_id, content)
+                os.remove(entry.path)
@@ -0,0 +1,180 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Iterable, Optional, Tuple
+
+from rag_system.core.interfaces import IMetadataRepository
+
+# Marks a cached miss: the document is known not to exist
+_MISSING = object()
+
+
+class CachingMetadataRepo(IMetadataRepository):
+    """Read-through cache in front of any IMetadataRepository.
+
+    Documents are kept in a bounded LRU for ttl seconds, and misses for negative_ttl
+    seconds. query_keys results are cached per prefix. Every write made through the
+    cache (inserts, deletes, bulk writes, counters) invalidates the affected entries,
+    so this process always reads its own writes. Writes made by other processes become
+    visible when entries expire, so only cache keys that tolerate that staleness: by
+    default all of them, or just those starting with one of prefixes.
+    """
+
+    def __init__(self, repository: IMetadataRepository, max_entries: int = 10000, ttl: float = 60.0,
+                 negative_ttl: float = 5.0, prefixes: Optional[Iterable[str]] = None):
+        self.repository = repository
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.prefixes = tuple(prefixes) if prefixes is not None else None
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._queries: Dict[str, Tuple[float, List[str]]] = {}
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, so a read that raced with a write is not cached
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_document(self, document_id: str) -> Dict[str, Any]:
+        if not self._cacheable(document_id):
+            return self.repository.get_document(document_id)
+        with self._lock:
+            cached = self._lookup(document_id)
+            generation = self._generation
+        if cached is not None:
+            return {} if cached is _MISSING else copy.deepcopy(cached)
+
+        document = self.repository.get_document(document_id)
+        with self._lock:
+            if generation == self._generation:
+                self._store(document_id, document)
+        return document
+
+    def insert_document(self, document_id: str, content: Dict[str, Any]) -> bool:
+        try:
+            return self.repository.insert_document(document_id, content)
+        finally:
+            self.invalidate([document_id])
+
+    def delete_document(self, document_id: str) -> bool:
+        try:
+            return self.repository.delete_document(document_id)
+        finally:
+            self.invalidate([document_id])
+
+    def query_keys(self, prefix: str) -> List[str]:
+        if not self._cacheable(prefix):
+            return self.repository.query_keys(prefix)
+        with self._lock:
+            cached = self._queries.get(prefix)
+            generation = self._generation
+            if cached is not None and cached[0] > time.monotonic():
+                self.hits += 1
+                return list(cached[1])
+            self.misses += 1
+
+        keys = self.repository.query_keys(prefix)
+        with self._lock:
+            if generation == self._generation:
+                self._queries[prefix] = (time.monotonic() + self.ttl, list(keys))
+        return keys
+
+    def scan_keys(self, prefix: str, start_after: Optional[str] = None, limit: Optional[int] = None) -> List[str]:
+        # Pages are read once per cursor, so caching them would only evict useful entries
+        return self.repository.scan_keys(prefix, start_after, limit)
+
+    def get_many(self, document_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        documents = {}
+        pending = []
+        with self._lock:
+            generation = self._generation
+            for document_id in dict.fromkeys(document_ids):
+                cached = self._lookup(document_id) if self._cacheable(document_id) else None
+                if cached is None:
+                    pending.append(document_id)
+                elif cached is not _MISSING:
+                    documents[document_id] = copy.deepcopy(cached)
+        if not pending:
+            return documents
+
+        fetched = self.repository.get_many(pending)
+        documents.update(fetched)
+        with self._lock:
+            if generation == self._generation:
+                for document_id in pending:
+                    if self._cacheable(document_id):
+                        self._store(document_id, fetched.get(document_id))
+        return documents
+
+    def upsert_many(self, documents: Dict[str, Dict[str, Any]]) -> Dict[str, bool]:
+        try:
+            return self.repository.upsert_many(documents)
+        finally:
+            self.invalidate(documents)
+
+    def remove_many(self, document_ids: Iterable[str]) -> Dict[str, bool]:
+        document_ids = list(document_ids)
+        try:
+            return self.repository.remove_many(document_ids)
+        finally:
+            self.invalidate(document_ids)
+
+    def get_counters(self, counter_ids: Iterable[str]) -> Dict[str, int]:
+        return self.repository.get_counters(counter_ids)
+
+    def increment_counter(self, counter_id: str, delta: int = 1) -> int:
+        try:
+            return self.repository.increment_counter(counter_id, delta)
+        finally:
+            self.invalidate([counter_id])
+
+    def get_counter(self, counter_id: str) -> int:
+        return self.repository.get_counter(counter_id)
+
+    def invalidate(self, document_ids: Iterable[str]):
+        with self._lock:
+            self._generation += 1
+            for document_id in document_ids:
+                self._entries.pop(document_id, None)
+                for prefix in [prefix for prefix in self._queries if document_id.startswith(prefix)]:
+                    del self._queries[prefix]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._queries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries),
+                    "hit_rate": self.hits / lookups if lookups else 0.0}
+
+    def _cacheable(self, key: str) -> bool:
+        return self.prefixes is None or key.startswith(self.prefixes)
+
+    def _lookup(self, document_id: str) -> Any:
+        # Caller holds the lock. Returns None on a miss, _MISSING for a cached miss
+        entry = self._entries.get(document_id)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[document_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(document_id)
+        self.hits += 1
+        return entry[1]
+
+    def _store(self, document_id: str, document: Optional[Dict[str, Any]]):
+        # Caller holds the lock
+        if document:
+            self._entries[document_id] = (time.monotonic() + self.ttl, copy.deepcopy(document))
+        elif self.negative_ttl > 0:
+            self._entries[document_id] = (time.monotonic() + self.negative_ttl, _MISSING)
+        else:
+            return
+        self._entries.move_to_end(document_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
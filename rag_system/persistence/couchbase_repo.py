@@ -1,16 +1,27 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Iterable, Optional
 from couchbase.cluster import Cluster
-from couchbase.options import ClusterOptions
+from couchbase.options import (ClusterOptions, QueryOptions, IncrementOptions, DecrementOptions, DeltaValue,
+                               SignedInt64)
 from couchbase.auth import PasswordAuthenticator
 from couchbase.exceptions import DocumentNotFoundException
 from rag_system.core.interfaces import IMetadataRepository
 
 
+# Keys per multi-operation; the SDK pipelines the operations of one call over its connections
+BULK_BATCH_SIZE = 256
+
+
+def _batches(keys: List[str], size: int = BULK_BATCH_SIZE):
+    for start in range(0, len(keys), size):
+        yield keys[start:start + size]
+
+
 class CouchbaseRepo(IMetadataRepository):
     def __init__(self, connection_string: str, username: str, password: str, bucket_name: str):
         auth = PasswordAuthenticator(username, password)
-        cluster = Cluster.connect(connection_string, ClusterOptions(auth))
-        self.bucket = cluster.bucket(bucket_name)
+        # Queries run on the cluster; Bucket has no query method in SDK 4.x
+        self.cluster = Cluster.connect(connection_string, ClusterOptions(auth))
+        self.bucket = self.cluster.bucket(bucket_name)
         self.collection = self.bucket.default_collection()
 
     def get_document(self, document_id: str) -> Dict[str, Any]:
@@ -32,14 +43,32 @@ class CouchbaseRepo(IMetadataRepository):
             return False
 
     def query_keys(self, prefix: str) -> List[str]:
-        query = f"SELECT META().id FROM `{self.bucket.name}` WHERE META().id LIKE $prefix"
+        query = f"SELECT RAW META().id FROM `{self.bucket.name}` WHERE META().id LIKE $prefix"
         try:
-            result = self.bucket.query(query, prefix=f"{prefix}%")
-            return [row['id'] for row in result]
+            result = self.cluster.query(query, QueryOptions(named_parameters={"prefix": f"{prefix}%"}))
+            return list(result.rows())
         except Exception as e:
             print(f"Error querying keys with prefix {prefix}: {str(e)}")
             return []
 
+    def scan_keys(self, prefix: str, start_after: Optional[str] = None, limit: Optional[int] = None) -> List[str]:
+        # Served by an index range scan on META().id: the bucket needs a primary index or a
+        # secondary index on META().id, otherwise the query fails and no keys are returned
+        query = f"SELECT RAW META().id FROM `{self.bucket.name}` WHERE META().id LIKE $prefix"
+        parameters = {"prefix": f"{prefix}%"}
+        if start_after is not None:
+            query += " AND META().id > $start_after"
+            parameters["start_after"] = start_after
+        query += " ORDER BY META().id"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        try:
+            result = self.cluster.query(query, QueryOptions(named_parameters=parameters))
+            return list(result.rows())
+        except Exception as e:
+            print(f"Error scanning keys with prefix {prefix}: {str(e)}")
+            return []
+
     def update_document(self, document_id: str, content: Dict[str, Any]) -> bool:
         return self.insert_document(document_id, content)
 
@@ -49,4 +78,65 @@ class CouchbaseRepo(IMetadataRepository):
             return True
         except Exception as e:
             print(f"Error deleting document {document_id}: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+
+    def get_many(self, document_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        documents = {}
+        for keys in _batches(list(document_ids)):
+            result = self.collection.get_multi(keys)
+            for key, value in result.results.items():
+                documents[key] = value.content_as[dict]
+            for key, error in result.exceptions.items():
+                if not isinstance(error, DocumentNotFoundException):
+                    print(f"Error retrieving document {key}: {str(error)}")
+        return documents
+
+    def upsert_many(self, documents: Dict[str, Dict[str, Any]]) -> Dict[str, bool]:
+        outcome = {}
+        keys = list(documents)
+        for batch in _batches(keys):
+            result = self.collection.upsert_multi({key: documents[key] for key in batch})
+            for key in batch:
+                outcome[key] = key not in result.exceptions
+            for key, error in result.exceptions.items():
+                print(f"Error inserting document {key}: {str(error)}")
+        return outcome
+
+    def remove_many(self, document_ids: Iterable[str]) -> Dict[str, bool]:
+        outcome = {}
+        for batch in _batches(list(document_ids)):
+            result = self.collection.remove_multi(batch)
+            for key in batch:
+                outcome[key] = key not in result.exceptions
+            for key, error in result.exceptions.items():
+                if not isinstance(error, DocumentNotFoundException):
+                    print(f"Error deleting document {key}: {str(error)}")
+        return outcome
+
+    def get_counters(self, counter_ids: Iterable[str]) -> Dict[str, int]:
+        counters = {}
+        for keys in _batches(list(counter_ids)):
+            result = self.collection.get_multi(keys)
+            for key in keys:
+                counters[key] = int(result.results[key].content_as[int]) if key in result.results else 0
+        return counters
+
+    def increment_counter(self, counter_id: str, delta: int = 1) -> int:
+        # Native binary counters: atomic across every client of the bucket. initial is the
+        # value a missing counter is created with (the delta is not applied on top of it),
+        # so it must already include the delta. Counters are unsigned: decrements clamp at
+        # 0, and a missing counter that is decremented is created at 0
+        binary = self.collection.binary()
+        if delta >= 0:
+            result = binary.increment(counter_id, IncrementOptions(delta=DeltaValue(delta),
+                                                                   initial=SignedInt64(delta)))
+        else:
+            result = binary.decrement(counter_id, DecrementOptions(delta=DeltaValue(-delta),
+                                                                   initial=SignedInt64(0)))
+        return result.content
+
+    def get_counter(self, counter_id: str) -> int:
+        try:
+            return int(self.collection.get(counter_id).content_as[int])
+        except DocumentNotFoundException:
+            return 0
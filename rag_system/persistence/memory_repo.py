@@ -0,0 +1,86 @@
+import copy
+import threading
+from typing import Dict, Any, List, Iterable, Optional
+
+from rag_system.core.interfaces import IMetadataRepository
+
+
+class InMemoryMetadataRepo(IMetadataRepository):
+    """Local fake of a metadata repository for tests and single-process development.
+
+    Documents are deep-copied on the way in and out, so callers cannot mutate stored
+    state by accident, just as with a remote store. Counters are atomic. call_counts
+    records how many round trips each method made.
+    """
+
+    def __init__(self):
+        self._documents: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.call_counts: Dict[str, int] = {}
+
+    def _count(self, method: str):
+        self.call_counts[method] = self.call_counts.get(method, 0) + 1
+
+    def get_document(self, document_id: str) -> Dict[str, Any]:
+        with self._lock:
+            self._count("get_document")
+            return copy.deepcopy(self._documents.get(document_id, {}))
+
+    def insert_document(self, document_id: str, content: Dict[str, Any]) -> bool:
+        with self._lock:
+            self._count("insert_document")
+            self._documents[document_id] = copy.deepcopy(content)
+            return True
+
+    def delete_document(self, document_id: str) -> bool:
+        with self._lock:
+            self._count("delete_document")
+            return self._documents.pop(document_id, None) is not None
+
+    def query_keys(self, prefix: str) -> List[str]:
+        with self._lock:
+            self._count("query_keys")
+            return sorted(key for key in self._documents if key.startswith(prefix))
+
+    def scan_keys(self, prefix: str, start_after: Optional[str] = None, limit: Optional[int] = None) -> List[str]:
+        with self._lock:
+            self._count("scan_keys")
+            keys = sorted(key for key in self._documents
+                          if key.startswith(prefix) and (start_after is None or key > start_after))
+            return keys if limit is None else keys[:limit]
+
+    def get_many(self, document_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            self._count("get_many")
+            return {document_id: copy.deepcopy(self._documents[document_id])
+                    for document_id in document_ids if document_id in self._documents}
+
+    def upsert_many(self, documents: Dict[str, Dict[str, Any]]) -> Dict[str, bool]:
+        with self._lock:
+            self._count("upsert_many")
+            for document_id, content in documents.items():
+                self._documents[document_id] = copy.deepcopy(content)
+            return {document_id: True for document_id in documents}
+
+    def remove_many(self, document_ids: Iterable[str]) -> Dict[str, bool]:
+        with self._lock:
+            self._count("remove_many")
+            return {document_id: self._documents.pop(document_id, None) is not None for document_id in document_ids}
+
+    def get_counters(self, counter_ids: Iterable[str]) -> Dict[str, int]:
+        with self._lock:
+            self._count("get_counters")
+            return {counter_id: int(self._documents.get(counter_id, {}).get("value", 0)) for counter_id in counter_ids}
+
+    def increment_counter(self, counter_id: str, delta: int = 1) -> int:
+        with self._lock:
+            self._count("increment_counter")
+            value = int(self._documents.get(counter_id, {}).get("value", 0)) + delta
+            self._documents[counter_id] = {"value": value}
+            return value
+
+    def get_counter(self, counter_id: str) -> int:
+        with self._lock:
+            self._count("get_counter")
+            return int(self._documents.get(counter_id, {}).get("value", 0))
+
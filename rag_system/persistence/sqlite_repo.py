@@ -0,0 +1,199 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Any, List, Iterable, Optional, Tuple
+from rag_system.core.interfaces import IMetadataRepository
+
+try:
+    import orjson
+
+    def _dumps(content: Any) -> bytes:
+        return orjson.dumps(content)
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(content: Any) -> bytes:
+        return json.dumps(content, separators=(",", ":")).encode("utf-8")
+
+    _loads = json.loads
+
+# Keeps each IN (...) list under SQLite's bound parameter limit
+BULK_BATCH_SIZE = 500
+
+
+def _prefix_range(prefix: str) -> Tuple[str, Optional[str]]:
+    # Keys starting with prefix are exactly those in [prefix, upper): a range scan on the
+    # primary key index instead of a LIKE
+    for position in range(len(prefix) - 1, -1, -1):
+        if ord(prefix[position]) < 0x10FFFF:
+            return prefix, prefix[:position] + chr(ord(prefix[position]) + 1)
+    return prefix, None
+
+
+def _batches(items: List[Any], size: int = BULK_BATCH_SIZE) -> Iterable[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class SQLiteMetadataRepo(IMetadataRepository):
+    """Embedded metadata repository in a single SQLite database (WAL), for single-node
+    deployments and CI.
+
+    Documents live in one table keyed by document id, so prefix queries are range scans
+    on the primary key. Each thread reads through its own connection and, with WAL,
+    readers never block on the writer. Writes share one connection under a lock and bulk
+    writes commit in a single transaction. Counters are incremented inside an IMMEDIATE
+    transaction, so they are atomic across processes using the same file.
+    """
+
+    def __init__(self, path: str, durable: bool = False):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+        self._writer = self._connect()
+        self._writer.execute(f"PRAGMA synchronous={'FULL' if durable else 'NORMAL'}")
+        self._writer.execute(
+            "CREATE TABLE IF NOT EXISTS documents (key TEXT PRIMARY KEY, value BLOB NOT NULL) WITHOUT ROWID"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, check_same_thread=False, timeout=30, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    def _reader(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._connect()
+            connection.execute("PRAGMA query_only=ON")
+            self._local.connection = connection
+        return connection
+
+    def _write(self, statements: List[Tuple[str, Iterable[Any]]]):
+        with self._write_lock:
+            self._writer.execute("BEGIN IMMEDIATE")
+            try:
+                for sql, parameters in statements:
+                    self._writer.executemany(sql, parameters)
+                self._writer.execute("COMMIT")
+            except Exception:
+                self._writer.execute("ROLLBACK")
+                raise
+
+    def get_document(self, document_id: str) -> Dict[str, Any]:
+        try:
+            row = self._reader().execute("SELECT value FROM documents WHERE key = ?", (document_id,)).fetchone()
+        except Exception as e:
+            print(f"Error retrieving document {document_id}: {str(e)}")
+            return {}
+        return _loads(row[0]) if row else {}
+
+    def insert_document(self, document_id: str, content: Dict[str, Any]) -> bool:
+        return self.upsert_many({document_id: content})[document_id]
+
+    def delete_document(self, document_id: str) -> bool:
+        return self.remove_many([document_id])[document_id]
+
+    def query_keys(self, prefix: str) -> List[str]:
+        return self.scan_keys(prefix)
+
+    def scan_keys(self, prefix: str, start_after: Optional[str] = None, limit: Optional[int] = None) -> List[str]:
+        lower, upper = _prefix_range(prefix)
+        sql = "SELECT key FROM documents WHERE key >= ?"
+        parameters: List[Any] = [lower]
+        if upper is not None:
+            sql += " AND key < ?"
+            parameters.append(upper)
+        if start_after is not None:
+            sql += " AND key > ?"
+            parameters.append(start_after)
+        sql += " ORDER BY key"
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+        try:
+            return [row[0] for row in self._reader().execute(sql, parameters)]
+        except Exception as e:
+            print(f"Error querying keys with prefix {prefix}: {str(e)}")
+            return []
+
+    def get_many(self, document_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        documents = {}
+        reader = self._reader()
+        try:
+            # One read transaction, so the batch is a consistent snapshot
+            reader.execute("BEGIN")
+            for batch in _batches(list(dict.fromkeys(document_ids))):
+                rows = reader.execute(
+                    f"SELECT key, value FROM documents WHERE key IN ({','.join('?' * len(batch))})", batch
+                )
+                documents.update((key, _loads(value)) for key, value in rows)
+            reader.execute("COMMIT")
+        except Exception as e:
+            if reader.in_transaction:
+                reader.execute("ROLLBACK")
+            print(f"Error retrieving documents: {str(e)}")
+        return documents
+
+    def upsert_many(self, documents: Dict[str, Dict[str, Any]]) -> Dict[str, bool]:
+        try:
+            self._write([(
+                "INSERT INTO documents (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                [(document_id, _dumps(content)) for document_id, content in documents.items()]
+            )])
+        except Exception as e:
+            print(f"Error inserting documents: {str(e)}")
+            return {document_id: False for document_id in documents}
+        return {document_id: True for document_id in documents}
+
+    def remove_many(self, document_ids: Iterable[str]) -> Dict[str, bool]:
+        document_ids = list(document_ids)
+        results = {document_id: False for document_id in document_ids}
+        with self._write_lock:
+            self._writer.execute("BEGIN IMMEDIATE")
+            try:
+                for document_id in document_ids:
+                    cursor = self._writer.execute("DELETE FROM documents WHERE key = ?", (document_id,))
+                    results[document_id] = results[document_id] or cursor.rowcount == 1
+                self._writer.execute("COMMIT")
+            except Exception as e:
+                self._writer.execute("ROLLBACK")
+                print(f"Error deleting documents: {str(e)}")
+                return {document_id: False for document_id in document_ids}
+        return results
+
+    def get_counters(self, counter_ids: Iterable[str]) -> Dict[str, int]:
+        counter_ids = list(counter_ids)
+        documents = self.get_many(counter_ids)
+        return {counter_id: int(documents.get(counter_id, {}).get("value", 0)) for counter_id in counter_ids}
+
+    def increment_counter(self, counter_id: str, delta: int = 1) -> int:
+        with self._write_lock:
+            self._writer.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._writer.execute("SELECT value FROM documents WHERE key = ?", (counter_id,)).fetchone()
+                value = int(_loads(row[0]).get("value", 0) if row else 0) + delta
+                self._writer.execute(
+                    "INSERT INTO documents (key, value) VALUES (?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                    (counter_id, _dumps({"value": value}))
+                )
+                self._writer.execute("COMMIT")
+            except Exception:
+                self._writer.execute("ROLLBACK")
+                raise
+        return value
+
+    def get_counter(self, counter_id: str) -> int:
+        return int(self.get_document(counter_id).get("value", 0))
+
+    def close(self):
+        with self._write_lock:
+            self._writer.close()
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
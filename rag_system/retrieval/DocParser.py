@@ -1,7 +1,17 @@
+import os
+
 from rag_system.core.pipeline_element import PipelineElement
-from typing import Dict, Any
+from rag_system.retrieval.parsers import ParserRegistry, TextStream, get_default_registry
+from typing import Dict, Any, Optional
+
+# Files above this size are parsed as a stream instead of being loaded whole
+STREAMING_THRESHOLD_BYTES = 16 * 1024 * 1024
+
 
 class DocParser(PipelineElement):
+    def __init__(self, registry: Optional[ParserRegistry] = None):
+        self.registry = registry or get_default_registry()
+
     def execute(self, context: Dict[str, Any]) -> bool:
         document = context.get('document')
         parser = context.get('parser')
@@ -10,6 +20,14 @@ class DocParser(PipelineElement):
             print("Missing document or parser in context")
             return False
 
+        if self._should_stream(document, context):
+            # CanonicalModel chunks the stream lazily; parsed_content only carries metadata.
+            # The stream re-parses the document on every pass, so it has no single owner.
+            self.registry.get(parser)  # unknown parsers fail here rather than in a later element
+            context['parsed_stream'] = TextStream(parser, document, self.registry)
+            context['parsed_content'] = {'text': '', 'metadata': document.get('metadata', {})}
+            return True
+
         # Parse the document using the selected parser
         parsed_content = self._parse_document(document, parser)
         context['parsed_content'] = parsed_content
@@ -17,9 +35,11 @@ class DocParser(PipelineElement):
         return True
 
     def _parse_document(self, document: Dict[str, Any], parser: str) -> Dict[str, Any]:
-        # Logic to parse the document using the specified parser
-        # This is a placeholder implementation
-        return {
-            'text': f"Parsed content using {parser}",
-            'metadata': document.get('metadata', {})
-        }
+        return self.registry.get(parser).parse(document)
+
+    @staticmethod
+    def _should_stream(document: Dict[str, Any], context: Dict[str, Any]) -> bool:
+        if 'stream' in context:
+            return bool(context['stream'])
+        file_path = document.get('file_path')
+        return bool(file_path) and os.path.getsize(file_path) > STREAMING_THRESHOLD_BYTES
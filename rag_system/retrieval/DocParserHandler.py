@@ -1,8 +1,12 @@
 from rag_system.core.pipeline_element import PipelineElement
-from typing import Dict, Any
+from rag_system.retrieval.parsers import ParserRegistry, get_default_registry, detect_doc_type
+from typing import Dict, Any, Optional
 
 
 class DocParserHandler(PipelineElement):
+    def __init__(self, registry: Optional[ParserRegistry] = None):
+        self.registry = registry or get_default_registry()
+
     def execute(self, context: Dict[str, Any]) -> bool:
         document = context.get('document')
         if not document:
@@ -13,20 +17,16 @@ class DocParserHandler(PipelineElement):
         doc_type = self._determine_doc_type(document)
         context['doc_type'] = doc_type
         context['parser'] = self._get_parser(doc_type)
+        if context['parser'] is None:
+            print(f"No parser available for document type: {doc_type}")
+            return False
 
         return True
 
     def _determine_doc_type(self, document: Dict[str, Any]) -> str:
-        # Logic to determine document type (e.g., based on file extension or content)
-        # This is a placeholder implementation
-        return document.get('file_type', 'unknown')
+        # Sniffs the first few KB of content, then falls back to file_type and the extension
+        return detect_doc_type(document)
 
     def _get_parser(self, doc_type: str) -> Any:
-        # Logic to return appropriate parser based on doc_type
-        # This is a placeholder implementation
-        parser_map = {
-            'pdf': 'PDFParser',
-            'docx': 'DocxParser',
-            'txt': 'TextParser'
-        }
-        return parser_map.get(doc_type, 'GenericParser')
+        # Parser names resolve to instances in DocParser through the same registry
+        return self.registry.parser_name(doc_type)
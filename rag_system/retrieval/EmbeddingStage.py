@@ -0,0 +1,52 @@
+from rag_system.core.pipeline_element import PipelineElement
+from rag_system.indexing.embeddings import get_default_embedder
+from typing import Dict, Any, List
+
+
+class EmbeddingStage(PipelineElement):
+    def __init__(self):
+        # Configured from the environment, see get_default_embedder
+        self.embedder = get_default_embedder()
+
+    def execute(self, context: Dict[str, Any]) -> bool:
+        canonical_document = context.get('canonical_document')
+        if not canonical_document:
+            print("No canonical document found in context")
+            return False
+
+        # Streamed chunks are left alone; the vector store embeds them batch by batch
+        chunks = canonical_document.get('chunks', [])
+        if not isinstance(chunks, (list, tuple)):
+            return True
+
+        # Embeddings are aligned with 'chunks' so the vector store can skip embedding them
+        canonical_document['embeddings'] = self.embedder.embed(chunks)
+        canonical_document['embedding_model'] = self.embedder.model_name
+
+        return True
+
+    def execute_batch(self, contexts: List[Dict[str, Any]]) -> List[bool]:
+        # One embedding call for the chunks of every document in the batch
+        documents = [context.get('canonical_document') for context in contexts]
+        texts = []
+        for document in documents:
+            if document and isinstance(document.get('chunks', []), (list, tuple)):
+                texts.extend(document.get('chunks', []))
+
+        embeddings = self.embedder.embed(texts)
+        results = []
+        offset = 0
+        for document in documents:
+            if not document:
+                print("No canonical document found in context")
+                results.append(False)
+                continue
+            if not isinstance(document.get('chunks', []), (list, tuple)):
+                results.append(True)
+                continue
+            count = len(document.get('chunks', []))
+            document['embeddings'] = embeddings[offset:offset + count]
+            document['embedding_model'] = self.embedder.model_name
+            offset += count
+            results.append(True)
+        return results
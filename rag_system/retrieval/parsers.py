@@ -0,0 +1,295 @@
+# rag_system/retrieval/parsers.py
+
+import codecs
+import io
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterator, List, Optional
+
+READ_BLOCK_SIZE = 1024 * 1024
+SNIFF_BYTES = 8192
+
+EXTENSION_TYPES = {
+    '.pdf': 'pdf',
+    '.docx': 'docx',
+    '.txt': 'txt',
+    '.md': 'txt',
+    '.csv': 'txt',
+    '.json': 'txt',
+    '.log': 'txt',
+}
+
+# Binary formats we recognise but cannot parse; detecting them avoids decoding them as text
+BINARY_SIGNATURES = [
+    (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'doc'),
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpeg'),
+    (b'GIF8', 'gif'),
+    (b'\x1f\x8b', 'gzip'),
+]
+
+
+def _open_source(document: Dict[str, Any]):
+    # Documents reference a file ('file_path') or carry their raw bytes/text ('content')
+    if document.get('file_path'):
+        return open(document['file_path'], 'rb')
+    content = document.get('content', b'')
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return io.BytesIO(content)
+
+
+def read_head(document: Dict[str, Any], size: int = SNIFF_BYTES) -> bytes:
+    with _open_source(document) as f:
+        return f.read(size)
+
+
+def sniff_doc_type(head: bytes) -> Optional[str]:
+    # Detects the type from the leading bytes; returns None when the content is inconclusive
+    if head.lstrip(b'\xef\xbb\xbf\r\n\t ').startswith(b'%PDF-'):
+        return 'pdf'
+    if head.startswith(b'PK\x03\x04'):
+        # OOXML packages list their parts in the local file headers, usually within the first KB
+        if b'word/' in head:
+            return 'docx'
+        return 'zip'
+    for signature, doc_type in BINARY_SIGNATURES:
+        if head.startswith(signature):
+            return doc_type
+    if head and b'\x00' not in head:
+        try:
+            # A multi-byte character may be cut at the end of the sniffed block
+            codecs.getincrementaldecoder('utf-8')().decode(head)
+            return 'txt'
+        except UnicodeDecodeError:
+            return None
+    return None
+
+
+def detect_doc_type(document: Dict[str, Any]) -> str:
+    # Content wins over labels: a mislabelled file would otherwise fail in a full parse. A
+    # bare 'zip' only says the file is a package (e.g. a docx whose parts list does not start
+    # with word/), so a declared type or the extension is preferred over it
+    sniffed = None
+    if document.get('file_path') or document.get('content'):
+        sniffed = sniff_doc_type(read_head(document))
+        if sniffed is not None and sniffed != 'zip':
+            return sniffed
+    if document.get('file_type'):
+        return document['file_type']
+    _, extension = os.path.splitext(document.get('file_path') or document.get('file_name') or '')
+    return EXTENSION_TYPES.get(extension.lower(), sniffed or 'unknown')
+
+
+class DocumentParser(ABC):
+    name = "DocumentParser"
+
+    def parse(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'text': "".join(self.iter_text(document)),
+            'metadata': document.get('metadata', {})
+        }
+
+    @abstractmethod
+    def iter_text(self, document: Dict[str, Any]) -> Iterator[str]:
+        # Yields the document text in pieces, in order, without holding all of it
+        pass
+
+    def close(self):
+        pass
+
+
+class TextParser(DocumentParser):
+    name = "TextParser"
+
+    def iter_text(self, document: Dict[str, Any]) -> Iterator[str]:
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        with _open_source(document) as f:
+            while True:
+                block = f.read(READ_BLOCK_SIZE)
+                if not block:
+                    break
+                yield decoder.decode(block)
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            yield tail
+
+
+class DocxParser(DocumentParser):
+    name = "DocxParser"
+
+    def iter_text(self, document: Dict[str, Any]) -> Iterator[str]:
+        import docx
+
+        with _open_source(document) as f:
+            parsed = docx.Document(f)
+        for paragraph in parsed.paragraphs:
+            if paragraph.text:
+                yield paragraph.text + "\n\n"
+        for table in parsed.tables:
+            for row in table.rows:
+                yield " | ".join(cell.text for cell in row.cells) + "\n"
+
+
+def _extract_page_range(path: str, start: int, end: int) -> List[str]:
+    # Runs in a worker process: each worker opens its own handle, as pdfium is not thread-safe
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(path)
+    try:
+        pages = []
+        for index in range(start, end):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            pages.append(textpage.get_text_range())
+            textpage.close()
+            page.close()
+        return pages
+    finally:
+        pdf.close()
+
+
+class PDFParser(DocumentParser):
+    """PDF text extraction with pypdfium2.
+
+    Documents with more than parallel_threshold pages are split into ranges of
+    pages_per_task pages and parsed in a process pool. Results are reassembled in page
+    order and streamed page by page as soon as each range, and every range before it,
+    is done. At most two ranges per worker are in flight, so a slow consumer holds a
+    bounded number of extracted pages however long the document is.
+    """
+
+    name = "PDFParser"
+
+    def __init__(self, pages_per_task: int = 16, parallel_threshold: int = 32, max_workers: Optional[int] = None):
+        self.pages_per_task = pages_per_task
+        self.parallel_threshold = parallel_threshold
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def parse(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        pages = list(self.iter_pages(document))
+        return {
+            'text': "\n\n".join(pages),
+            'metadata': {**document.get('metadata', {}), 'page_count': len(pages)}
+        }
+
+    def iter_text(self, document: Dict[str, Any]) -> Iterator[str]:
+        for page in self.iter_pages(document):
+            yield page + "\n\n"
+
+    def iter_pages(self, document: Dict[str, Any]) -> Iterator[str]:
+        import pypdfium2 as pdfium
+
+        path, temporary = self._materialize(document)
+        try:
+            pdf = pdfium.PdfDocument(path)
+            page_count = len(pdf)
+            pdf.close()
+
+            if page_count <= self.parallel_threshold:
+                yield from _extract_page_range(path, 0, page_count)
+                return
+
+            window = 2 * (self.max_workers or os.cpu_count() or 1)
+            in_flight = deque()
+            try:
+                for start in range(0, page_count, self.pages_per_task):
+                    if len(in_flight) >= window:
+                        yield from in_flight.popleft().result()
+                    end = min(start + self.pages_per_task, page_count)
+                    in_flight.append(self.executor.submit(_extract_page_range, path, start, end))
+                while in_flight:
+                    yield from in_flight.popleft().result()
+            finally:
+                # A consumer that stops early leaves no queued ranges behind
+                for future in in_flight:
+                    future.cancel()
+        finally:
+            if temporary:
+                os.remove(path)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    @staticmethod
+    def _materialize(document: Dict[str, Any]):
+        # Worker processes open the file by path, so in-memory content is spilled to disk
+        if document.get('file_path'):
+            return document['file_path'], False
+        fd, path = tempfile.mkstemp(suffix=".pdf")
+        with os.fdopen(fd, 'wb') as f:
+            f.write(document.get('content', b''))
+        return path, True
+
+
+class TextStream:
+    """Re-iterable text of a document: every iteration parses it again with iter_text.
+
+    Holds the parser by name. A copy pickled into another process resolves it from that
+    process's default registry.
+    """
+
+    def __init__(self, parser_name: str, document: Dict[str, Any], registry: Optional["ParserRegistry"] = None):
+        self.parser_name = parser_name
+        self.document = document
+        self.registry = registry
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.registry or get_default_registry()).get(self.parser_name).iter_text(self.document)
+
+    def __getstate__(self):
+        return {**self.__dict__, "registry": None}
+
+
+class ParserRegistry:
+    def __init__(self):
+        self._parsers: Dict[str, DocumentParser] = {}
+        self._by_doc_type: Dict[str, str] = {}
+
+    def register(self, doc_type: str, parser: DocumentParser):
+        self._parsers[parser.name] = parser
+        self._by_doc_type[doc_type] = parser.name
+
+    def parser_name(self, doc_type: str) -> Optional[str]:
+        return self._by_doc_type.get(doc_type)
+
+    def get(self, parser_name: str) -> DocumentParser:
+        parser = self._parsers.get(parser_name)
+        if parser is None:
+            raise ValueError(f"Unknown parser: {parser_name}")
+        return parser
+
+    def close(self):
+        for parser in self._parsers.values():
+            parser.close()
+
+
+def build_default_registry() -> ParserRegistry:
+    registry = ParserRegistry()
+    registry.register('pdf', PDFParser())
+    registry.register('docx', DocxParser())
+    registry.register('txt', TextParser())
+    return registry
+
+
+_default_registry: Optional[ParserRegistry] = None
+
+
+def get_default_registry() -> ParserRegistry:
+    # One registry per worker process, so parser instances (and their pools) stay warm across documents
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = build_default_registry()
+    return _default_registry
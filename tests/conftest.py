@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Tests import the rag_system package from the repository root and never call a remote embedding model
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("EMBEDDING_MODEL", "hashing")
@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+
+from rag_system.core.exceptions import PipelineException
+from rag_system.execution.async_engine import AsyncPipelineEngine
+
+
+class Step:
+    """Records when it starts and finishes in a shared log; optionally fails or stops its branch."""
+
+    def __init__(self, name, log, delay=0.01, result=True, error=None):
+        self.name = name
+        self.log = log
+        self.delay = delay
+        self.result = result
+        self.error = error
+
+    async def execute(self, context):
+        self.log.append(("start", self.name))
+        await asyncio.sleep(self.delay)
+        self.log.append(("end", self.name))
+        if self.error is not None:
+            raise self.error
+        context.setdefault("ran", []).append(self.name)
+        return self.result
+
+
+def run(engine, elements, dependencies=None, run_id=None):
+    return asyncio.run(engine.run("pipeline", elements, {}, run_id=run_id, dependencies=dependencies))
+
+
+def position(log, event, name):
+    return log.index((event, name))
+
+
+def test_elements_without_dependencies_run_in_order():
+    log = []
+    engine = AsyncPipelineEngine()
+    context = run(engine, [(name, Step(name, log)) for name in ("a", "b", "c")])
+
+    assert context["ran"] == ["a", "b", "c"]
+    assert log == [("start", "a"), ("end", "a"), ("start", "b"), ("end", "b"), ("start", "c"), ("end", "c")]
+
+
+def test_independent_branches_run_concurrently_after_their_dependencies():
+    log = []
+    engine = AsyncPipelineEngine(max_concurrency_per_run=4)
+    elements = [(name, Step(name, log)) for name in ("parse", "embed", "graph", "index")]
+    dependencies = {"embed": ["parse"], "graph": ["parse"], "index": ["embed", "graph"]}
+
+    run(engine, elements, dependencies, run_id="r1")
+
+    assert position(log, "end", "parse") < position(log, "start", "embed")
+    assert position(log, "end", "parse") < position(log, "start", "graph")
+    # Both branches start before either finishes
+    assert max(position(log, "start", "embed"), position(log, "start", "graph")) < \
+        min(position(log, "end", "embed"), position(log, "end", "graph"))
+    assert position(log, "start", "index") > max(position(log, "end", "embed"), position(log, "end", "graph"))
+    assert engine.get_run("r1")["status"] == "completed"
+    assert set(engine.get_run("r1")["elements"].values()) == {"completed"}
+
+
+def test_a_stopped_branch_skips_only_what_depends_on_it():
+    log = []
+    engine = AsyncPipelineEngine()
+    elements = [("parse", Step("parse", log)), ("filter", Step("filter", log, result=False)),
+                ("index", Step("index", log)), ("audit", Step("audit", log))]
+    dependencies = {"filter": ["parse"], "index": ["filter"], "audit": ["parse"]}
+
+    context = run(engine, elements, dependencies, run_id="r1")
+
+    states = engine.get_run("r1")["elements"]
+    assert states == {"parse": "completed", "filter": "stopped", "index": "skipped", "audit": "completed"}
+    assert sorted(context["ran"]) == ["audit", "filter", "parse"]
+    assert engine.get_run("r1")["status"] == "stopped"
+
+
+def test_a_pipeline_exception_stops_the_branch():
+    engine = AsyncPipelineEngine()
+    elements = [("a", Step("a", [], error=PipelineException("no content"))), ("b", Step("b", []))]
+
+    run(engine, elements, run_id="r1")
+
+    assert engine.get_run("r1")["elements"] == {"a": "stopped", "b": "skipped"}
+    assert engine.get_run("r1")["status"] == "stopped"
+    assert "no content" in engine.get_run("r1")["error"]
+
+
+def test_an_element_error_fails_the_run():
+    engine = AsyncPipelineEngine()
+    elements = [("a", Step("a", [], error=RuntimeError("boom"))), ("b", Step("b", []))]
+
+    with pytest.raises(RuntimeError):
+        run(engine, elements, run_id="r1")
+
+    failed = engine.get_run("r1")
+    assert failed["status"] == "failed"
+    assert failed["error"] == "boom"
+    assert "finished_at" in failed
+
+
+def test_unsatisfiable_dependencies_are_reported():
+    engine = AsyncPipelineEngine()
+    elements = [("a", Step("a", [])), ("b", Step("b", []))]
+
+    with pytest.raises(PipelineException):
+        run(engine, elements, {"a": ["b"], "b": ["a"]})
+
+
+def test_synchronous_elements_run_in_the_executor():
+    class Upper:
+        def execute(self, context):
+            context["text"] = context["text"].upper()
+            return True
+
+    engine = AsyncPipelineEngine()
+    context = asyncio.run(engine.run("pipeline", [("upper", Upper())], {"text": "abc"}))
+    engine.shutdown()
+
+    assert context["text"] == "ABC"
+
+
+def test_fail_run_records_a_run_that_never_started():
+    engine = AsyncPipelineEngine()
+
+    run_id = engine.fail_run("pipeline", "Pipeline not found")
+
+    failed = engine.get_run(run_id)
+    assert failed["status"] == "failed"
+    assert failed["error"] == "Pipeline not found"
+    assert failed["pipeline_id"] == "pipeline"
+    assert "finished_at" in failed
+
+
+def test_fail_run_updates_a_pending_run():
+    engine = AsyncPipelineEngine()
+    run_id = engine.new_run("pipeline", "r1")
+
+    assert engine.fail_run("pipeline", "Could not load", run_id) == "r1"
+    assert engine.get_run("r1")["status"] == "failed"
+    assert engine.get_run("r1")["error"] == "Could not load"
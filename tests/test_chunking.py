@@ -0,0 +1,81 @@
+import pickle
+
+import pytest
+
+from rag_system.core.models.chunking import ChunkStream, StreamingChunker
+
+
+def count_words(text):
+    return len(text.split())
+
+
+def chunker(max_tokens=10, overlap_tokens=4, min_fill=0.5):
+    return StreamingChunker(max_tokens, overlap_tokens, min_fill, token_counter=count_words)
+
+
+TEXT = ("One two three. Four five six. Seven eight. Nine ten eleven twelve. Thirteen fourteen.\n\n"
+        "Fifteen sixteen seventeen. Eighteen.")
+
+
+def test_chunks_are_whole_sentences_within_the_budget():
+    chunks = chunker().chunk_text(TEXT)
+
+    assert chunks == [
+        "One two three. Four five six. Seven eight.",
+        "Seven eight. Nine ten eleven twelve. Thirteen fourteen.",
+        "Thirteen fourteen.\n\nFifteen sixteen seventeen. Eighteen.",
+    ]
+    assert all(count_words(chunk) <= 10 for chunk in chunks)
+
+
+def test_chunks_repeat_trailing_sentences_up_to_the_overlap():
+    chunks = chunker(overlap_tokens=4).chunk_text(TEXT)
+    assert chunks[1].startswith("Seven eight.")
+
+    no_overlap = chunker(overlap_tokens=0).chunk_text(TEXT)
+    assert no_overlap[1].startswith("Nine ten")
+    assert " ".join(no_overlap).split() == TEXT.split()
+
+
+def test_chunk_boundaries_do_not_depend_on_how_the_text_is_split():
+    expected = chunker().chunk_text(TEXT)
+
+    for size in (1, 2, 7, 13):
+        pieces = [TEXT[start:start + size] for start in range(0, len(TEXT), size)]
+        assert list(chunker().chunk_stream(pieces)) == expected
+
+
+def test_a_paragraph_break_ends_a_chunk_once_min_fill_is_reached():
+    text = "Alpha beta gamma delta epsilon zeta.\n\nEta theta."
+
+    assert chunker(min_fill=0.5).chunk_text(text) == ["Alpha beta gamma delta epsilon zeta.", "Eta theta."]
+    assert chunker(min_fill=0.9).chunk_text(text) == ["Alpha beta gamma delta epsilon zeta.\n\nEta theta."]
+
+
+def test_text_without_boundaries_is_cut_at_whitespace():
+    words = [f"w{i}" for i in range(25)]
+    chunks = chunker().chunk_text(" ".join(words))
+
+    assert all(count_words(chunk) <= 10 for chunk in chunks)
+    assert " ".join(chunks).split() == words
+
+
+def test_overlap_must_be_smaller_than_the_budget():
+    with pytest.raises(ValueError):
+        StreamingChunker(max_tokens=10, overlap_tokens=10)
+
+
+def test_chunk_stream_can_be_read_again_and_pickled():
+    stream = ChunkStream([TEXT[:40], TEXT[40:]], chunker())
+
+    first = list(stream)
+    assert list(stream) == first
+    assert list(pickle.loads(pickle.dumps(stream))) == first
+
+
+def test_a_single_pass_chunk_stream_refuses_a_second_read():
+    stream = ChunkStream(iter([TEXT]), chunker())
+    list(stream)
+
+    with pytest.raises(RuntimeError):
+        list(stream)
@@ -0,0 +1,76 @@
+import pytest
+
+# The API modules import the application container, which needs the Couchbase SDK
+pytest.importorskip("couchbase")
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from rag_system.api.composer_service import _etag_matches, get_pipeline_composer, router  # noqa: E402
+from rag_system.composition.pipeline_composer import PipelineComposer  # noqa: E402
+from rag_system.composition.pipeline_store import pipeline_version  # noqa: E402
+from rag_system.persistence.memory_repo import InMemoryMetadataRepo  # noqa: E402
+
+DEFINITION = {"name": "ingest", "description": "Parse and index", "elements": ["a.Parser", "a.Indexer"]}
+EDITED = {**DEFINITION, "elements": ["a.Parser", "a.Chunker", "a.Indexer"]}
+
+
+@pytest.fixture
+def composer():
+    composer = PipelineComposer()
+    composer.init(InMemoryMetadataRepo())
+    return composer
+
+
+@pytest.fixture
+def client(composer):
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_pipeline_composer] = lambda: composer
+    return TestClient(app)
+
+
+def test_etag_matching():
+    etag = '"abc"'
+
+    assert _etag_matches('"abc"', etag)
+    assert _etag_matches('W/"abc"', etag)
+    assert _etag_matches('"other", "abc"', etag)
+    assert _etag_matches("*", etag)
+    assert not _etag_matches('"other"', etag)
+    assert not _etag_matches(None, etag)
+    assert not _etag_matches("", etag)
+
+
+def test_the_etag_is_the_pipeline_version(client, composer):
+    composer.pipeline_store.save("ingest", DEFINITION)
+
+    response = client.get("/pipelines/ingest")
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == f'"{pipeline_version(DEFINITION)}"'
+
+
+def test_an_unchanged_pipeline_revalidates_with_304(client, composer):
+    composer.pipeline_store.save("ingest", DEFINITION)
+    etag = client.get("/pipelines/ingest").headers["etag"]
+
+    response = client.get("/pipelines/ingest", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+
+def test_an_edited_pipeline_gets_a_new_etag(client, composer):
+    composer.pipeline_store.save("ingest", DEFINITION)
+    etag = client.get("/pipelines/ingest").headers["etag"]
+    composer.pipeline_store.save("ingest", EDITED)
+
+    response = client.get("/pipelines/ingest", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == f'"{pipeline_version(EDITED)}"'
+
+
+def test_a_missing_pipeline_is_404(client):
+    assert client.get("/pipelines/missing").status_code == 404
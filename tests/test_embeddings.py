@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from rag_system.indexing.embeddings import (BatchedEmbedder, EmbeddingCache, HashingEmbedder, OpenAIEmbedder,
+                                            get_default_embedder)
+
+
+class RecordingEmbedder(HashingEmbedder):
+    """The deterministic local embedder, recording the batches it is asked for."""
+
+    def __init__(self, dimension: int = 32):
+        super().__init__(dimension)
+        self.batches = []
+
+    async def embed_batch(self, texts):
+        self.batches.append(list(texts))
+        return await super().embed_batch(texts)
+
+
+def test_hashing_embedder_is_deterministic():
+    first = BatchedEmbedder(HashingEmbedder(32)).embed(["alpha beta", "gamma"])
+    second = BatchedEmbedder(HashingEmbedder(32)).embed(["alpha beta", "gamma"])
+
+    assert first.shape == (2, 32)
+    assert np.array_equal(first, second)
+
+
+def test_batches_are_bounded_by_count_and_tokens():
+    embedder = RecordingEmbedder()
+    texts = [f"text number {i}" for i in range(10)]
+    BatchedEmbedder(embedder, max_batch_size=4).embed(texts)
+    assert [len(batch) for batch in embedder.batches] == [4, 4, 2]
+
+    embedder = RecordingEmbedder()
+    BatchedEmbedder(embedder, max_batch_tokens=2, token_counter=lambda text: 1).embed(texts)
+    assert all(len(batch) == 2 for batch in embedder.batches)
+
+
+def test_repeated_chunks_are_embedded_once():
+    embedder = RecordingEmbedder()
+    batched = BatchedEmbedder(embedder)
+    vectors = batched.embed(["same", "other", "same", "same"])
+
+    assert sorted(text for batch in embedder.batches for text in batch) == ["other", "same"]
+    assert batched.stats["requested"] == 4 and batched.stats["embedded"] == 2
+    assert np.array_equal(vectors[0], vectors[2]) and np.array_equal(vectors[0], vectors[3])
+
+
+def test_cache_hits_are_keyed_by_content_hash_and_model(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "embeddings.db"))
+    first = RecordingEmbedder(32)
+    expected = BatchedEmbedder(first, cache=cache).embed(["cached text"])
+
+    again = RecordingEmbedder(32)
+    batched = BatchedEmbedder(again, cache=cache)
+    assert np.array_equal(batched.embed(["cached text"]), expected)
+    assert again.batches == [] and batched.stats["cache_hits"] == 1
+
+    # Same text, different model: not a hit
+    other_model = RecordingEmbedder(16)
+    BatchedEmbedder(other_model, cache=cache).embed(["cached text"])
+    assert other_model.batches == [["cached text"]]
+    cache.close()
+
+
+def test_remote_model_without_key_fails_on_first_embed(monkeypatch):
+    monkeypatch.setenv("EMBEDDING_MODEL", "text-embedding-3-small")
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    embedder = get_default_embedder()
+
+    assert isinstance(embedder.embedder, OpenAIEmbedder)
+    with pytest.raises(ValueError, match="OPENAI_API_KEY"):
+        embedder.embed(["text"])
+    assert embedder.stats["batches"] == 1
+
+
+def test_hashing_model_is_selected_explicitly(monkeypatch):
+    monkeypatch.setenv("EMBEDDING_MODEL", "hashing")
+    monkeypatch.setenv("EMBEDDING_DIMENSION", "64")
+
+    assert get_default_embedder().model_name == "hashing-64"
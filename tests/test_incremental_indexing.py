@@ -0,0 +1,114 @@
+import os
+
+from rag_system.indexing.embeddings import get_default_embedder
+from rag_system.indexing.indexing_state_manager import IndexingStateManager, IndexingStatus
+from rag_system.indexing.rag_indexer import RAGIndexer
+from rag_system.persistence.memory_repo import InMemoryMetadataRepo
+
+
+class CountingEmbedder:
+    """The default (hashing) embedder, recording every text it embeds."""
+
+    def __init__(self):
+        self.embedder = get_default_embedder()
+        self.texts = []
+
+    def __call__(self, texts):
+        self.texts.extend(texts)
+        return self.embedder(texts)
+
+
+def file_statuses(manager, job_id):
+    return {entry["file_path"]: entry["status"] for entry in manager.get_indexing_status(job_id)["files"]}
+
+
+def index_job(manager, files, epoch):
+    job_id = manager.create_indexing_job(files, incremental=True, index_epoch=epoch)
+    pending = manager.get_pending_files(job_id)
+    manager.update_file_statuses(job_id, [(path, IndexingStatus.COMPLETED, None) for path in pending])
+    return job_id
+
+
+def test_unchanged_files_are_skipped_even_when_touched(tmp_path):
+    manager = IndexingStateManager(InMemoryMetadataRepo())
+    path = tmp_path / "notes.txt"
+    path.write_text("graphite anodes")
+    index_job(manager, [str(path)], "epoch")
+
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    job_id = manager.create_indexing_job([str(path)], incremental=True, index_epoch="epoch")
+
+    assert file_statuses(manager, job_id) == {str(path): IndexingStatus.SKIPPED.value}
+
+
+def test_files_with_new_content_are_indexed_again(tmp_path):
+    manager = IndexingStateManager(InMemoryMetadataRepo())
+    path = tmp_path / "notes.txt"
+    path.write_text("graphite anodes")
+    index_job(manager, [str(path)], "epoch")
+
+    stat = os.stat(path)
+    path.write_text("graphite cathode")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    job_id = manager.create_indexing_job([str(path)], incremental=True, index_epoch="epoch")
+
+    assert file_statuses(manager, job_id) == {str(path): IndexingStatus.PENDING.value}
+
+
+def test_fingerprints_of_another_index_epoch_do_not_count(tmp_path):
+    manager = IndexingStateManager(InMemoryMetadataRepo())
+    path = tmp_path / "notes.txt"
+    path.write_text("graphite anodes")
+    index_job(manager, [str(path)], "epoch")
+
+    job_id = manager.create_indexing_job([str(path)], incremental=True, index_epoch="new-epoch")
+
+    assert file_statuses(manager, job_id) == {str(path): IndexingStatus.PENDING.value}
+
+
+def test_unchanged_document_is_not_embedded_again():
+    embedder = CountingEmbedder()
+    indexer = RAGIndexer(InMemoryMetadataRepo(), embedding_function=embedder, companion_strategies=[])
+    document = {"id": "doc", "chunks": ["graphite anodes", "lithium cathodes"]}
+    indexer.index_document(document, incremental=True)
+    embedder.texts.clear()
+
+    assert indexer.index_document(document, incremental=True)
+    assert embedder.texts == []
+
+
+def test_only_changed_chunks_are_embedded_again():
+    embedder = CountingEmbedder()
+    indexer = RAGIndexer(InMemoryMetadataRepo(), embedding_function=embedder, companion_strategies=[])
+    indexer.index_document({"id": "doc", "chunks": ["graphite anodes", "lithium cathodes", "copper foil"]})
+    embedder.texts.clear()
+
+    indexer.index_document({"id": "doc", "chunks": ["graphite anodes", "sodium cathodes", "copper foil"]},
+                           incremental=True)
+
+    assert embedder.texts == ["sodium cathodes"]
+    texts = {result["text"] for result in indexer.search("cathodes", strategy="vector_store", top_k=10)}
+    assert texts == {"graphite anodes", "sodium cathodes", "copper foil"}
+
+
+def test_deleted_chunks_are_removed():
+    indexer = RAGIndexer(InMemoryMetadataRepo())
+    indexer.index_document({"id": "doc", "chunks": ["graphite anodes", "lithium cathodes", "copper foil"]})
+
+    indexer.index_document({"id": "doc", "chunks": ["graphite anodes"]}, incremental=True)
+
+    for strategy in ("vector_store", "lexical"):
+        results = indexer.search("graphite lithium copper", strategy=strategy, top_k=10)
+        assert [result["id"] for result in results] == ["doc::0"]
+
+
+def test_chunk_hashes_are_recorded_per_strategy():
+    indexer = RAGIndexer(InMemoryMetadataRepo())
+    indexer.index_document({"id": "doc", "chunks": ["graphite anodes", "lithium cathodes"]})
+    indexer.index_document({"id": "doc", "chunks": ["graphite anodes"]}, strategy="lexical")
+
+    status = indexer.get_index_status("doc")
+    assert "chunk_hashes" not in status
+    assert len(status["vector_store"]["chunk_hashes"]) == 2
+    assert len(status["lexical"]["chunk_hashes"]) == 1
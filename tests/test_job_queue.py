@@ -0,0 +1,130 @@
+import pytest
+
+from rag_system.execution import job_queue
+from rag_system.execution.job_queue import DONE, FAILED, LEASED, QUEUED, JobQueue
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(job_queue.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    queue = JobQueue(str(tmp_path / "queue.db"), retry_delay=5.0, max_retry_delay=300.0)
+    yield queue
+    queue.close()
+
+
+def test_tasks_are_leased_by_priority_then_age(queue, clock):
+    low = queue.enqueue("index_files", {"n": 1})
+    clock[0] += 1
+    high = queue.enqueue("index_files", {"n": 2}, priority=5)
+    clock[0] += 1
+    newer_low = queue.enqueue("index_files", {"n": 3})
+
+    assert [queue.lease("w")["id"] for _ in range(3)] == [high, low, newer_low]
+    assert queue.lease("w") is None
+
+
+def test_leases_are_filtered_by_kind(queue):
+    queue.enqueue("index_files", {})
+    pipeline_task = queue.enqueue("execute_pipeline", {})
+
+    assert queue.lease("w", kinds=["execute_pipeline"])["id"] == pipeline_task
+    assert queue.lease("w", kinds=["execute_pipeline"]) is None
+
+
+def test_a_leased_task_is_not_handed_out_again(queue):
+    task_id = queue.enqueue("index_files", {"job_id": "j"})
+
+    task = queue.lease("worker-1", lease_seconds=60)
+    assert task["id"] == task_id
+    assert task["status"] == LEASED
+    assert task["attempts"] == 1
+    assert task["payload"] == {"job_id": "j"}
+    assert queue.lease("worker-2") is None
+
+
+def test_an_expired_lease_is_taken_over(queue, clock):
+    task_id = queue.enqueue("index_files", {})
+    queue.lease("worker-1", lease_seconds=60)
+
+    clock[0] += 61
+    task = queue.lease("worker-2", lease_seconds=60)
+
+    assert task["id"] == task_id
+    assert task["lease_owner"] == "worker-2"
+    assert task["attempts"] == 2
+    assert task["last_error"] == "Lease expired"
+    # The first worker lost its lease and can neither renew it nor report a result
+    assert not queue.heartbeat(task_id, "worker-1")
+    assert not queue.complete(task_id, "worker-1", {"ok": True})
+    assert queue.complete(task_id, "worker-2", {"ok": True})
+    assert queue.get(task_id)["result"] == {"ok": True}
+
+
+def test_heartbeats_keep_the_lease(queue, clock):
+    task_id = queue.enqueue("index_files", {})
+    queue.lease("worker-1", lease_seconds=60)
+
+    clock[0] += 50
+    assert queue.heartbeat(task_id, "worker-1", lease_seconds=60)
+    clock[0] += 50
+    assert queue.lease("worker-2") is None
+
+
+def test_an_expired_lease_on_the_last_attempt_fails_the_task(queue, clock):
+    task_id = queue.enqueue("index_files", {}, max_attempts=1)
+    queue.lease("worker-1", lease_seconds=60)
+
+    clock[0] += 61
+    assert queue.lease("worker-2") is None
+    task = queue.get(task_id)
+    assert task["status"] == FAILED
+    assert task["last_error"] == "Lease expired"
+
+
+def test_failed_tasks_are_retried_with_backoff(queue, clock):
+    task_id = queue.enqueue("index_files", {}, max_attempts=3)
+
+    queue.lease("w")
+    assert queue.fail(task_id, "w", "boom")
+    task = queue.get(task_id)
+    assert task["status"] == QUEUED
+    assert task["last_error"] == "boom"
+    assert task["available_at"] == clock[0] + 5.0
+
+    clock[0] += 4
+    assert queue.lease("w") is None
+    clock[0] += 1
+    assert queue.lease("w")["attempts"] == 2
+
+    # The delay doubles with every attempt
+    queue.fail(task_id, "w", "boom")
+    assert queue.get(task_id)["available_at"] == clock[0] + 10.0
+
+
+def test_tasks_fail_once_their_attempts_are_used(queue, clock):
+    task_id = queue.enqueue("index_files", {}, max_attempts=2)
+    for _ in range(2):
+        clock[0] += 300
+        queue.lease("w")
+        queue.fail(task_id, "w", "boom")
+
+    assert queue.get(task_id)["status"] == FAILED
+    clock[0] += 300
+    assert queue.lease("w") is None
+    assert queue.stats() == {FAILED: 1}
+
+
+def test_only_the_lease_owner_can_fail_or_complete(queue):
+    task_id = queue.enqueue("index_files", {})
+    queue.lease("worker-1")
+
+    assert not queue.fail(task_id, "worker-2", "boom")
+    assert not queue.complete(task_id, "worker-2")
+    assert queue.complete(task_id, "worker-1")
+    assert queue.get(task_id)["status"] == DONE
@@ -0,0 +1,44 @@
+from rag_system.persistence.memory_repo import InMemoryMetadataRepo
+
+
+def test_upsert_many_then_get_many_in_one_call_each():
+    repo = InMemoryMetadataRepo()
+    outcome = repo.upsert_many({"doc:1": {"value": 1}, "doc:2": {"value": 2}})
+
+    assert outcome == {"doc:1": True, "doc:2": True}
+    assert repo.get_many(["doc:1", "doc:2"]) == {"doc:1": {"value": 1}, "doc:2": {"value": 2}}
+    assert repo.call_counts == {"upsert_many": 1, "get_many": 1}
+
+
+def test_get_many_leaves_out_missing_documents():
+    repo = InMemoryMetadataRepo()
+    repo.insert_document("doc:1", {"value": 1})
+
+    assert repo.get_many(["doc:1", "doc:missing"]) == {"doc:1": {"value": 1}}
+
+
+def test_upsert_many_overwrites_existing_documents():
+    repo = InMemoryMetadataRepo()
+    repo.insert_document("doc:1", {"value": 1})
+    repo.upsert_many({"doc:1": {"value": 10}})
+
+    assert repo.get_document("doc:1") == {"value": 10}
+
+
+def test_remove_many_reports_which_documents_existed():
+    repo = InMemoryMetadataRepo()
+    repo.upsert_many({"doc:1": {}, "doc:2": {}})
+
+    assert repo.remove_many(["doc:1", "doc:missing"]) == {"doc:1": True, "doc:missing": False}
+    assert repo.query_keys("doc:") == ["doc:2"]
+
+
+def test_bulk_documents_are_copied():
+    repo = InMemoryMetadataRepo()
+    content = {"items": [1]}
+    repo.upsert_many({"doc:1": content})
+    content["items"].append(2)
+    fetched = repo.get_many(["doc:1"])["doc:1"]
+    fetched["items"].append(3)
+
+    assert repo.get_document("doc:1") == {"items": [1]}
@@ -0,0 +1,55 @@
+from rag_system.execution.pipeline_plan import PlanCache
+
+
+def definition(*element_types):
+    return {"elements": list(element_types)}
+
+
+def test_plans_are_compiled_once_per_version():
+    cache = PlanCache()
+    loads = []
+
+    def load():
+        loads.append(1)
+        return definition("builtins.dict")
+
+    first = cache.get_or_compile("pipeline", "v1", load)
+    second = cache.get_or_compile("pipeline", "v1", load)
+
+    assert first is second
+    assert len(loads) == 1
+
+
+def test_versions_of_one_pipeline_are_cached_side_by_side():
+    cache = PlanCache()
+    old = cache.get_or_compile("pipeline", "v1", lambda: definition("builtins.dict"))
+    new = cache.get_or_compile("pipeline", "v2", lambda: definition("builtins.dict", "builtins.list"))
+
+    assert cache.get("pipeline", "v1") is old
+    assert cache.get("pipeline", "v2") is new
+    assert new.order == ["builtins.dict", "builtins.list"]
+
+
+def test_least_recently_used_plans_are_evicted():
+    cache = PlanCache(max_plans=2)
+    cache.get_or_compile("a", "v1", lambda: definition("builtins.dict"))
+    cache.get_or_compile("b", "v1", lambda: definition("builtins.dict"))
+    cache.get("a", "v1")
+    cache.get_or_compile("c", "v1", lambda: definition("builtins.dict"))
+
+    assert cache.get("a", "v1") is not None
+    assert cache.get("b", "v1") is None
+    assert cache.get("c", "v1") is not None
+
+
+def test_invalidate_drops_every_version_of_a_pipeline():
+    cache = PlanCache()
+    cache.get_or_compile("pipeline", "v1", lambda: definition("builtins.dict"))
+    cache.get_or_compile("pipeline", "v2", lambda: definition("builtins.dict"))
+    cache.get_or_compile("other", "v1", lambda: definition("builtins.dict"))
+
+    cache.invalidate("pipeline")
+
+    assert cache.get("pipeline", "v1") is None
+    assert cache.get("pipeline", "v2") is None
+    assert cache.get("other", "v1") is not None
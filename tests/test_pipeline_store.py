@@ -0,0 +1,74 @@
+from rag_system.composition.pipeline_store import PipelineStore, head_key, pipeline_version
+from rag_system.persistence.memory_repo import InMemoryMetadataRepo
+
+DEFINITION = {"name": "ingest", "description": "Parse and index", "elements": ["a.Parser", "a.Indexer"]}
+EDITED = {**DEFINITION, "elements": ["a.Parser", "a.Chunker", "a.Indexer"]}
+
+
+def test_save_returns_the_content_hash_and_loads_it_back():
+    store = PipelineStore(InMemoryMetadataRepo())
+
+    version = store.save("ingest", DEFINITION)
+
+    assert version == pipeline_version(DEFINITION)
+    assert store.version("ingest") == version
+    assert store.load("ingest") == DEFINITION
+    assert store.load_version(version) == DEFINITION
+
+
+def test_the_version_ignores_key_order():
+    reordered = dict(reversed(list(DEFINITION.items())))
+
+    assert pipeline_version(reordered) == pipeline_version(DEFINITION)
+    assert pipeline_version(EDITED) != pipeline_version(DEFINITION)
+
+
+def test_an_edit_moves_the_head_and_keeps_the_old_version():
+    store = PipelineStore(InMemoryMetadataRepo())
+    old = store.save("ingest", DEFINITION)
+
+    new = store.save("ingest", EDITED)
+
+    assert new != old
+    assert store.version("ingest") == new
+    assert store.load("ingest") == EDITED
+    assert store.load_version(old) == DEFINITION
+
+
+def test_saving_the_same_definition_keeps_the_version():
+    store = PipelineStore(InMemoryMetadataRepo())
+
+    assert store.save("ingest", DEFINITION) == store.save("ingest", dict(DEFINITION))
+    assert store.save("copy", DEFINITION) == store.version("ingest")
+
+
+def test_heads_written_before_versioning_read_as_their_content_hash():
+    repo = InMemoryMetadataRepo()
+    repo.insert_document(head_key("legacy"), DEFINITION)
+    store = PipelineStore(repo)
+
+    assert store.version("legacy") == pipeline_version(DEFINITION)
+    assert store.load("legacy") == DEFINITION
+    assert list(store.iter_pipelines()) == [("legacy", pipeline_version(DEFINITION), DEFINITION)]
+
+
+def test_save_many_and_iteration_in_id_order():
+    store = PipelineStore(InMemoryMetadataRepo())
+
+    versions = store.save_many({"b": EDITED, "a": DEFINITION})
+
+    assert versions == {"a": pipeline_version(DEFINITION), "b": pipeline_version(EDITED)}
+    assert store.list_ids() == ["a", "b"]
+    assert store.list_ids(limit=1, start_after="a") == ["b"]
+    assert list(store.iter_pipelines(batch_size=1)) == [("a", versions["a"], DEFINITION),
+                                                        ("b", versions["b"], EDITED)]
+
+
+def test_delete_removes_the_head_only():
+    store = PipelineStore(InMemoryMetadataRepo())
+    version = store.save("ingest", DEFINITION)
+
+    assert store.delete("ingest")
+    assert store.version("ingest") is None
+    assert store.load("ingest") is None
+    assert store.load_version(version) == DEFINITION
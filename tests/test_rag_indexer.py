@@ -0,0 +1,77 @@
+from rag_system.indexing.indexing_worker import FileIndexer
+from rag_system.indexing.rag_indexer import RAGIndexer
+from rag_system.persistence.memory_repo import InMemoryMetadataRepo
+
+
+def chunk_ids(results):
+    return sorted(result["id"] for result in results)
+
+
+def test_default_indexing_fills_the_lexical_index():
+    indexer = RAGIndexer(InMemoryMetadataRepo())
+
+    assert indexer.index_document({"id": "doc", "chunks": ["graphite anodes", "lithium cathodes"]})
+    assert chunk_ids(indexer.search("graphite", strategy="lexical")) == ["doc::0"]
+    assert "doc::0" in chunk_ids(indexer.search("graphite", strategy="hybrid"))
+
+
+def test_single_pass_stream_reaches_every_strategy():
+    indexer = RAGIndexer(InMemoryMetadataRepo())
+
+    assert indexer.index_document({"id": "doc", "chunks": iter(["graphite anodes", "lithium cathodes"])})
+    assert chunk_ids(indexer.search("cathodes", strategy="lexical")) == ["doc::1"]
+    assert len(indexer.search("cathodes", strategy="vector_store")) == 2
+
+
+def test_file_indexer_fills_the_lexical_index(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("Graphite anodes degrade slowly.\n\nLithium cathodes hold the charge.")
+    indexer = RAGIndexer(InMemoryMetadataRepo())
+
+    assert FileIndexer(indexer)(str(path))
+    assert [result["document_id"] for result in indexer.search("graphite", strategy="lexical")] == [str(path)]
+
+
+def test_lexical_index_follows_segments_written_by_other_processes(tmp_path):
+    writer = RAGIndexer(InMemoryMetadataRepo(), segment_directory=str(tmp_path))
+    writer.index_document({"id": "doc", "chunks": ["graphite anodes", "lithium cathodes"]})
+    writer.persist()
+
+    reader = RAGIndexer(InMemoryMetadataRepo(), segment_directory=str(tmp_path))
+    assert chunk_ids(reader.search("graphite", strategy="lexical")) == ["doc::0"]
+
+    writer.index_document({"id": "doc", "chunks": ["graphite anodes", "sodium cathodes"]})
+    writer.persist()
+    reader.refresh()
+    assert chunk_ids(reader.search("sodium", strategy="lexical")) == ["doc::1"]
+    assert reader.search("lithium", strategy="lexical") == []
+    assert chunk_ids(reader.search("graphite", strategy="lexical")) == ["doc::0"]
+
+    writer.remove_document("doc")
+    reader.refresh()
+    assert reader.search("graphite", strategy="lexical") == []
+
+
+def test_default_indexing_fills_the_knowledge_graph():
+    indexer = RAGIndexer(InMemoryMetadataRepo())
+    indexer.index_document({"id": "doc", "chunks": ["Marie Curie worked in Paris", "Pierre Curie taught physics"]})
+
+    assert chunk_ids(indexer.search("Where was Paris?", strategy="knowledge_graph")) == ["doc::0"]
+
+
+def test_companion_strategies_can_be_turned_off():
+    indexer = RAGIndexer(InMemoryMetadataRepo(), companion_strategies=[])
+    indexer.index_document({"id": "doc", "chunks": ["Marie Curie worked in Paris"]})
+
+    assert indexer.search("Paris", strategy="lexical") == []
+    assert indexer.search("Paris", strategy="knowledge_graph") == []
+    assert chunk_ids(indexer.search("Paris", strategy="vector_store")) == ["doc::0"]
+
+
+def test_knowledge_graph_follows_segments_written_by_other_processes(tmp_path):
+    writer = RAGIndexer(InMemoryMetadataRepo(), segment_directory=str(tmp_path))
+    writer.index_document({"id": "doc", "chunks": ["Marie Curie worked in Paris"]})
+    writer.persist()
+
+    reader = RAGIndexer(InMemoryMetadataRepo(), segment_directory=str(tmp_path))
+    assert chunk_ids(reader.search("Paris", strategy="knowledge_graph")) == ["doc::0"]
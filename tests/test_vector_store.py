@@ -0,0 +1,74 @@
+import threading
+
+import numpy as np
+
+from rag_system.indexing.ann_index import IVFVectorIndex
+from rag_system.indexing.embeddings import get_default_embedder
+from rag_system.indexing.rag_indexer import VectorStoreStrategy
+from rag_system.indexing.vector_store import NumpyVectorIndex
+
+
+def unit_vectors(count, dimension=8, seed=0):
+    vectors = np.random.default_rng(seed).normal(size=(count, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_snapshot_does_not_see_later_changes():
+    index = NumpyVectorIndex(8, initial_capacity=2)
+    vectors = unit_vectors(4)
+    index.add([0, 1], vectors[:2])
+    snapshot = index.snapshot()
+
+    index.add([2, 3], vectors[2:])
+    index.remove([0])
+
+    assert sorted(snapshot.labels.tolist()) == [0, 1]
+    assert sorted(index.labels.tolist()) == [1, 2, 3]
+    _, labels = snapshot.search(vectors[0], top_k=4)
+    assert labels.tolist() == [0, 1, -1, -1]
+
+
+def test_ivf_snapshot_does_not_see_later_changes():
+    index = IVFVectorIndex(8, nlist=4, nprobe=4)
+    vectors = unit_vectors(20)
+    index.build(range(10), vectors[:10])
+    snapshot = index.snapshot()
+
+    index.add(range(10, 20), vectors[10:])
+    index.remove([0])
+
+    assert sorted(snapshot.labels.tolist()) == list(range(10))
+    assert len(index) == 19
+
+
+def test_searches_run_alongside_indexing():
+    strategy = VectorStoreStrategy(get_default_embedder())
+    errors = []
+    done = threading.Event()
+
+    def index_documents():
+        try:
+            for i in range(200):
+                strategy.index_document({"id": f"doc-{i % 20}", "chunks": [f"battery cell {i}", f"anode {i}"]})
+                if i % 3 == 0:
+                    strategy.remove_document(f"doc-{(i + 7) % 20}")
+        except Exception as e:
+            errors.append(e)
+        finally:
+            done.set()
+
+    def search():
+        try:
+            while not done.is_set():
+                for result in strategy.search("battery cell", top_k=10):
+                    assert result["text"]
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=index_documents)] + [threading.Thread(target=search) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []